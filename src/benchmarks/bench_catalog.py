@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times showing the statistics of many boards at startup.
+
+Run from the src directory: python -m benchmarks.bench_catalog
+
+Compares computing the statistics of every board to a cold catalog (all entries
+computed) and a warm catalog (all entries valid, one stat per board).
+"""
+
+import os
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board_copies  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.catalog import Catalog  # type: ignore
+from data.catalog import read_entry
+
+# pylint: enable=import-error
+
+
+N_BOARDS = 200
+N_TASKS = 2_000
+
+
+def main():
+    print_row("format", "boards", "compute [s]", "cold [s]", "warm [s]")
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in (".json", ".pbb", ".sqlite"):
+            filenames = create_board_copies(directory, extension, N_BOARDS, N_TASKS, 1)
+            catalog_file = os.path.join(directory, f"catalog{extension}.json")
+
+            results: list[float] = []
+            with timer(results):
+                entries = [read_entry(filename) for filename in filenames]
+            with timer(results):
+                catalog = Catalog(catalog_file)
+                catalog.refresh(filenames)
+                catalog.save()
+            with timer(results):
+                catalog = Catalog(catalog_file)
+                assert not catalog.refresh(filenames)
+            assert entries == [catalog.get(filename) for filename in filenames]
+            print_row(extension, N_BOARDS, *(f"{result:.4f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
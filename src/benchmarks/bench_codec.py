@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""Times loading and saving boards of increasing size with the JSON codec.
+
+Run from the src directory: python -m benchmarks.bench_codec
+
+For every size, the raw encode/decode time of the standard library and of the codec
+in use (orjson if installed) is shown, followed by opening and closing (saving) a
+board file with Projectboard.
+"""
+
+import os
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data import codec  # type: ignore
+from data import storages
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+SIZES = [1_000, 10_000, 100_000]
+N_PROJECTS = 10
+
+
+def run(directory: str, n_items: int):
+    filename = os.path.join(directory, f"board_{n_items}.json")
+    board = create_board(n_items // N_PROJECTS, N_PROJECTS, filename)
+    board.close()
+    tables = storages.read_tables(filename)
+    content = codec.dumps(tables)
+
+    results: list[float] = []
+    with timer(results):
+        codec.dumps_json(tables)
+    with timer(results):
+        codec.loads_json(content)
+    with timer(results):
+        codec.dumps(tables)
+    with timer(results):
+        codec.loads(content)
+
+    with timer(results):
+        board = Projectboard("", filename)
+    board.set_metadata({"name": "Changed"})
+    with timer(results):
+        board.close()
+
+    size = len(content) / 2**20
+    print_row(n_items, *(f"{result:.4f}" for result in results), f"{size:.1f}")
+
+
+def main():
+    print(f"codec: {codec.NAME}")
+    print_row(
+        "tasks",
+        "json dump [s]",
+        "json load [s]",
+        "dump [s]",
+        "load [s]",
+        "open [s]",
+        "close [s]",
+        "size [MB]",
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for n_items in SIZES:
+            run(directory, n_items)
+
+
+if __name__ == "__main__":
+    main()
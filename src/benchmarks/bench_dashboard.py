@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times the dashboard of many boards.
+
+Run from the src directory: python -m benchmarks.bench_dashboard
+
+Compares summarizing the boards one after the other to the process pool (cold
+cache) and to the cache (no board changed).
+"""
+
+import os
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board_copies  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.dashboard import Dashboard  # type: ignore
+
+# pylint: enable=import-error
+
+
+N_BOARDS = 48
+N_TASKS = 10_000
+
+
+def main():
+    print_row("format", "boards", "serial [s]", "pool [s]", "cached [s]", "cores")
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in (".json", ".pbb"):
+            filenames = create_board_copies(directory, extension, N_BOARDS, N_TASKS // 10, 10)
+
+            results: list[float] = []
+            with timer(results):
+                serial = Dashboard(None).refresh(filenames, max_workers=1)
+            cache_file = os.path.join(directory, f"dashboard{extension}.json")
+            with timer(results):
+                pool = Dashboard(cache_file).refresh(filenames)
+            with timer(results):
+                cached = Dashboard(cache_file).refresh(filenames)
+            assert serial == pool == cached
+            print_row(extension, N_BOARDS, *(f"{result:.3f}" for result in results), os.cpu_count())
+
+
+if __name__ == "__main__":
+    main()
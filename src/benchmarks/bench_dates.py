@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compares date queries answered by a scan of the board and by the date index.
+
+Run from the src directory: python -m benchmarks.bench_dates
+
+The tasks get random start dates within ten years and take up to 60 days. Measured
+are building the index (first query) and then 100 window (one week), overdue and
+due-soon (two weeks) queries each.
+"""
+
+import random
+
+# pylint: disable=import-error
+from benchmarks.common import print_row  # type: ignore
+from benchmarks.common import timer
+from data import dates  # type: ignore
+from data.data import Projectboard  # type: ignore
+
+# pylint: enable=import-error
+
+
+SIZES = [10_000, 100_000]
+N_QUERIES = 100
+SPAN = 3650
+
+
+def create_board(n_tasks: int) -> Projectboard:
+    rng = random.Random(1)
+    first_day = dates.today() - SPAN // 2
+    board = Projectboard("Benchmark", "benchmark.json", db_in_memory=True)
+    with board.batch():
+        for i_task in range(n_tasks):
+            start = first_day + rng.randrange(SPAN)
+            board.insert(
+                {
+                    "id": f"T{i_task}",
+                    "category": "task",
+                    "state": "Closed" if rng.random() < 0.5 else "Open",
+                    "startdate": start,
+                    "duedate": start + rng.randrange(60),
+                }
+            )
+    return board
+
+
+def scan_window(board: Projectboard, items: list[str], first: int, last: int) -> list[str]:
+    found = []
+    for item_id in items:
+        span = dates.interval(board.get(item_id))  # type: ignore
+        if span is not None and span[0] <= last and span[1] >= first:
+            found.append(item_id)
+    return found
+
+
+def main():
+    print_row("items", "query", "scan [s]", "index [s]")
+    for size in SIZES:
+        board = create_board(size)
+        items = [f"T{i_task}" for i_task in range(size)]
+        today = dates.today()
+        windows = [(today + offset, today + offset + 7) for offset in range(N_QUERIES)]
+
+        results: list[float] = []
+        with timer(results):
+            board.in_window(today, today)
+        print_row(size, "build", "", f"{results[-1]:.4f}")
+
+        results = []
+        with timer(results):
+            scanned = [scan_window(board, items, first, last) for first, last in windows]
+        with timer(results):
+            indexed = [board.in_window(first, last) for first, last in windows]
+        assert [sorted(found) for found in scanned] == [sorted(found) for found in indexed]
+        print_row(size, "window", *(f"{result:.4f}" for result in results))
+
+        results = []
+        with timer(results):
+            for _ in range(N_QUERIES):
+                board.overdue()
+        with timer(results):
+            for _ in range(N_QUERIES):
+                board.due_soon(14)
+        print_row(size, "overdue", "", f"{results[0]:.4f}")
+        print_row(size, "due soon", "", f"{results[1]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
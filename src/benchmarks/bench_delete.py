@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times deleting a complete project for increasing numbers of tasks.
+
+Run from the src directory: python -m benchmarks.bench_delete
+
+With linear deletion the time per task stays (roughly) constant.
+"""
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+
+# pylint: enable=import-error
+
+
+SIZES = [625, 1250, 2500, 5000]
+
+
+def main():
+    print_row("tasks", "total [s]", "per task [us]")
+    for n_tasks in SIZES:
+        # A second project makes sure the rest of the board is left alone
+        board = create_board(n_tasks, n_projects=2)
+        results: list[float] = []
+        with timer(results):
+            board.delete_subelements("P0", True)
+        assert board.get("P0") is None
+        assert board.n_children("P1") > 0
+        print_row(n_tasks, f"{results[0]:.4f}", f"{1e6 * results[0] / n_tasks:.1f}")
+
+
+if __name__ == "__main__":
+    main()
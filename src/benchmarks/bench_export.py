@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times exporting a large board and measures the memory the export allocates.
+
+Run from the src directory: python -m benchmarks.bench_export
+
+Memory is the tracemalloc peak during write_export (the board is already open),
+to compare with the size of the written file.
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data import export  # type: ignore
+
+# pylint: enable=import-error
+
+
+N_TASKS = 100_000
+
+
+def main():
+    board = create_board(N_TASKS // 10, 10)
+    print_row("format", "items", "time [s]", "file [MB]", "peak [MB]")
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format in export.FORMATS:
+            filename = os.path.join(directory, f"board.{export_format}")
+            results: list[float] = []
+            tracemalloc.start()
+            with timer(results):
+                export.write_export(board, filename)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print_row(
+                export_format,
+                export.count_items(board),
+                f"{results[0]:.3f}",
+                f"{os.path.getsize(filename) / 2**20:.1f}",
+                f"{peak / 2**20:.2f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
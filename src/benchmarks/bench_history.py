@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times editing with undo history and its memory.
+
+Run from the src directory: python -m benchmarks.bench_history
+
+Renames and moves tasks of a large board one by one (as in the GUI), with and
+without history, then undoes the remembered edits.
+"""
+
+# pylint: disable=import-error
+from benchmarks.common import fill_project  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.data import Projectboard  # type: ignore
+
+# pylint: enable=import-error
+
+
+N_TASKS = 20_000
+N_EDITS = 20_000
+
+
+def edit(board: Projectboard):
+    for i_edit in range(N_EDITS):
+        task_id = f"P0-T{i_edit % N_TASKS}"
+        if i_edit % 2:
+            board.move_item_by(task_id, 1, True)
+        else:
+            board.insert({"id": task_id, "category": "task", "name": f"Edit {i_edit}"})
+
+
+def main():
+    print_row("cap [kB]", "edit [s]", "size [kB]", "undo [s]", "undone")
+    for undo_kb in (0, 256, 4096):
+        board = Projectboard(
+            "Benchmark", "benchmark.json", db_in_memory=True, undo_bytes=undo_kb * 1024
+        )
+        with board.batch():
+            fill_project(board, "P0", N_TASKS)
+        if board.history is not None:
+            board.history.clear()
+
+        results: list[float] = []
+        with timer(results):
+            edit(board)
+        size = 0 if board.history is None else board.history.size
+        n_undone = 0
+        with timer(results):
+            while board.undo():
+                n_undone += 1
+        print_row(undo_kb, f"{results[0]:.3f}", size // 1024, f"{results[1]:.3f}", n_undone)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compares boards with old (time stamp) and compact ids.
+
+Run from the src directory: python -m benchmarks.bench_ids
+
+Writes a board with old ids, migrates it and reports for both: the file size,
+the time and memory to open it and the time to look up every item by id.
+"""
+
+import os
+import tempfile
+import tracemalloc
+from datetime import datetime
+from datetime import timedelta
+
+# pylint: disable=import-error
+from benchmarks.common import TASKS_PER_MILESTONE  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data import ids  # type: ignore
+from data import storages
+from data.data import Projectboard
+from data.data import create_default_item
+
+# pylint: enable=import-error
+
+
+N_PROJECTS = 20
+N_TASKS = 2_500
+EXTENSIONS = (".json", ".pbb", ".sqlite")
+
+
+def write_legacy_board(filename: str):
+    """A board like create_board, but with ids as the old generate_id created them"""
+    start = datetime(2023, 12, 8, 16, 19, 16)
+    documents: list[dict] = []
+
+    def new_item(category: str, parent: str | None = None) -> dict:
+        item = create_default_item(category != "task")
+        item["id"] = str(start + timedelta(microseconds=17 * len(documents))).replace(" ", "-")
+        item["category"] = category
+        item["parent"] = parent
+        documents.append(item)
+        return item
+
+    order = []
+    for _ in range(N_PROJECTS):
+        project = new_item("project")
+        order.append(project["id"])
+        for i_task in range(N_TASKS):
+            if i_task % TASKS_PER_MILESTONE == 0:
+                milestone = new_item("milestone", project["id"])
+                project["sub_items"].append(milestone["id"])
+            task = new_item("task", milestone["id"])
+            milestone["sub_items"].append(task["id"])
+    documents.append({"project_order": order})
+
+    storages.write_board(
+        filename,
+        (
+            (storages.DEFAULT_TABLE, str(doc_id), document)
+            for doc_id, document in enumerate(documents, 1)
+        ),
+    )
+
+
+def measure(filename: str) -> tuple:
+    tracemalloc.start()
+    board = Projectboard("Benchmark", filename, read_only=True)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    board.close()
+
+    results: list[float] = []
+    with timer(results):
+        board = Projectboard("Benchmark", filename, read_only=True)
+    item_ids = [item.id for item in board.iter_items()]
+    with timer(results):
+        for item_id in item_ids:
+            board.get(item_id)
+    board.close()
+    return (
+        os.path.getsize(filename) // 1024,
+        f"{results[0]:.3f}",
+        memory // 1024**2,
+        f"{results[1] / len(item_ids) * 1e6:.2f}",
+    )
+
+
+def main():
+    print(f"{N_PROJECTS * N_TASKS} tasks")
+    print_row("file", "ids", "size [kB]", "open [s]", "memory [MB]", "get [us]", "migrate [s]")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for extension in EXTENSIONS:
+            filename = os.path.join(tmp_dir, f"board{extension}")
+            write_legacy_board(filename)
+            print_row(extension, "old", *measure(filename), "")
+            results: list[float] = []
+            with timer(results):
+                ids.migrate_board(filename)
+            print_row(extension, "compact", *measure(filename), f"{results[0]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
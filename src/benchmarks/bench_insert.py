@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times creating a large board item by item and with insert_many.
+
+Run from the src directory: python -m benchmarks.bench_insert
+
+Both create the same projects, milestones and tasks (as benchmarks.common.create_board)
+in a board file, with and without undo history. Item by item means fill_project
+(insert_sub_item) within one batch.
+"""
+
+import os
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import TASKS_PER_MILESTONE  # type: ignore
+from benchmarks.common import fill_project
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.data import Projectboard  # type: ignore
+from data.data import create_default_item
+
+# pylint: enable=import-error
+
+
+N_PROJECTS = 10
+N_TASKS = 9_000
+EXTENSIONS = (".json", ".pbb", ".sqlite")
+
+
+def create_forest() -> list[dict]:
+    """The items of create_board, tasks first"""
+    items = []
+    for i_proj in range(N_PROJECTS):
+        pid = f"P{i_proj}"
+        project = create_default_item()
+        project.update(id=pid, name=pid)
+        items.append(project)
+        for i_task in range(N_TASKS):
+            if i_task % TASKS_PER_MILESTONE == 0:
+                milestone = create_default_item()
+                milestone.update(
+                    id=f"{pid}-M{i_task // TASKS_PER_MILESTONE}", category="milestone", parent=pid
+                )
+                items.append(milestone)
+            task = create_default_item(False)
+            task.update(id=f"{pid}-T{i_task}", category="task", parent=milestone["id"])
+            items.append(task)
+    items.reverse()
+    return items
+
+
+def main():
+    items = create_forest()
+    print(f"{len(items)} items")
+    print_row("file", "history", "single [s]", "many [s]")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for extension in EXTENSIONS:
+            for undo_bytes in (0, 4 * 2**20):
+                results: list[float] = []
+                filename = os.path.join(tmp_dir, f"single{undo_bytes}{extension}")
+                with timer(results):
+                    board = Projectboard("Benchmark", filename, undo_bytes=undo_bytes)
+                    with board.batch():
+                        for i_proj in range(N_PROJECTS):
+                            fill_project(board, f"P{i_proj}", N_TASKS)
+                    board.close()
+
+                filename = os.path.join(tmp_dir, f"many{undo_bytes}{extension}")
+                with timer(results):
+                    board = Projectboard("Benchmark", filename, undo_bytes=undo_bytes)
+                    board.insert_many(items)
+                    board.close()
+                print_row(extension, bool(undo_bytes), *(f"{result:.3f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
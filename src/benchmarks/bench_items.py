@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compares the memory of board items as dicts and as Items.
+
+Run from the src directory: python -m benchmarks.bench_items
+
+The items of a board file are decoded as dicts (as stored) and converted to Items
+(the dicts are dropped afterwards). Memory is the tracemalloc size of the items
+that remain allocated; the time is that of counting the finished tasks.
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data import codec  # type: ignore
+from data.item import TASK  # type: ignore
+from data.item import Item
+from data.item import state_code
+
+# pylint: enable=import-error
+
+
+SIZES = [10_000, 100_000]
+
+
+def load_documents(filename: str) -> list[dict]:
+    with open(filename, "rb") as board_file:
+        tables = codec.loads(board_file.read())
+    return [doc for doc in tables["_default"].values() if "category" in doc]
+
+
+def main():
+    print_row("items", "type", "memory [MB]", "count [s]")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            filename = os.path.join(directory, f"board{size}.json")
+            board = create_board(size // 10, 10, filename)
+            # Mark every other task as finished
+            with board.batch():
+                for i_task in range(0, size // 10, 2):
+                    board.insert({"id": f"P0-T{i_task}", "category": "task", "state": "Closed"})
+            board.close()
+
+            tracemalloc.start()
+            documents = load_documents(filename)
+            dict_memory = tracemalloc.get_traced_memory()[0]
+            results: list[float] = []
+            with timer(results):
+                n_dicts = sum(
+                    1 for doc in documents if doc["category"] == "task" and doc["state"] == "Closed"
+                )
+
+            items = [Item.from_dict(doc) for doc in documents]
+            del documents
+            item_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            closed = state_code("Closed")
+            with timer(results):
+                n_items = sum(1 for item in items if item.category == TASK and item.state == closed)
+            assert n_dicts == n_items
+
+            n_items = len(items)
+            print_row(n_items, "dict", f"{dict_memory / 2**20:.1f}", f"{results[0]:.4f}")
+            print_row(n_items, "Item", f"{item_memory / 2**20:.1f}", f"{results[1]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
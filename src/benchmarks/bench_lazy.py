@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""Compares opening binary boards completely and lazily (memory-mapped).
+
+Run from the src directory: python -m benchmarks.bench_lazy
+
+The boards are streamed to disk with boardfile.BoardWriter. Measured are: opening
+the board, showing the first screen of a Page (project order, projects and their
+milestone/task counts), and the memory allocated for that (tracemalloc peak).
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+# pylint: disable=import-error
+from benchmarks.common import TASKS_PER_MILESTONE  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data import boardfile  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+
+# pylint: enable=import-error
+
+
+SIZES = [10_000, 100_000, 1_000_000]
+N_PROJECTS = 10
+
+
+def write_board(filename: str, n_tasks: int):
+    """Writes a board with N_PROJECTS projects of n_tasks tasks in total"""
+    project_order = [f"P{i_proj}" for i_proj in range(N_PROJECTS)]
+    n_milestones = n_tasks // N_PROJECTS // TASKS_PER_MILESTONE
+    doc_ids = iter(range(1, 2**32))
+
+    with open(filename, "wb") as board_file, boardfile.BoardWriter(board_file) as writer:
+
+        def write(document: dict):
+            writer.write_document("_default", str(next(doc_ids)), document)
+
+        write({"metadata": {"filename": filename, "name": "Benchmark", "description": ""}})
+        write({"project_order": project_order})
+        for pid in project_order:
+            project = create_default_item()
+            project.update(id=pid, name=pid)
+            project["sub_items"] = [f"{pid}-M{i_ms}" for i_ms in range(n_milestones)]
+            write(project)
+            for i_ms in range(n_milestones):
+                milestone = create_default_item()
+                mid = f"{pid}-M{i_ms}"
+                milestone.update(id=mid, category="milestone", parent=pid)
+                milestone["sub_items"] = [f"{mid}-T{i}" for i in range(TASKS_PER_MILESTONE)]
+                write(milestone)
+                for task_id in milestone["sub_items"]:
+                    task = create_default_item(False)
+                    task.update(id=task_id, category="task", parent=mid)
+                    write(task)
+
+
+def first_screen(board: Projectboard):
+    for pid in board.get_project_order()["project_order"]:
+        board.get(pid)
+        board.number_milestones_and_tasks(pid)
+
+
+def run(filename: str, lazy: bool) -> list[float]:
+    results: list[float] = []
+    tracemalloc.start()
+    with timer(results):
+        board = Projectboard("", filename, lazy=lazy, read_only=lazy)
+    with timer(results):
+        first_screen(board)
+    results.append(tracemalloc.get_traced_memory()[1] / 2**20)
+    tracemalloc.stop()
+    board.close()
+    return results
+
+
+def main():
+    print_row("tasks", "size [MB]", "mode", "open [s]", "screen [s]", "peak [MB]")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_tasks in SIZES:
+            filename = os.path.join(directory, f"board_{n_tasks}.pbb")
+            write_board(filename, n_tasks)
+            size = os.path.getsize(filename) / 2**20
+            for lazy in (False, True):
+                if not lazy and n_tasks > 100_000:
+                    continue
+                results = run(filename, lazy)
+                print_row(
+                    n_tasks,
+                    f"{size:.1f}",
+                    "lazy" if lazy else "full",
+                    *(f"{result:.4f}" for result in results[:2]),
+                    f"{results[2]:.1f}",
+                )
+
+
+if __name__ == "__main__":
+    main()
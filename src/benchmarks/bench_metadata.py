@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""Times reading the names of many boards, as done when importing boards.
+
+Run from the src directory: python -m benchmarks.bench_metadata
+
+Compares opening every board with Projectboard (serially) to the header-only
+read_metadata_many (concurrently).
+"""
+
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board_copies  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.data import Projectboard  # type: ignore
+from data.data import read_metadata_many
+
+# pylint: enable=import-error
+
+
+N_BOARDS = 200
+N_TASKS = 2_000
+
+
+def open_serially(filenames: list[str]) -> list[str]:
+    names = []
+    for filename in filenames:
+        board = Projectboard("", filename)
+        names.append(board.get_metadata()["name"])
+        board.close()
+    return names
+
+
+def main():
+    print_row("format", "boards", "open [s]", "header [s]")
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in (".json", ".pbb", ".sqlite"):
+            filenames = create_board_copies(directory, extension, N_BOARDS, N_TASKS, 1)
+
+            results: list[float] = []
+            with timer(results):
+                names = open_serially(filenames)
+            with timer(results):
+                metadata = read_metadata_many(filenames)
+            assert names == [board["name"] for board in metadata]
+            print_row(extension, N_BOARDS, *(f"{result:.4f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times moving sub items by rewriting the list of the parent and by rank.
+
+Run from the src directory: python -m benchmarks.bench_order
+
+A milestone with many tasks (in a SQLite board, which writes only the changed
+documents) gets random moves: once as before (move_item_in_list_by_n on the
+sub_items of the milestone, which is then written) and once with move_item_by,
+which only writes the rank of the moved task. Bytes are those of the JSON of the
+documents written.
+"""
+
+import json
+import os
+import random
+import tempfile
+from typing import Callable
+from unittest import mock
+
+# pylint: disable=import-error
+from benchmarks.common import print_row  # type: ignore
+from benchmarks.common import timer
+from data.data import Projectboard  # type: ignore
+from data.data import move_item_in_list_by_n
+from data.storages import SQLiteStorage
+
+# pylint: enable=import-error
+
+
+SIZES = [1_000, 10_000]
+N_MOVES = 500
+
+
+def create_milestone(filename: str, n_tasks: int) -> Projectboard:
+    board = Projectboard("Benchmark", filename, undo_bytes=0)
+    items: list[dict] = [
+        {"id": "P0", "category": "project", "name": "P0", "parent": None},
+        {"id": "M0", "category": "milestone", "name": "M0", "parent": "P0"},
+    ]
+    items.extend(
+        {"id": f"T{i_task}", "category": "task", "name": f"T{i_task}", "parent": "M0"}
+        for i_task in range(n_tasks)
+    )
+    board.insert_many(items)
+    return board
+
+
+def move_in_list(board: Projectboard, task_id: str, n_pos: int):
+    milestone = board.get("M0")
+    move_item_in_list_by_n(task_id, milestone["sub_items"], n_pos)  # type: ignore
+    board.insert(milestone)  # type: ignore
+
+
+def move_by_rank(board: Projectboard, task_id: str, n_pos: int):
+    board.move_item_by(task_id, n_pos, True)
+
+
+def run(board: Projectboard, move: Callable[[Projectboard, str, int], None]) -> tuple:
+    storage = board.__database__.storage
+    assert isinstance(storage, SQLiteStorage)
+    written = [0]
+    write_documents = storage.write_documents
+
+    def count(table: str, documents: dict):
+        written[0] += sum(len(json.dumps(document)) for document in documents.values())
+        write_documents(table, documents)
+
+    n_tasks = len(board.get("M0")["sub_items"])  # type: ignore
+    random.seed(1)
+    moves = [(f"T{random.randrange(n_tasks)}", random.randint(-5, 5)) for _ in range(N_MOVES)]
+    # The first move ranks the tasks
+    move(board, "T0", 1)
+    results: list[float] = []
+    with mock.patch.object(storage, "write_documents", count):
+        with timer(results):
+            for task_id, n_pos in moves:
+                move(board, task_id, n_pos)
+    return f"{results[0] / N_MOVES * 1e3:.3f}", written[0] // N_MOVES
+
+
+def main():
+    print_row("tasks", "moved", "move [ms]", "written [B]")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_tasks in SIZES:
+            for name, move in (("in list", move_in_list), ("by rank", move_by_rank)):
+                filename = os.path.join(tmp_dir, f"{name.replace(' ', '_')}{n_tasks}.sqlite")
+                board = create_milestone(filename, n_tasks)
+                print_row(n_tasks, name, *run(board, move))
+                board.close()
+
+
+if __name__ == "__main__":
+    main()
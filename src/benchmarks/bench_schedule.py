@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times computing the schedule of large boards and updating it after edits.
+
+Run from the src directory: python -m benchmarks.bench_schedule
+
+Every task depends on up to two of the 100 tasks created before it. Measured are
+the complete computation (pure Python and, if installed, NumPy) and 100 edits of
+the dates of random tasks, each followed by Schedule.update.
+"""
+
+import random
+
+# pylint: disable=import-error
+from benchmarks.common import print_row  # type: ignore
+from benchmarks.common import timer
+from data import dates  # type: ignore
+from data import schedule
+from data.data import Projectboard  # type: ignore
+from data.schedule import Schedule
+
+# pylint: enable=import-error
+
+
+SIZES = [10_000, 50_000]
+N_EDITS = 100
+
+
+def create_board(n_tasks: int) -> Projectboard:
+    rng = random.Random(1)
+    day = dates.today()
+    board = Projectboard("Benchmark", "benchmark.json", db_in_memory=True)
+    with board.batch():
+        for i_task in range(n_tasks):
+            first = max(0, i_task - 100)
+            depends_on = [
+                f"T{i_other}" for i_other in rng.sample(range(first, i_task), min(i_task, 2))
+            ]
+            board.insert(
+                {
+                    "id": f"T{i_task}",
+                    "category": "task",
+                    "startdate": day,
+                    "duedate": day + rng.randrange(5),
+                    schedule.DEPENDS_ON: depends_on,
+                }
+            )
+    return board
+
+
+def main():
+    print_row("tasks", "variant", "time [s]")
+    for size in SIZES:
+        board = create_board(size)
+        variants = [False, True] if schedule.HAVE_NUMPY else [False]
+        for use_numpy in variants:
+            results: list[float] = []
+            with timer(results):
+                plan = Schedule(board, use_numpy=use_numpy)
+            print_row(size, "numpy" if use_numpy else "python", f"{results[0]:.4f}")
+
+        rng = random.Random(2)
+        day = dates.today()
+        edited = [f"T{rng.randrange(size)}" for _ in range(N_EDITS)]
+        results = []
+        with timer(results):
+            for item_id in edited:
+                board.insert({"id": item_id, "category": "task", "duedate": day + rng.randrange(5)})
+                plan.update([item_id])
+        print_row(size, f"{N_EDITS} edits", f"{results[0]:.4f}")
+        assert plan.timings() == Schedule(board, use_numpy=False).timings()
+
+
+if __name__ == "__main__":
+    main()
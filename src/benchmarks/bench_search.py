@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times the full-text search over the names and descriptions of a board.
+
+Run from the src directory: python -m benchmarks.bench_search
+
+Compares a linear scan over all items to the inverted index (build, load, query
+and the incremental update of one item).
+"""
+
+import os
+import random
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.search import BoardSearch  # type: ignore
+from data.search import tokenize
+
+# pylint: enable=import-error
+
+
+N_TASKS = 100_000
+N_WORDS = 5_000
+QUERIES = ["word17", "word17 word42", "word17 OR word42 -word99", "word12*"]
+
+
+def fill_texts(board):
+    """Gives every item a name and description of random words"""
+    words = [f"word{i_word}" for i_word in range(N_WORDS)]
+    rng = random.Random(0)
+    with board.batch():
+        for item_id, category in list(board.iter_values("id", "category")):
+            name = " ".join(rng.choices(words, k=3))
+            description = " ".join(rng.choices(words, k=20))
+            board.insert(
+                {"id": item_id, "category": category, "name": name, "description": description}
+            )
+
+
+def scan(board, query: str) -> list[str]:
+    tokens = set(tokenize(query))
+    return [
+        item_id
+        for item_id, name, description in board.iter_values("id", "name", "description")
+        if tokens <= set(tokenize(name)) | set(tokenize(description))
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "board.json")
+        board = create_board(N_TASKS // 10, 10, filename)
+        fill_texts(board)
+        board.save()
+
+        print_row("operation", "time [ms]")
+        results: list[float] = []
+        with timer(results):
+            scan(board, QUERIES[1])
+        print_row("linear scan", f"{results[-1] * 1000:.1f}")
+
+        search = BoardSearch(os.path.join(directory, "search"))
+        with timer(results):
+            search.attach(board)
+        print_row("build", f"{results[-1] * 1000:.1f}")
+        index = search.index(filename)
+        assert index is not None
+        assert {hit.item_id for hit in index.search(QUERIES[1], None)} == set(
+            scan(board, QUERIES[1])
+        )
+
+        for query in QUERIES:
+            with timer(results):
+                index.search(query, prefix_last=True)
+            print_row(query[:14], f"{results[-1] * 1000:.2f}")
+
+        item_id, category = next(board.iter_values("id", "category"))
+        with timer(results):
+            board.insert({"id": item_id, "category": category, "name": "renamed item"})
+        print_row("update item", f"{results[-1] * 1000:.2f}")
+        board.save()
+        search.save_index(board)
+        search.detach(board)
+        board.close()
+
+        with timer(results):
+            loaded = BoardSearch(os.path.join(directory, "search")).index(filename)
+        assert loaded is not None and len(loaded) == len(index)
+        print_row("load", f"{results[-1] * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
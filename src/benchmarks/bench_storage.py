@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compares the JSON, the binary and the SQLite storage backend for boards of increasing size.
+
+Run from the src directory: python -m benchmarks.bench_storage
+
+Measured are: creating and saving the board, opening it, and changing the state
+of one task followed by a save.
+"""
+
+import os
+import tempfile
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.data import Projectboard  # type: ignore
+
+# pylint: enable=import-error
+
+
+SIZES = [1_000, 10_000, 100_000]
+N_PROJECTS = 10
+EXTENSIONS = {"json": ".json", "binary": ".pbb", "sqlite": ".sqlite"}
+
+
+def run(directory: str, backend: str, n_items: int):
+    filename = os.path.join(directory, f"board_{n_items}{EXTENSIONS[backend]}")
+    results: list[float] = []
+
+    with timer(results):
+        board = create_board(n_items // N_PROJECTS, N_PROJECTS, filename)
+        board.save()
+    board.close()
+
+    with timer(results):
+        board = Projectboard("", filename)
+
+    task = board.get("P0-T0")
+    assert task is not None
+    task["state"] = "Closed"
+    with timer(results):
+        board.insert(task)
+        board.save()
+    board.close()
+
+    size = os.path.getsize(filename) / 2**20
+    print_row(backend, n_items, *(f"{result:.4f}" for result in results), f"{size:.1f}")
+
+
+def main():
+    print_row("backend", "tasks", "create [s]", "open [s]", "edit+save [s]", "size [MB]")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_items in SIZES:
+            for backend in EXTENSIONS:
+                run(directory, backend, n_items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Times the project plan layout and the culling done for every painted frame.
+
+Run from the src directory: python -m benchmarks.bench_timeline
+
+A frame is the work of GanttScene.drawForeground without the painting: the rows
+(or aggregated rows when zoomed out) in the exposed rect of an 800 pixel high view.
+The view is scrolled over the complete plan in steps of one screen.
+"""
+
+# pylint: disable=import-error
+from benchmarks.common import create_board  # type: ignore
+from benchmarks.common import print_row
+from benchmarks.common import timer
+from data.timeline import TimelineLayout  # type: ignore
+
+# pylint: enable=import-error
+
+
+SIZES = [2_000, 20_000]
+VIEW_HEIGHT = 800
+ROW_HEIGHT = 20
+MIN_ROW_PIXELS = 3
+
+
+def frames(layout: TimelineLayout, row_pixels: float) -> int:
+    """Culls the rows of all screens of the plan; returns the number of frames"""
+    level = 0
+    while row_pixels * 2**level < MIN_ROW_PIXELS:
+        level += 1
+    rows_per_screen = int(VIEW_HEIGHT / (row_pixels * 2**level)) + 1
+    n_buckets = (len(layout) >> level) + 1
+    first_day, last_day = layout.first_day, layout.last_day
+    n_frames = 0
+    for first in range(0, n_buckets, rows_per_screen):
+        last = first + rows_per_screen
+        if level:
+            list(layout.aggregate(level, first_day, last_day, first, last))
+        else:
+            list(layout.rows(first_day, last_day, first, last))
+        n_frames += 1
+    return n_frames
+
+
+def main():
+    print_row("items", "row [px]", "frames", "frame [ms]", "layout [s]")
+    for size in SIZES:
+        board = create_board(size // 10, 10)
+        results: list[float] = []
+        with timer(results):
+            layout = TimelineLayout.from_board(board)
+        for row_pixels in (ROW_HEIGHT, 1, 0.05):
+            frame_results: list[float] = []
+            with timer(frame_results):
+                n_frames = frames(layout, row_pixels)
+            print_row(
+                len(layout),
+                row_pixels,
+                n_frames,
+                f"{frame_results[0] / n_frames * 1000:.3f}",
+                f"{results[0]:.4f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
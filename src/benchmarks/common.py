@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from typing import Optional
+
+# pylint: disable=import-error
+from data.data import Projectboard  # type: ignore
+from data.data import create_default_item
+
+# pylint: enable=import-error
+
+
+TASKS_PER_MILESTONE = 50
+
+
+def fill_project(board: Projectboard, pid: str, n_tasks: int) -> dict:
+    """Adds a project with n_tasks tasks (grouped into milestones) to the board"""
+    project = create_default_item()
+    project["id"] = pid
+    project["name"] = pid
+    board.insert(project)
+
+    milestone: dict = {}
+    for i_task in range(n_tasks):
+        if i_task % TASKS_PER_MILESTONE == 0:
+            milestone = create_default_item()
+            milestone["category"] = "milestone"
+            milestone["id"] = f"{pid}-M{i_task // TASKS_PER_MILESTONE}"
+            board.insert_sub_item(milestone, project)
+
+        task = create_default_item(False)
+        task["category"] = "task"
+        task["id"] = f"{pid}-T{i_task}"
+        board.insert_sub_item(task, milestone)
+
+    return project
+
+
+def create_board(n_tasks: int, n_projects: int = 1, filename: Optional[str] = None) -> Projectboard:
+    """Creates a board with n_projects projects of n_tasks tasks each (in memory by default)"""
+    if filename is None:
+        board = Projectboard("Benchmark", "benchmark.json", db_in_memory=True)
+    else:
+        board = Projectboard("Benchmark", filename)
+    with board.batch():
+        for i_proj in range(n_projects):
+            fill_project(board, f"P{i_proj}", n_tasks)
+    return board
+
+
+def create_board_copies(
+    directory: str, extension: str, n_boards: int, n_tasks: int, n_projects: int = 1
+) -> list[str]:
+    """Creates n_boards copies of one board file in directory; returns their filenames"""
+    template = os.path.join(directory, f"template{extension}")
+    create_board(n_tasks, n_projects, template).close()
+    filenames = []
+    for i_board in range(n_boards):
+        filenames.append(os.path.join(directory, f"board{i_board}{extension}"))
+        shutil.copy(template, filenames[-1])
+    return filenames
+
+
+@contextmanager
+def timer(results: list[float]) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    results.append(time.perf_counter() - start)
+
+
+def print_row(*cols: object):
+    print("".join(f"{col!s:>14}" for col in cols))
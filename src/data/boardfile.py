@@ -0,0 +1,695 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""Compact binary file format for boards (.pbb).
+
+The file is a sequence of length-prefixed records:
+
+    header      MAGIC
+    record      <u32 length> <u8 kind> <payload>   (repeated)
+    trailer     <u64 offset of the INDEX record> MAGIC
+
+Keys, ids, categories, states, dates ... are interned in a string table and the
+key tuples of dictionaries in a shape table, so repeated keys and values are
+stored once and referenced by number. A DOCUMENT record first defines the strings
+and shapes it uses for the first time, followed by the table, the doc_id and the
+document itself, so a file can be read front to back in one pass
+(iter_documents). A table without documents is written as a TABLE record that
+holds its name, so it is kept as well. The INDEX record at the end holds the offsets
+of all strings, shapes and documents for random access (see read_index). For every
+document it also holds the string numbers of its id, parent, category and state
+(the COLUMNS), the documents ordered by id and by parent, and the documents in tree
+order (depth first along the parents) with the size of their subtrees, so
+MappedBoard can look up items, list children and count the categories and states
+below an item without decoding documents.
+
+A dictionary is stored as its shape number followed by one u32 slot per value and a
+list as its length followed by one slot per element, so all slots of a container
+are unpacked with a single struct call. The two lowest bits of a slot give its kind:
+an interned string, a constant (None, False, True), a small int, or the offset of a
+complex value (dictionary, list, long text, other numbers) in the document. Everything
+JSON can represent round-trips unchanged, including the key order of dictionaries.
+"""
+
+import io
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+from itertools import pairwise
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Iterator
+from typing import Literal
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+MAGIC = b"PBB1"
+EXTENSIONS = (".pbb",)
+MAX_INTERNED_LENGTH = 64
+COLUMNS = ("id", "parent", "category", "state")
+NO_STRING = 2**32 - 1
+
+# Record kinds
+_DOCUMENT = 1
+_INDEX = 2
+_TABLE = 3
+
+# Slot kinds
+_STRING = 0
+_CONSTANT = 1
+_COMPLEX = 2
+_SMALL_INT = 3
+_MAX_SLOT_VALUE = 2**30 - 1
+_CONSTANTS = (None, False, True)
+
+# Tags of complex values
+_DICT = 1
+_LIST = 2
+_TEXT = 3
+_INT = 4
+_FLOAT = 5
+
+_RECORD_HEADER = struct.Struct("<IB")
+_TRAILER = struct.Struct("<Q4s")
+_U32 = struct.Struct("<I")
+_U32_PAIR = struct.Struct("<II")
+_FLOAT64 = struct.Struct("<d")
+_COUNTS = struct.Struct("<IIIII")
+
+# Decoded strings and shapes by id: lists when a board is read front to back,
+# lazily filled dictionaries for memory-mapped boards
+Strings = Sequence[str] | Mapping[int, str]
+Shapes = Sequence[tuple] | Mapping[int, tuple]
+
+
+@lru_cache(maxsize=None)
+def _slots(count: int) -> struct.Struct:
+    return struct.Struct(f"<{count}I")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: Literal["I", "Q"], data: bytes | memoryview) -> Sequence[int]:
+    if sys.byteorder == "little" and isinstance(data, memoryview):
+        # No copy: the values are read directly from the (memory-mapped) file
+        return data.cast(typecode)
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class BoardWriter:
+    """Writes the documents of a board to a binary stream one by one.
+
+    close() has to be called after the last document to write the index.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.__stream__ = stream
+        self.__offset__ = 0
+        self.__strings__: dict[str, int] = {}
+        self.__shapes__: dict[tuple[str, ...], int] = {}
+        self.__new_strings__: list[str] = []
+        self.__new_shapes__: list[tuple[int, ...]] = []
+        self.__string_offsets__ = array("Q")
+        self.__string_lengths__ = array("I")
+        self.__shape_offsets__ = array("Q")
+        self.__document_tables__ = array("I")
+        self.__document_ids__ = array("I")
+        self.__document_offsets__ = array("Q")
+        self.__columns__ = tuple(array("I") for _ in COLUMNS)
+        self.__emit(MAGIC)
+
+    def __enter__(self) -> "BoardWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def __emit(self, data: bytes):
+        self.__stream__.write(data)
+        self.__offset__ += len(data)
+
+    def __record(self, kind: int, payload: bytes) -> int:
+        offset = self.__offset__
+        self.__emit(_RECORD_HEADER.pack(len(payload) + 1, kind))
+        self.__emit(payload)
+        return offset
+
+    def __string(self, value: str) -> int:
+        sid = self.__strings__.get(value)
+        if sid is None:
+            sid = len(self.__strings__)
+            self.__strings__[value] = sid
+            self.__new_strings__.append(value)
+        return sid
+
+    def __shape(self, keys: tuple[str, ...]) -> int:
+        shape_id = self.__shapes__.get(keys)
+        if shape_id is None:
+            for key in keys:
+                if not isinstance(key, str):
+                    raise TypeError(f"Keys must be str, not {type(key).__name__}!")
+            shape_id = len(self.__shapes__)
+            self.__shapes__[keys] = shape_id
+            self.__new_shapes__.append(tuple(self.__string(key) for key in keys))
+        return shape_id
+
+    def __slot(self, value: Any, out: bytearray) -> int:
+        if isinstance(value, str) and len(value) <= MAX_INTERNED_LENGTH:
+            return self.__string(value) << 2 | _STRING
+        if value is None:
+            return _CONSTANT
+        if value is False:
+            return 1 << 2 | _CONSTANT
+        if value is True:
+            return 2 << 2 | _CONSTANT
+        if isinstance(value, int) and 0 <= value <= _MAX_SLOT_VALUE:
+            return value << 2 | _SMALL_INT
+        offset = len(out)
+        if offset > _MAX_SLOT_VALUE:
+            raise ValueError("Document is too large for a board file!")
+        self.__encode(value, out)
+        return offset << 2 | _COMPLEX
+
+    def __container(self, tag: int, header: int, values: Any, count: int, out: bytearray):
+        out += _U32_PAIR.pack(tag, header)
+        slots_at = len(out)
+        out += bytes(4 * count)
+        slots = [self.__slot(value, out) for value in values]
+        _slots(count).pack_into(out, slots_at, *slots)
+
+    def __encode(self, value: Any, out: bytearray):
+        if isinstance(value, dict):
+            self.__container(_DICT, self.__shape(tuple(value)), value.values(), len(value), out)
+        elif isinstance(value, (list, tuple)):
+            self.__container(_LIST, len(value), value, len(value), out)
+        elif isinstance(value, str):
+            encoded = value.encode("utf-8")
+            out += _U32_PAIR.pack(_TEXT, len(encoded))
+            out += encoded
+        elif isinstance(value, int):
+            encoded = str(value).encode("ascii")
+            out += _U32_PAIR.pack(_INT, len(encoded))
+            out += encoded
+        elif isinstance(value, float):
+            out += _U32_PAIR.pack(_FLOAT, 0)
+            out += _FLOAT64.pack(value)
+        else:
+            raise TypeError(f"Type {type(value).__name__} can not be stored in a board!")
+
+    def write_document(self, table: str, doc_id: str, document: dict):
+        encoded = bytearray()
+        self.__encode(document, encoded)
+        body = _U32_PAIR.pack(self.__string(table), self.__string(str(doc_id))) + encoded
+        for column, key in zip(self.__columns__, COLUMNS):
+            value = document.get(key)
+            column.append(self.__string(value) if isinstance(value, str) else NO_STRING)
+
+        new_strings = [string.encode("utf-8") for string in self.__new_strings__]
+        lengths = [len(string) for string in new_strings]
+        definitions = bytearray(_slots(len(lengths) + 1).pack(len(lengths), *lengths))
+        string_offsets = list(accumulate(lengths, initial=len(definitions)))[:-1]
+        definitions += b"".join(new_strings)
+        definitions += _U32.pack(len(self.__new_shapes__))
+        shape_offsets = []
+        for shape in self.__new_shapes__:
+            shape_offsets.append(len(definitions))
+            definitions += _slots(len(shape) + 1).pack(len(shape), *shape)
+        self.__new_strings__.clear()
+        self.__new_shapes__.clear()
+
+        offset = self.__record(_DOCUMENT, bytes(definitions + body))
+        payload_offset = offset + _RECORD_HEADER.size
+        self.__string_offsets__.extend(payload_offset + pos for pos in string_offsets)
+        self.__string_lengths__.extend(lengths)
+        self.__shape_offsets__.extend(payload_offset + pos for pos in shape_offsets)
+        self.__document_tables__.append(self.__strings__[table])
+        self.__document_ids__.append(self.__strings__[str(doc_id)])
+        self.__document_offsets__.append(payload_offset + len(definitions))
+
+    def write_table(self, table: str):
+        """Writes a table without documents"""
+        self.__record(_TABLE, table.encode("utf-8"))
+
+    def write_tables(self, tables: dict[str, dict[str, dict]]):
+        for table, documents in tables.items():
+            if not documents:
+                self.write_table(table)
+            for doc_id, document in documents.items():
+                self.write_document(table, doc_id, document)
+
+    def __order_by(self, column: array) -> array:
+        strings = list(self.__strings__)
+        numbers = [number for number, sid in enumerate(column) if sid != NO_STRING]
+        # Stable sort: documents with the same value stay in file order
+        numbers.sort(key=lambda number: strings[column[number]])
+        return array("I", numbers)
+
+    def __tree_order(self) -> tuple[array, array, array]:
+        """Returns the documents in depth first order along the parent column, and the
+        position in that order and the number of descendants of every document"""
+        ids, parents = self.__columns__[0], self.__columns__[1]
+        n_documents = len(ids)
+        by_id: dict[int, int] = {}
+        for number, sid in enumerate(ids):
+            if sid != NO_STRING:
+                by_id.setdefault(sid, number)
+        children: dict[int, list[int]] = {}
+        roots = []
+        for number, parent_sid in enumerate(parents):
+            parent = by_id.get(parent_sid)
+            if parent is None or parent == number:
+                roots.append(number)
+            else:
+                children.setdefault(parent, []).append(number)
+
+        order = array("I")
+        positions = array("I", bytes(4 * n_documents))
+        sizes = array("I", bytes(4 * n_documents))
+        visited = bytearray(n_documents)
+        # Documents in a parent cycle are not reachable from a root
+        for start in (*roots, *range(n_documents)):
+            stack = [(start, False)]
+            while stack:
+                number, finished = stack.pop()
+                if finished:
+                    sizes[number] = len(order) - positions[number] - 1
+                    continue
+                if visited[number]:
+                    continue
+                visited[number] = 1
+                positions[number] = len(order)
+                order.append(number)
+                stack.append((number, True))
+                stack.extend(
+                    (child, False)
+                    for child in reversed(children.get(number, ()))
+                    if not visited[child]
+                )
+        return order, positions, sizes
+
+    def close(self):
+        tree_order, tree_positions, subtree_sizes = self.__tree_order()
+        categories, states = self.__columns__[2], self.__columns__[3]
+        tree_categories = array("I", (categories[number] for number in tree_order))
+        tree_states = array("I", (states[number] for number in tree_order))
+        id_order = self.__order_by(self.__columns__[0])
+        parent_order = self.__order_by(self.__columns__[1])
+        payload = bytearray(
+            _COUNTS.pack(
+                len(self.__string_offsets__),
+                len(self.__shape_offsets__),
+                len(self.__document_offsets__),
+                len(id_order),
+                len(parent_order),
+            )
+        )
+        for values in (
+            self.__string_offsets__,
+            self.__shape_offsets__,
+            self.__document_offsets__,
+            self.__string_lengths__,
+            self.__document_tables__,
+            self.__document_ids__,
+            *self.__columns__,
+            tree_positions,
+            subtree_sizes,
+            tree_categories,
+            tree_states,
+            id_order,
+            parent_order,
+        ):
+            payload += _little_endian(values)
+        index_offset = self.__record(_INDEX, bytes(payload))
+        self.__emit(_TRAILER.pack(index_offset, MAGIC))
+
+
+def decode_value(data: bytes | memoryview, pos: int, strings: Strings, shapes: Shapes) -> Any:
+    """Decodes the complex value (dictionary, list ...) starting at data[pos].
+
+    Offsets of nested complex values are relative to base, the start of the document.
+    """
+    return _decode(data, pos, pos, strings, shapes)
+
+
+def _decode(data: bytes | memoryview, base: int, pos: int, strings: Strings, shapes: Shapes) -> Any:
+    tag, header = _U32_PAIR.unpack_from(data, pos)
+    pos += 8
+    if tag == _DICT:
+        keys = shapes[header]
+        count = len(keys)
+    elif tag == _LIST:
+        count = header
+    elif tag == _TEXT:
+        return str(data[pos : pos + header], "utf-8")
+    elif tag == _INT:
+        return int(bytes(data[pos : pos + header]))
+    elif tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, pos)[0]
+    else:
+        raise ValueError(f"Invalid value tag {tag} in board file!")
+
+    values = [
+        (
+            strings[slot >> 2]
+            if not slot & 3
+            else (
+                _CONSTANTS[slot >> 2]
+                if slot & 3 == _CONSTANT
+                else (
+                    slot >> 2
+                    if slot & 3 == _SMALL_INT
+                    else _decode(data, base, base + (slot >> 2), strings, shapes)
+                )
+            )
+        )
+        for slot in _slots(count).unpack_from(data, pos)
+    ]
+    return dict(zip(keys, values)) if tag == _DICT else values
+
+
+def decode_shape(data: bytes | memoryview, pos: int, strings: Strings) -> tuple[str, ...]:
+    (length,) = _U32.unpack_from(data, pos)
+    return tuple(strings[sid] for sid in _slots(length).unpack_from(data, pos + 4))
+
+
+def decode_document(
+    data: bytes | memoryview, pos: int, strings: Strings, shapes: Shapes
+) -> tuple[str, str, dict]:
+    """Decodes the document at data[pos] (an offset from the index)"""
+    table_sid, doc_sid = _U32_PAIR.unpack_from(data, pos)
+    document = _decode(data, pos + 8, pos + 8, strings, shapes)
+    return strings[table_sid], strings[doc_sid], document
+
+
+def iter_documents(
+    stream: BinaryIO, on_table: Optional[Callable[[str], None]] = None
+) -> Iterator[tuple[str, str, dict]]:
+    """Reads a board front to back and yields (table, doc_id, document) tuples.
+
+    on_table is called with the name of every table that was written without documents.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a binary board file!")
+
+    strings: list[str] = []
+    shapes: list[tuple[str, ...]] = []
+    header_size = _RECORD_HEADER.size
+    while True:
+        header = stream.read(header_size)
+        if len(header) < header_size:
+            raise ValueError("Binary board file is truncated!")
+        length, kind = _RECORD_HEADER.unpack(header)
+        payload = stream.read(length - 1)
+        if len(payload) < length - 1:
+            raise ValueError("Binary board file is truncated!")
+
+        if kind == _INDEX:
+            return
+        if kind == _TABLE:
+            if on_table is not None:
+                on_table(str(payload, "utf-8"))
+            continue
+        if kind != _DOCUMENT:
+            raise ValueError(f"Invalid record kind {kind} in board file!")
+
+        (n_strings,) = _U32.unpack_from(payload, 0)
+        ends = list(
+            accumulate(_slots(n_strings).unpack_from(payload, 4), initial=4 + 4 * n_strings)
+        )
+        strings.extend(str(payload[start:end], "utf-8") for start, end in pairwise(ends))
+        pos = ends[-1]
+        (n_shapes,) = _U32.unpack_from(payload, pos)
+        pos += 4
+        for _ in range(n_shapes):
+            shape = decode_shape(payload, pos, strings)
+            shapes.append(shape)
+            pos += 4 * (len(shape) + 1)
+        yield decode_document(payload, pos, strings, shapes)
+
+
+def loads(data: bytes) -> dict[str, dict[str, dict]]:
+    tables: dict[str, dict[str, dict]] = {}
+
+    def add_table(table: str):
+        tables.setdefault(table, {})
+
+    for table, doc_id, document in iter_documents(io.BytesIO(data), add_table):
+        tables.setdefault(table, {})[doc_id] = document
+    return tables
+
+
+def dumps(tables: dict[str, dict[str, dict]]) -> bytes:
+    stream = io.BytesIO()
+    with BoardWriter(stream) as writer:
+        writer.write_tables(tables)
+    return stream.getvalue()
+
+
+def is_board_file(filename: str) -> bool:
+    """Checks whether filename is a binary board file (by its content, not its name)"""
+    try:
+        with open(filename, "rb") as board_file:
+            return board_file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class BoardIndex(NamedTuple):
+    """Offsets (in the file) of all strings, shapes and documents of a board file,
+    the COLUMNS of the documents and the numbers of the documents ordered by id and
+    by parent"""
+
+    string_offsets: Sequence[int]
+    shape_offsets: Sequence[int]
+    document_offsets: Sequence[int]
+    string_lengths: Sequence[int]
+    document_tables: Sequence[int]
+    document_ids: Sequence[int]
+    ids: Sequence[int]
+    parents: Sequence[int]
+    categories: Sequence[int]
+    states: Sequence[int]
+    tree_positions: Sequence[int]
+    subtree_sizes: Sequence[int]
+    tree_categories: Sequence[int]
+    tree_states: Sequence[int]
+    id_order: Sequence[int]
+    parent_order: Sequence[int]
+
+
+def read_index(data: bytes | memoryview) -> Optional[BoardIndex]:
+    """Reads the index at the end of a board file, None if the file has no valid index.
+
+    If data is a memoryview, the arrays of the index are views into it.
+    """
+    if len(data) < len(MAGIC) + _TRAILER.size or data[: len(MAGIC)] != MAGIC:
+        return None
+    index_offset, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+    if magic != MAGIC or index_offset > len(data) - _TRAILER.size - _RECORD_HEADER.size:
+        return None
+    length, kind = _RECORD_HEADER.unpack_from(data, index_offset)
+    if kind != _INDEX or length - 1 < _COUNTS.size:
+        return None
+    pos = index_offset + _RECORD_HEADER.size
+    n_strings, n_shapes, n_documents, n_ids, n_parents = _COUNTS.unpack_from(data, pos)
+    pos += _COUNTS.size
+    end = index_offset + _RECORD_HEADER.size + length - 1
+    sizes = (n_strings, n_shapes, n_documents)
+    n_per_document = 2 + len(COLUMNS) + 4
+    if (
+        pos + 8 * sum(sizes) + 4 * (n_strings + n_per_document * n_documents + n_ids + n_parents)
+        != end
+    ):
+        return None
+
+    arrays = []
+    layout: list[tuple[Literal["I", "Q"], int]] = [
+        *(("Q", size) for size in sizes),
+        ("I", n_strings),
+        *(("I", n_documents) for _ in range(n_per_document)),
+        ("I", n_ids),
+        ("I", n_parents),
+    ]
+    for typecode, count in layout:
+        size = array(typecode).itemsize * count
+        arrays.append(_from_little_endian(typecode, data[pos : pos + size]))
+        pos += size
+    return BoardIndex(*arrays)
+
+
+class _LazyCache(dict[int, Any]):
+    """Dictionary that loads missing values on first access"""
+
+    def __init__(self, load: Callable[[int], Any]):
+        super().__init__()
+        self.__load__ = load
+
+    def __missing__(self, key: int) -> Any:
+        value = self.__load__(key)
+        self[key] = value
+        return value
+
+
+class MappedBoard:
+    """Read-only view of a board file that decodes documents on first access.
+
+    The file is memory-mapped and only its index is read on opening, so opening takes
+    the same time for boards of every size. Strings, shapes and documents are decoded
+    (and cached) when they are accessed for the first time. Documents are identified
+    by their number (position in the file).
+
+    Raises ValueError if the file is not a binary board or has no valid index.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as board_file:
+            try:
+                self.__mmap__ = mmap.mmap(board_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise ValueError(f"{filename} is empty!") from error
+        self.__data__ = memoryview(self.__mmap__)
+        index = read_index(self.__data__)
+        if index is None:
+            self.close()
+            raise ValueError(f"{filename} is not a binary board with index!")
+        self.__board_index__: BoardIndex = index
+        self.__strings__ = _LazyCache(self.__string)
+        self.__shapes__ = _LazyCache(self.__shape)
+        self.__documents__ = _LazyCache(self.__document)
+
+    def __string(self, sid: int) -> str:
+        offset = self.__board_index__.string_offsets[sid]
+        return str(
+            self.__data__[offset : offset + self.__board_index__.string_lengths[sid]], "utf-8"
+        )
+
+    def __shape(self, shape_id: int) -> tuple[str, ...]:
+        return decode_shape(
+            self.__data__, self.__board_index__.shape_offsets[shape_id], self.__strings__
+        )
+
+    def __document(self, number: int) -> dict:
+        offset = self.__board_index__.document_offsets[number]
+        return decode_document(self.__data__, offset, self.__strings__, self.__shapes__)[2]
+
+    def __len__(self) -> int:
+        return len(self.__board_index__.document_offsets)
+
+    def document(self, number: int) -> dict:
+        """The decoded document; it is cached and must not be modified"""
+        return self.__documents__[number]
+
+    def doc_id(self, number: int) -> str:
+        return self.__strings__[self.__board_index__.document_ids[number]]
+
+    def table(self, number: int) -> str:
+        return self.__strings__[self.__board_index__.document_tables[number]]
+
+    def column(self, key: str, number: int) -> Optional[str]:
+        """The value of one of the COLUMNS of a document, without decoding the document"""
+        sid = self.__board_index__[COLUMNS.index(key) + 6][number]
+        return None if sid == NO_STRING else self.__strings__[sid]
+
+    def has_key(self, key: str) -> bool:
+        """Whether a document (or a dict within one) has key; only decodes the shapes"""
+        n_shapes = len(self.__board_index__.shape_offsets)
+        return any(key in self.__shapes__[shape_id] for shape_id in range(n_shapes))
+
+    def __equal_range(self, order: Sequence[int], column: Sequence[int], value: str) -> range:
+        def key(number: int) -> str:
+            return self.__strings__[column[number]]
+
+        start = bisect_left(order, value, key=key)
+        return range(start, bisect_right(order, value, lo=start, key=key))
+
+    def find(self, item_id: str) -> list[int]:
+        """Numbers of the documents with the given id"""
+        order = self.__board_index__.id_order
+        return [order[i] for i in self.__equal_range(order, self.__board_index__.ids, item_id)]
+
+    def children(self, parent_id: str) -> list[int]:
+        """Numbers of the documents with the given parent, in file order"""
+        order = self.__board_index__.parent_order
+        return [
+            order[i] for i in self.__equal_range(order, self.__board_index__.parents, parent_id)
+        ]
+
+    def descendants(self, number: int) -> Counter[tuple[Optional[str], Optional[str]]]:
+        """Counts the (category, state) pairs of all documents below a document"""
+        index = self.__board_index__
+        start = index.tree_positions[number] + 1
+        end = start + index.subtree_sizes[number]
+        pairs = Counter(zip(index.tree_categories[start:end], index.tree_states[start:end]))
+        strings = self.__strings__
+        return Counter(
+            {
+                (
+                    None if category == NO_STRING else strings[category],
+                    None if state == NO_STRING else strings[state],
+                ): count
+                for (category, state), count in pairs.items()
+            }
+        )
+
+    def first(self, key: str) -> Optional[int]:
+        """Number of the first document that has the key, e.g. "metadata"
+
+        Documents are decoded front to back until the key is found.
+        """
+        for number in range(len(self)):
+            if key in self.__documents__[number]:
+                return number
+        return None
+
+    @property
+    def n_decoded(self) -> int:
+        return len(self.__documents__)
+
+    def close(self):
+        if getattr(self, "__board_index__", None) is not None:
+            for values in self.__board_index__:
+                if isinstance(values, memoryview):
+                    values.release()
+        self.__board_index__ = None  # type: ignore
+        self.__data__.release()
+        self.__mmap__.close()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""Cache of the metadata and statistics of the registered boards.
+
+The catalog is a JSON file next to the settings. For every board file it holds the
+metadata, the number of projects, the milestone/task counts of the board and of
+every project, and the signature of the files the entry was computed from. An entry
+is valid as long as the signature matches, which takes a few stats per board to
+check. Journal and SQLite (WAL) boards write their saves to a journal or
+write-ahead log next to the board file and merge it only when they are closed or
+compacted, so the signature holds the mtime and size of the board file and of
+these files.
+
+    catalog = Catalog()
+    entry = catalog.get(filename)       # cached, possibly outdated
+    catalog.refresh_in_background(filenames, callback)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+from data import defaults
+from data import storages
+from data.data import NO_COUNTS
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+CATALOG_VERSION = 1
+
+Entry = dict[str, Any]
+# [mtime_ns, size] of a board file and of its companion files (see signature)
+Signature = list[Optional[list[int]]]
+
+
+def _stat(filename: str) -> Optional[list[int]]:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _companion_stat(filename: str) -> Optional[list[int]]:
+    # An empty journal or write-ahead log holds no changes. Reading an SQLite board
+    # read-only creates an empty write-ahead log that is left behind after closing.
+    stat = _stat(filename)
+    return stat if stat is not None and stat[1] > 0 else None
+
+
+def signature(filename: str) -> Optional[Signature]:
+    """[mtime_ns, size] of a board file and of its journals and write-ahead log
+    (see storages.COMPANION_SUFFIXES; None for those that do not exist or are empty),
+    None if the board file does not exist
+    """
+    board_stat = _stat(filename)
+    if board_stat is None:
+        return None
+    companions = (_companion_stat(filename + suffix) for suffix in storages.COMPANION_SUFFIXES)
+    return [board_stat, *companions]
+
+
+def summarize(board: Projectboard) -> Entry:
+    """Computes the catalog entry (without signature) of an open board"""
+    projects = {}
+    for pid in board.get_project_order()["project_order"]:
+        if board.get(pid) is not None:
+            projects[pid] = list(board.number_milestones_and_tasks(pid))
+    counts = [sum(project[i] for project in projects.values()) for i in range(len(NO_COUNTS))]
+    return {
+        "metadata": board.get_metadata(),
+        "n_projects": len(projects),
+        "counts": counts,
+        "projects": projects,
+    }
+
+
+def read_entry(filename: str) -> Optional[Entry]:
+    """Computes the catalog entry of a board file (without changing the file)"""
+    file_signature = signature(filename)
+    if file_signature is None:
+        return None
+    board = Projectboard("", filename, lazy=True, read_only=True)
+    try:
+        entry = summarize(board)
+    finally:
+        board.close()
+    entry["signature"] = file_signature
+    return entry
+
+
+class Catalog:
+    def __init__(self, filename: str = defaults.CATALOG_FILE):
+        self.__filename__ = os.path.expanduser(filename)
+        self.__entries__: dict[str, Entry] = {}
+        self.__lock__ = threading.Lock()
+        self.__modified__ = False
+        self.load()
+
+    def load(self):
+        """Reads the catalog file; a missing or broken file gives an empty catalog"""
+        try:
+            with open(self.__filename__, "rb") as catalog_file:
+                content = codec.loads(catalog_file.read())
+        except (OSError, ValueError):
+            content = {}
+        with self.__lock__:
+            if content.get("version") == CATALOG_VERSION:
+                self.__entries__ = content["boards"]
+            else:
+                self.__entries__ = {}
+            self.__modified__ = False
+
+    def save(self):
+        with self.__lock__:
+            if not self.__modified__:
+                return
+            content = codec.dumps({"version": CATALOG_VERSION, "boards": self.__entries__})
+            self.__modified__ = False
+        os.makedirs(os.path.dirname(self.__filename__), exist_ok=True)
+        storages.write_atomic(self.__filename__, content)
+
+    def get(self, filename: str) -> Optional[Entry]:
+        """The cached entry of a board, even if it is outdated (see is_valid)"""
+        with self.__lock__:
+            entry = self.__entries__.get(os.path.abspath(filename))
+        return None if entry is None else dict(entry)
+
+    def is_valid(self, filename: str) -> bool:
+        entry = self.get(filename)
+        return entry is not None and entry["signature"] == signature(filename)
+
+    def outdated(self, filenames: list[str]) -> list[str]:
+        return [filename for filename in filenames if not self.is_valid(filename)]
+
+    def __store(self, filename: str, entry: Optional[Entry]):
+        with self.__lock__:
+            key = os.path.abspath(filename)
+            if entry is None:
+                if self.__entries__.pop(key, None) is not None:
+                    self.__modified__ = True
+            else:
+                self.__entries__[key] = entry
+                self.__modified__ = True
+
+    def update(self, filename: str, board: Optional[Projectboard] = None) -> Optional[Entry]:
+        """Recomputes the entry of a board file.
+
+        If the board is open, pass it as board: the entry is computed from it instead
+        of reading the file. It has to be saved (not dirty), so it matches the file.
+        """
+        if board is None:
+            entry = read_entry(filename)
+        else:
+            assert not board.is_dirty()
+            entry = summarize(board)
+            entry["signature"] = signature(filename)
+        self.__store(filename, entry)
+        return entry
+
+    def close_board(self, board: Projectboard) -> Optional[Entry]:
+        """Closes a saved (not dirty) board and updates its entry from it.
+
+        The entry is computed before the board is closed, but the signature is taken
+        afterwards: closing a journal board compacts the journal into the board file.
+        """
+        assert not board.is_dirty()
+        filename = board.get_filename()
+        entry = summarize(board)
+        board.close()
+        entry["signature"] = signature(filename)
+        self.__store(filename, entry)
+        return entry
+
+    def remove(self, filename: str):
+        self.__store(filename, None)
+
+    def refresh(self, filenames: list[str], max_workers: Optional[int] = None) -> list[str]:
+        """Updates the outdated entries of filenames concurrently; returns their filenames"""
+        outdated = self.outdated(filenames)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.update, outdated))
+        return outdated
+
+    def refresh_in_background(
+        self, filenames: list[str], callback: Optional[Callable[[str], None]] = None
+    ) -> threading.Thread:
+        """Updates the outdated entries in a background thread and saves the catalog.
+
+        callback is called with the filename of every updated entry (from the
+        background thread).
+        """
+
+        def refresh():
+            for filename in self.outdated(filenames):
+                try:
+                    self.update(filename)
+                except (OSError, ValueError):
+                    # Unreadable board: keep the old entry
+                    continue
+                if callback is not None:
+                    callback(filename)
+            self.save()
+
+        thread = threading.Thread(target=refresh, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+"""JSON encoding and decoding of boards and settings.
+
+Uses orjson if it is installed and the json module of the standard library
+otherwise. Both produce the same compact UTF-8 bytes, so files written with either
+one can be read by the other.
+"""
+
+import json
+from types import ModuleType
+from typing import Any
+from typing import Optional
+
+_orjson: Optional[ModuleType]
+try:
+    import orjson as _orjson  # type: ignore  # pylint: disable=import-error
+except ImportError:  # pragma: no cover - depends on the environment
+    _orjson = None
+
+
+__encoder__ = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_json(obj: Any) -> bytes:
+    """dumps with the json module of the standard library"""
+    return __encoder__.encode(obj).encode("utf-8")
+
+
+def loads_json(data: bytes | str) -> Any:
+    """loads with the json module of the standard library"""
+    return json.loads(data)
+
+
+if _orjson is not None:
+    NAME = "orjson"
+    _orjson_dumps = _orjson.dumps
+    _OPT_NON_STR_KEYS = _orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return _orjson_dumps(obj, option=_OPT_NON_STR_KEYS)
+
+    loads = _orjson.loads
+else:
+    NAME = "json"
+    dumps = dumps_json
+    loads = loads_json
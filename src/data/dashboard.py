@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Status of all boards at a glance, computed in parallel.
+
+The summary of a board holds the number of projects per state, the finished and
+total milestones and tasks, and the unfinished items that are overdue (per
+category). Every board file is summarized by a worker process, so refreshing
+takes about as long as the largest boards per core. Summaries are cached in a
+JSON file next to the settings together with the signature of the board file and
+its journals or write-ahead log (see catalog.signature) and the day they were
+computed for (overdue items change with the date); unchanged boards are not read
+again.
+
+Headless, for all boards of a directory or the given files:
+
+    python -m data.dashboard ~/Documents/pyprojectboards/
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Iterable
+from typing import Optional
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+from data import dates
+from data import defaults
+from data import storages
+from data.catalog import signature
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+DASHBOARD_VERSION = 1
+BOARD_EXTENSIONS = (".json", ".sqlite", ".pbb")
+
+Summary = dict[str, Any]
+
+
+def summarize(board: Projectboard, today: int) -> Summary:
+    """Computes the summary of an open board with one pass over its items"""
+    states = board.get("custom_states")
+    finished = (states["states"] if states else defaults.DEFAULT_STATES)[-1]
+    projects: dict[str, int] = {}
+    # finished, total
+    counts = {"milestone": [0, 0], "task": [0, 0]}
+    overdue = {"project": 0, "milestone": 0, "task": 0}
+    for category, state, duedate in board.iter_values("category", "state", "duedate"):
+        if category == "project":
+            projects[state] = projects.get(state, 0) + 1
+        elif category in counts:
+            counts[category][0] += state == finished
+            counts[category][1] += 1
+        if category in overdue and state != finished:
+            due = dates.to_ordinal(duedate)
+            if due is not None and due < today:
+                overdue[category] += 1
+    return {
+        "name": board.get_metadata()["name"],
+        "projects": projects,
+        "milestones": counts["milestone"],
+        "tasks": counts["task"],
+        "overdue": overdue,
+    }
+
+
+def summarize_file(filename: str, today: int) -> Optional[Summary]:
+    """The summary (with signature) of a board file; None if it cannot be read.
+
+    Runs in the worker processes, so it only gets and returns plain data.
+    """
+    file_signature = signature(filename)
+    if file_signature is None:
+        return None
+    try:
+        board = Projectboard("", filename, lazy=True, read_only=True)
+    except (OSError, ValueError):
+        return None
+    try:
+        summary = summarize(board, today)
+    finally:
+        board.close()
+    summary["signature"] = file_signature
+    summary["today"] = today
+    return summary
+
+
+def total(summaries: Iterable[Summary]) -> Summary:
+    """The rollup of the summaries of several boards"""
+    result: Summary = {
+        "name": "Total",
+        "projects": {},
+        "milestones": [0, 0],
+        "tasks": [0, 0],
+        "overdue": {"project": 0, "milestone": 0, "task": 0},
+    }
+    for summary in summaries:
+        for state, n_projects in summary["projects"].items():
+            result["projects"][state] = result["projects"].get(state, 0) + n_projects
+        for key in ("milestones", "tasks"):
+            result[key] = [done + n for done, n in zip(result[key], summary[key])]
+        for category, n_overdue in summary["overdue"].items():
+            result["overdue"][category] += n_overdue
+    return result
+
+
+def board_files(paths: Iterable[str]) -> list[str]:
+    """The board files of paths; directories are replaced by the boards they contain"""
+    filenames: list[str] = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            filenames.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(BOARD_EXTENSIONS)
+            )
+        else:
+            filenames.append(path)
+    return filenames
+
+
+class Dashboard:
+    def __init__(self, filename: Optional[str] = defaults.DASHBOARD_FILE):
+        """Cache of board summaries stored in filename (None: not stored)"""
+        self.__filename__ = None if filename is None else os.path.expanduser(filename)
+        self.__summaries__: dict[str, Summary] = {}
+        self.__lock__ = threading.Lock()
+        self.__modified__ = False
+        self.load()
+
+    def load(self):
+        """Reads the cache file; a missing or broken file gives an empty cache"""
+        content = {}
+        if self.__filename__ is not None:
+            try:
+                with open(self.__filename__, "rb") as cache_file:
+                    content = codec.loads(cache_file.read())
+            except (OSError, ValueError):
+                content = {}
+        with self.__lock__:
+            if content.get("version") == DASHBOARD_VERSION:
+                self.__summaries__ = content["boards"]
+            else:
+                self.__summaries__ = {}
+            self.__modified__ = False
+
+    def save(self):
+        if self.__filename__ is None:
+            return
+        with self.__lock__:
+            if not self.__modified__:
+                return
+            content = codec.dumps({"version": DASHBOARD_VERSION, "boards": self.__summaries__})
+            self.__modified__ = False
+        os.makedirs(os.path.dirname(self.__filename__), exist_ok=True)
+        storages.write_atomic(self.__filename__, content)
+
+    def get(self, filename: str) -> Optional[Summary]:
+        """The cached summary of a board, even if it is outdated"""
+        with self.__lock__:
+            return self.__summaries__.get(os.path.abspath(filename))
+
+    def outdated(self, filenames: Iterable[str], today: int) -> list[str]:
+        outdated = []
+        for filename in filenames:
+            summary = self.get(filename)
+            if (
+                summary is None
+                or summary["today"] != today
+                or summary["signature"] != signature(filename)
+            ):
+                outdated.append(filename)
+        return outdated
+
+    def refresh(
+        self,
+        filenames: Iterable[str],
+        today: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> dict[str, Summary]:
+        """Recomputes the outdated summaries in worker processes and saves the cache.
+
+        Returns the summaries of all readable boards of filenames (in this order).
+        """
+        filenames = list(filenames)
+        if today is None:
+            today = dates.today()
+        outdated = self.outdated(filenames, today)
+        if len(outdated) == 1 or max_workers == 1:
+            # Not worth starting processes
+            summaries = [summarize_file(filename, today) for filename in outdated]
+        elif outdated:
+            if max_workers is None:
+                max_workers = min(len(outdated), os.cpu_count() or 1)
+            # Forking is not safe in threaded programs (like the GUI)
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+                summaries = list(executor.map(summarize_file, outdated, [today] * len(outdated)))
+        else:
+            summaries = []
+
+        with self.__lock__:
+            for filename, summary in zip(outdated, summaries):
+                key = os.path.abspath(filename)
+                if summary is not None:
+                    self.__summaries__[key] = summary
+                    self.__modified__ = True
+                elif self.__summaries__.pop(key, None) is not None:
+                    self.__modified__ = True
+        self.save()
+
+        result = {}
+        for filename in filenames:
+            summary = self.get(filename)
+            if summary is not None:
+                result[filename] = summary
+        return result
+
+
+def table_rows(summaries: dict[str, Summary]) -> list[list[str]]:
+    """The header and rows of a table of the summaries, with the total as last row"""
+    states: dict[str, None] = {}
+    for summary in summaries.values():
+        states.update(dict.fromkeys(summary["projects"]))
+    rows = [["Board", *states, "Milestones", "Tasks", "Overdue"]]
+    for summary in [*summaries.values(), total(summaries.values())]:
+        milestones_done, n_milestones = summary["milestones"]
+        tasks_done, n_tasks = summary["tasks"]
+        rows.append(
+            [
+                summary["name"],
+                *(str(summary["projects"].get(state, 0)) for state in states),
+                f"{milestones_done}/{n_milestones}",
+                f"{tasks_done}/{n_tasks}",
+                str(sum(summary["overdue"].values())),
+            ]
+        )
+    return rows
+
+
+def format_table(summaries: dict[str, Summary]) -> list[str]:
+    """The lines of a text table of the summaries (see table_rows)"""
+    rows = table_rows(summaries)
+    widths = [max(len(row[i_col]) for row in rows) for i_col in range(len(rows[0]))]
+    return [
+        "  ".join(
+            col.ljust(width) if i_col == 0 else col.rjust(width)
+            for i_col, (col, width) in enumerate(zip(row, widths))
+        )
+        for row in rows
+    ]
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Shows the status of several projectboards")
+    parser.add_argument(
+        "paths", nargs="*", default=[defaults.DATA_DIR], help="board files or directories"
+    )
+    parser.add_argument("--workers", type=int, help="number of processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="summarize all boards again")
+    args = parser.parse_args(argv)
+    dashboard = Dashboard(None if args.no_cache else defaults.DASHBOARD_FILE)
+    summaries = dashboard.refresh(board_files(args.paths), max_workers=args.workers)
+    for line in format_table(summaries):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
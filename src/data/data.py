@@ -22,20 +22,37 @@
 # pylint: disable=missing-docstring
 
 import os
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any
+from typing import Callable
 from typing import List
 from typing import Optional
-from typing import Tuple
+from typing import Self
 
 # pylint: disable=import-error
 from tinydb import Query
 from tinydb import TinyDB
-from tinydb.middlewares import CachingMiddleware
-from tinydb.storages import JSONStorage
 from tinydb.storages import MemoryStorage
 
-from data import defaults  # type: ignore
+from data import boardfile  # type: ignore
+from data import dates  # type: ignore
+from data import history  # type: ignore
+from data import ids  # type: ignore
+from data import ranks  # type: ignore
+from data import storages  # type: ignore
+from data.database import BoardDatabase  # type: ignore
+from data.database import copy_document
+from data.item import Item  # type: ignore
+from data.item_index import NO_COUNTS  # type: ignore
+from data.item_index import RANK_KEY
+from data.item_index import Counts
+from data.item_index import ItemIndex
+from data.item_index import sum_counts
 
 # pylint: enable=import-error
 
@@ -45,66 +62,356 @@ cat_values = {
     "milestone": 2,
     "task": 3,
 }
-
-
-class Projectboard:
-    def __init__(self, name: str, filename: str, db_in_memory: bool = False):
+# Called with (item_id, old, new), see Projectboard.observe
+Observer = Callable[[Optional[str], Optional[dict], Optional[dict]], None]
+
+
+# The board is the interface of the GUI and the data modules to all board operations;
+# its indexes are kept by data.item_index
+class Projectboard:  # pylint: disable=too-many-public-methods
+    def __init__(
+        self,
+        name: str,
+        filename: str,
+        db_in_memory: bool = False,
+        *,
+        backend: Optional[str] = None,
+        lazy: bool = False,
+        read_only: bool = False,
+        undo_bytes: int = history.UNDO_BYTES,
+    ):
+        """Opens (or creates) the board stored in filename.
+
+        The storage backend ("json", "journal", "sqlite" or "binary", see
+        data.storages) is derived from the file (extension) unless it is given
+        explicitly.
+
+        With lazy, a binary board is memory-mapped instead of read (see
+        boardfile.MappedBoard): items are decoded when they are accessed and the
+        in-memory indexes are not built, so opening does not depend on the size of
+        the board. The first change loads the complete board. Other backends ignore
+        lazy.
+
+        Changing a board that is opened read_only raises a ValueError; the file is
+        never written.
+
+        The changes can be undone (see undo) as long as their history does not
+        exceed about undo_bytes; older changes are forgotten first. With 0, no
+        history is kept.
+        """
         self.__name__ = name
         self.__filename__ = filename
-        if db_in_memory:
-            self.__database__ = TinyDB(storage=MemoryStorage)
+        self.__read_only__ = read_only
+        self.__mapped__: Optional[boardfile.MappedBoard] = None
+        if backend is None:
+            backend = "json" if db_in_memory else storages.detect_backend(filename)
+        # Replaced by the indexes of the database once the board is loaded
+        self.__index__ = ItemIndex()
+        self.__observers__: list[Observer] = []
+        self.__history__: Optional[history.History] = None
+        if undo_bytes > 0 and not read_only:
+            self.__history__ = history.History(undo_bytes)
+
+        if lazy and backend == "binary" and not db_in_memory and os.path.exists(filename):
+            try:
+                self.__mapped__ = boardfile.MappedBoard(filename)
+            except ValueError:
+                # Empty or written without index, e.g. by an interrupted save
+                self.__mapped__ = None
+        if self.__mapped__ is None:
+            self.__open_database(backend, db_in_memory)
+            return
+
+        if not self.__name__:
+            self.__name__ = self.get_metadata()["name"]
+        states = self.get("custom_states")
+        if states is not None:
+            self.__index__.states.finished = states["states"][-1]
+
+    @property
+    def __database__(self) -> BoardDatabase:
+        return self.__index__.database
+
+    def __open_database(self, backend: str, in_memory: bool):
+        storage = storages.create_storage(backend, in_memory)
+
+        if in_memory:
+            path = [storages.SQLITE_MEMORY] if backend == "sqlite" else []
+            database = BoardDatabase(*path, storage=storage)
+        elif self.__read_only__:
+            # The file is read once and never written
+            database = BoardDatabase(storage=MemoryStorage)
+            if os.path.exists(self.__filename__):
+                database.storage.write(storages.read_tables(self.__filename__))
         else:
-            dirname = os.path.dirname(filename)
+            dirname = os.path.dirname(self.__filename__)
             os.makedirs(dirname, exist_ok=True)
-            self.__database__ = TinyDB(filename, storage=CachingMiddleware(JSONStorage))
+            database = BoardDatabase(self.__filename__, storage=storage)
 
         query = Query()
-        metadata = self.__database__.get(query.metadata.exists())
+        metadata = database.get(query.metadata.exists())
 
         if metadata is None:
-            metadata = {
-                "metadata": {
-                    "filename": self.__filename__,
-                    "name": self.__name__,
-                    "description": "",
-                }
-            }
-            self.__database__.insert(metadata)
+            database.insert({"metadata": self.__default_metadata()})
         elif not self.__name__:
             self.__name__ = metadata["metadata"]["name"]
 
-        project_order = self.__database__.get(query.project_order.exists())
+        project_order = database.get(query.project_order.exists())
         if project_order is None:
-            self.__database__.insert({"project_order": []})
+            database.insert({"project_order": []})
+
+        self.__index__ = ItemIndex(database)
+        if not self.__read_only__:
+            self.__migrate_dates()
+
+    def __migrate_dates(self):
+        """Converts the dates of older boards (text) to ordinals, with one write"""
+        doc_ids = [
+            doc.doc_id
+            for doc in self.__database__
+            if "category" in doc and dates.normalize(dict(doc))
+        ]
+        if doc_ids:
+            self.__database__.update(dates.normalize, doc_ids=doc_ids)
+
+    def __default_metadata(self) -> dict[str, str]:
+        return {"filename": self.__filename__, "name": self.__name__, "description": ""}
+
+    def __prepare_write(self):
+        """Makes sure the board can be changed: loads a lazily opened board"""
+        if self.__read_only__:
+            raise ValueError(f"Board {self.__filename__} is opened read-only!")
+        if self.__mapped__ is not None:
+            self.__mapped__.close()
+            self.__mapped__ = None
+            self.__open_database("binary", False)
+
+    @property
+    def is_lazy(self) -> bool:
+        """True as long as a lazily opened board has not been loaded completely"""
+        return self.__mapped__ is not None
+
+    def reindex(self):
+        """Rebuilds the in-memory indexes with a single pass over the database.
+
+        Only needed if the database has been modified without going through the
+        methods of this class. The observers are told that everything may have
+        changed.
+        """
+        if self.__mapped__ is not None:
+            return
+        self.__index__ = ItemIndex(self.__database__)
+        if self.__history__ is not None:
+            # Changes made without this class cannot be undone
+            self.__history__.clear()
+        self.__notify(None, None, None)
 
     def close(self):
+        if self.__mapped__ is not None:
+            self.__mapped__.close()
+            self.__mapped__ = None
+            return
         self.__database__.close()
 
-    def insert(self, data: dict):
+    @contextmanager
+    def batch(self) -> Iterator[Self]:
+        """Groups several changes into one write to the storage.
+
+        If an exception is raised inside of the outermost batch, all changes made
+        within the batch are rolled back. Batches can be nested.
+
+            with board.batch():
+                board.insert_sub_item(task, milestone)
+                board.delete("T1")
+        """
+        self.__prepare_write()
+        table = self.__database__.default_table
+        outermost = not table.in_batch
+        try:
+            with table.batch():
+                yield self
+        except BaseException:
+            if outermost:
+                self.__index__ = ItemIndex(self.__database__)
+                if self.__history__ is not None:
+                    self.__history__.discard()
+                self.__notify(None, None, None)
+            raise
+        if outermost and self.__history__ is not None:
+            # All changes of the outermost batch are undone together
+            self.__history__.commit()
+
+    @property
+    def history(self) -> Optional[history.History]:
+        """The undo history (None if it is disabled)"""
+        return self.__history__
+
+    def can_undo(self) -> bool:
+        return self.__history__ is not None and self.__history__.can_undo()
+
+    def can_redo(self) -> bool:
+        return self.__history__ is not None and self.__history__.can_redo()
+
+    def undo(self) -> bool:
+        """Undoes the last change (insert, delete, move or batch); False if there is none"""
+        return self.__replay(undo=True)
+
+    def redo(self) -> bool:
+        """Redoes the last undone change; False if there is none"""
+        return self.__replay(undo=False)
+
+    def __replay(self, undo: bool) -> bool:
+        if self.__history__ is None:
+            return False
+        self.__prepare_write()
+        steps = self.__history__
+        step = steps.pop_undo() if undo else steps.pop_redo()
+        if step is None:
+            return False
+        try:
+            with steps.paused(), self.batch():
+                for delta in reversed(step) if undo else step:
+                    if isinstance(delta, history.OrderDelta):
+                        order = self.__database__.get(doc_id=self.__database__.order_doc_id)
+                        order = {"project_order": delta.apply(order["project_order"], undo)}
+                        self.__write_order(order)
+                    else:
+                        document = self.__stored(delta.item_id)
+                        self.__write_item(delta.item_id, delta.apply(document, undo))
+        except BaseException:
+            # Rolled back, so the step can be tried again
+            (steps.push_undo if undo else steps.push_redo)(step)
+            raise
+        (steps.push_redo if undo else steps.push_undo)(step)
+        return True
+
+    def insert(self, data: dict | Item):
+        if isinstance(data, Item):
+            data = data.to_dict()
         assert "id" in data
         assert "category" in data
 
-        query_item = Query()
+        with self.batch():
+            self.__insert(data)
 
-        if data["category"] == "project":
-            p_order = self.get_project_order()
+    def observe(self, callback: Observer):
+        """Registers callback(item_id, old, new), called after every change of an item.
+
+        old is None for new items and new is None for deleted items. Both are copies
+        and can be kept. After a rolled back batch (or reindex) callback is called
+        with (None, None, None): any item may have changed.
+        """
+        self.__observers__.append(callback)
 
-            if data["id"] not in p_order["project_order"]:
-                p_order["project_order"].append(data["id"])
-                p_order_query = query_item.project_order.exists()
-                self.__database__.upsert(p_order, p_order_query)
+    def unobserve(self, callback: Observer):
+        if callback in self.__observers__:
+            self.__observers__.remove(callback)
 
-        self.__database__.upsert(data, query_item.id == data["id"])
+    def __notify(self, item_id: Optional[str], old: Optional[dict], new: Optional[dict]):
+        if self.__history__ is not None and item_id is not None:
+            self.__history__.record(item_id, old, new)
+        for callback in list(self.__observers__):
+            callback(item_id, old, new)
+
+    def __insert(self, data: dict):
+        item_id = data["id"]
+        if data["category"] == "project" and not self.__index__.in_order(item_id):
+            p_order = self.get_project_order()
+            p_order["project_order"].append(item_id)
+            self.set_project_order(p_order)
+
+        if "sub_items" in data:
+            self.__drop_ranks(data["sub_items"])
+        keep_rank = RANK_KEY in data
+        data = copy_document(data)
+        dates.normalize(data)
+        stored = self.__index__.get(item_id)
+        if stored is not None:
+            data = {**stored, **data}
+            moved = (data.get("parent") or None) != (stored.get("parent") or None)
+            if moved and data["category"] != "project" and not keep_rank:
+                # The rank only holds among the siblings it leaves
+                data.pop(RANK_KEY, None)
+        self.__write_item(item_id, data)
+
+    def __write_item(self, item_id: str, document: Optional[dict]):
+        """Replaces (or with None deletes) the document of an item, see ItemIndex.write"""
+        old = self.__index__.write(item_id, document)
+        if old is None and document is None:
+            return
+        if self.__observers__ or self.__history__ is not None:
+            old_copy = None if old is None else copy_document(old)
+            self.__notify(item_id, old_copy, self.__stored(item_id))
 
     def get(self, item_id: str) -> Optional[dict[str, Any]]:
-        query = Query()
-        n_items = self.__database__.count(query.id == item_id)
-        if n_items == 0:
+        """A copy of the item; its sub_items are in order (see move_item_by)"""
+        document = self.__stored(item_id)
+        if document is None:
             return None
-        if n_items > 1:
-            raise ValueError("Too many entries with same id in database!")
-
-        return self.__database__.get(query.id == item_id)
+        if document.get("sub_items"):
+            document["sub_items"] = self.__ordered(document["sub_items"])
+        return document
+
+    def __stored(self, item_id: str) -> Optional[dict[str, Any]]:
+        """A copy of the stored item (the sub_items as stored, not in order)"""
+        if self.__mapped__ is not None:
+            number = self.__find_mapped(item_id)
+            return None if number is None else copy_document(self.__mapped__.document(number))
+
+        document = self.__index__.get(item_id)
+        return None if document is None else copy_document(document)
+
+    def new_id(self) -> str:
+        """A new id (see generate_id) that is not used by an item of this board yet"""
+        while True:
+            item_id = generate_id()
+            if self.get(item_id) is None:
+                return item_id
+
+    def get_item(self, item_id: str) -> Optional[Item]:
+        """Like get, but returns the item as (compact) Item"""
+        if self.__mapped__ is not None:
+            number = self.__find_mapped(item_id)
+            if number is None:
+                return None
+            item = Item.from_dict(self.__mapped__.document(number))
+        else:
+            document = self.__index__.get(item_id)
+            if document is None:
+                return None
+            item = Item.from_dict(document)
+
+        if item.sub_items:
+            item.sub_items = self.__ordered(item.sub_items)
+        return item
+
+    def iter_items(self) -> Iterator[Item]:
+        """All projects, milestones and tasks of the board as Items (the sub_items as
+        stored, see get)
+        """
+        for document in self.__iter_documents():
+            if "category" in document:
+                yield Item.from_dict(document)
+
+    def iter_values(self, *keys: str) -> Iterator[tuple]:
+        """The values of keys (None if missing) of all projects, milestones and tasks.
+
+        Faster than iter_items for reading a few keys of all items. The values are not
+        copied and must not be changed.
+        """
+        for document in self.__iter_documents():
+            if "category" in document:
+                yield tuple(document.get(key) for key in keys)
+
+    def __iter_documents(self) -> Iterator[Mapping]:
+        """All documents of the default table (without copying them)"""
+        if self.__mapped__ is not None:
+            mapped = self.__mapped__
+            for number in range(len(mapped)):
+                if mapped.table(number) == TinyDB.default_table_name:
+                    yield mapped.document(number)
+        else:
+            yield from self.__database__
 
     def insert_sub_item(self, sub_item: dict, parent: dict):
         cat_value_sub_item = cat_values[sub_item["category"]]
@@ -116,56 +423,236 @@ class Projectboard:
             sub_item["parent"] = parent["id"]
             parent["sub_items"].append(sub_item["id"])
 
-        self.insert(sub_item)
-        self.insert(parent)
+        with self.batch():
+            self.insert(sub_item)
+            self.insert(parent)
+
+    def insert_many(self, items: Iterable[dict | Item]):
+        """Inserts many new projects, milestones and tasks with one write to the storage.
+
+        The items can come in any order. Each item names its parent (an item of items
+        or of the board) by "parent"; the sub_items of the parents and the project
+        order are completed accordingly. Raises a ValueError before anything is changed
+        if an id is missing or already used, if a category is unknown or if a parent is
+        missing or cannot have the item as sub item (see cat_values).
+        """
+        self.__prepare_write()
+        documents: dict[str, dict] = {}
+        for data in items:
+            document = data.to_dict() if isinstance(data, Item) else copy_document(data)
+            item_id = document.get("id")
+            if item_id is None or document.get("category") not in cat_values:
+                raise ValueError(f"Item {item_id!r} needs an id and a known category!")
+            if item_id in documents or self.__index__.doc_id(item_id) is not None:
+                raise ValueError(f"Item with id {item_id!r} exists already!")
+            dates.normalize(document)
+            documents[item_id] = document
+
+        sub_items: dict[str, list[str]] = {}
+        for item_id, document in documents.items():
+            parent_id = document.get("parent")
+            if parent_id is None:
+                continue
+            parent: Optional[Mapping[str, Any]] = documents.get(parent_id)
+            if parent is None:
+                parent = self.__index__.get(parent_id)
+            if parent is None:
+                raise ValueError(f"Parent {parent_id!r} of {item_id!r} does not exist!")
+            parent_value = cat_values.get(parent.get("category", ""))
+            if parent_value is None or parent_value >= cat_values[document["category"]]:
+                raise ValueError(f"{item_id!r} cannot be a sub item of {parent_id!r}!")
+            sub_items.setdefault(parent_id, []).append(item_id)
+
+        with self.batch():
+            self.__insert_documents(documents, sub_items)
+
+    def __insert_documents(self, documents: dict[str, dict], sub_items: dict[str, list[str]]):
+        """Writes validated new items and adds them to the sub_items of their parents"""
+        changed_parents = []
+        for parent_id, child_ids in sub_items.items():
+            parent = documents.get(parent_id)
+            if parent is None:
+                parent = self.get(parent_id)
+                changed_parents.append(parent)
+            listed = parent.setdefault("sub_items", [])  # type: ignore
+            known = set(listed)
+            listed.extend(child_id for child_id in child_ids if child_id not in known)
+
+        self.__index__.insert(documents)
+        if self.__observers__ or self.__history__ is not None:
+            for item_id, document in documents.items():
+                self.__notify(item_id, None, copy_document(document))
+
+        for parent in changed_parents:
+            self.__write_item(parent["id"], parent)  # type: ignore
+
+        projects = [
+            item_id
+            for item_id, document in documents.items()
+            if document["category"] == "project" and not self.__index__.in_order(item_id)
+        ]
+        if projects:
+            p_order = self.get_project_order()
+            p_order["project_order"].extend(projects)
+            self.set_project_order(p_order)
 
     def delete(self, item_id: str):
-        query = Query()
-
-        parent = self.__database__.search(query.sub_items.any(item_id))
-        for par in parent:
-            par["sub_items"].remove(item_id)
-            self.insert(par)
-
-        projects = self.__database__.search(query.project_order.any(item_id))
-        if projects:
-            projects[0]["project_order"].remove(item_id)
-            self.set_project_order(projects[0])
+        with self.batch():
+            self.__delete(item_id)
+
+    def __delete(self, item_id: str):
+        containers = list(self.__index__.member_of.get(item_id, ()))
+        for parent_id in containers:
+            if parent_id is None:
+                continue
+            parent = self.get(parent_id)
+            assert parent is not None
+            parent["sub_items"].remove(item_id)
+            self.insert(parent)
+
+        if None in containers:
+            p_order = self.get_project_order()
+            p_order["project_order"].remove(item_id)
+            self.set_project_order(p_order)
 
-        self.__database__.remove(query.id == item_id)
+        self.__write_item(item_id, None)
 
     def delete_subelements(self, item_id: str, delete_item: bool = False):
-        """Deletes all sub items and their sub items recursively"""
-        query = Query()
-        children = self.__database__.search(query.parent == item_id)
-
-        for child in children:
-            self.delete_subelements(child["id"], True)
-
-        if delete_item:
-            self.delete(item_id)
+        """Deletes all sub items and their sub items (and optionally the item itself).
+
+        The subtree is collected iteratively and removed with a single write. The
+        sub_items lists of the remaining items and the project order are fixed up
+        with one write each.
+        """
+        self.__prepare_write()
+        item_ids = self.__index__.subtree(item_id)
+        if delete_item and self.__index__.doc_id(item_id) is not None:
+            item_ids.insert(0, item_id)
+        if not item_ids:
+            return
+
+        with self.batch():
+            self.__delete_items(item_ids)
+
+    def __delete_items(self, item_ids: list[str]):
+        index = self.__index__
+        items = {sid: self.__database__.get(doc_id=index.ids[sid]) for sid in item_ids}
+
+        containers = {
+            container_id
+            for sid in items
+            for container_id in index.member_of.get(sid, ())
+            if container_id not in items
+        }
+        self.__remove_sub_items([cid for cid in containers if cid is not None], items)
+        if None in containers:
+            p_order = self.get_project_order()
+            p_order["project_order"] = [pid for pid in p_order["project_order"] if pid not in items]
+            self.set_project_order(p_order)
+
+        index.remove(items)
+        if self.__observers__ or self.__history__ is not None:
+            for sid, item in items.items():
+                self.__notify(sid, copy_document(item), None)
+
+    def __remove_sub_items(self, container_ids: list[str], items: Mapping[str, Any]):
+        """Removes items from the sub_items of the containers with one write"""
+        if not container_ids:
+            return
+
+        def remove_sub_items(doc: dict):
+            doc["sub_items"] = [sid for sid in doc["sub_items"] if sid not in items]
+
+        watched = self.__observers__ or self.__history__ is not None
+        old_containers = {cid: self.__stored(cid) for cid in container_ids} if watched else {}
+        doc_ids = [self.__index__.ids[container_id] for container_id in container_ids]
+        self.__database__.update(remove_sub_items, doc_ids=doc_ids)
+        for container_id, old in old_containers.items():
+            self.__notify(container_id, old, self.__stored(container_id))
+
+    def __dates(self) -> dates.DateIndex:
+        """The date index, built with one pass over the board on first use"""
+        states = self.__index__.states
+        if states.date_index is None:
+            states.date_index = dates.DateIndex(
+                (document["id"], dates.interval(document), states.is_finished(document))
+                for document in self.__iter_documents()
+                if "id" in document and "category" in document
+            )
+        return states.date_index
+
+    def overdue(self, today: Any = None) -> list[str]:
+        """Ids of the unfinished items due before today, sorted by due date"""
+        day = dates.today() if today is None else dates.to_ordinal(today)
+        if day is None:
+            raise ValueError(f"Invalid date {today!r}!")
+        return self.__dates().due_between(0, day - 1)
+
+    def due_soon(self, days: int, today: Any = None) -> list[str]:
+        """Ids of the unfinished items due within the next days (today included)"""
+        day = dates.today() if today is None else dates.to_ordinal(today)
+        if day is None:
+            raise ValueError(f"Invalid date {today!r}!")
+        return self.__dates().due_between(day, day + days)
+
+    def in_window(self, first: Any, last: Any) -> list[str]:
+        """Ids of the items whose [startdate, duedate] overlaps [first, last], by start date
+
+        Dates can be given as ordinals, datetime.date or ISO text.
+        """
+        first_day, last_day = dates.to_ordinal(first), dates.to_ordinal(last)
+        if first_day is None or last_day is None:
+            raise ValueError(f"Invalid window {first!r} - {last!r}!")
+        return self.__dates().overlapping(first_day, last_day)
 
     def get_project_order(self) -> dict:
-        query_item = Query()
-        p_order_query = query_item.project_order.exists()
-        p_order = self.__database__.get(p_order_query)
-        return p_order
+        """The project order ({"project_order": [ids]}), sorted by rank (see move_item_by)"""
+        if self.__mapped__ is not None:
+            number = self.__mapped__.first("project_order")
+            if number is None:
+                return {"project_order": []}
+            project_order = copy_document(self.__mapped__.document(number))
+        else:
+            database = self.__database__
+            project_order = copy_document(database.get(doc_id=database.order_doc_id))
+        project_order["project_order"] = self.__ordered(project_order["project_order"])
+        return project_order
 
     def set_project_order(self, project_order: dict):
-        query_item = Query()
-        p_order_query = query_item.project_order.exists()
-        self.__database__.upsert(project_order, p_order_query)
+        """Stores the project order; the ranks of the projects are removed if they
+        contradict it
+        """
+        self.__prepare_write()
+        project_order = copy_document(project_order)
+        with self.batch():
+            self.__drop_ranks(project_order["project_order"])
+            self.__write_order(project_order)
+
+    def __write_order(self, project_order: dict):
+        database = self.__database__
+        old = database.get(doc_id=database.order_doc_id)["project_order"]
+        if self.__history__ is not None:
+            self.__history__.record_order(old, project_order["project_order"])
+        self.__index__.set_order(old, project_order["project_order"])
+        with self.batch():
+            database.update(project_order, doc_ids=[database.order_doc_id])
 
     def move_item_by(self, item_id: str, n_pos: int, mv_sub_item: bool = False):
-        if mv_sub_item:
-            self.__move_subitem(item_id, n_pos)
-        else:
-            self.__move_project(item_id, n_pos)
+        """Moves a project (or with mv_sub_item a sub item) by n_pos places.
+
+        Only the rank of the item is written (see data.ranks): the project order and the
+        sub_items of the parent are sorted by rank when they are read. Siblings without
+        rank (added since the last move) are ranked first, and if the ranks get too long,
+        all siblings are ranked anew.
+        """
+        with self.batch():
+            if mv_sub_item:
+                self.__move_subitem(item_id, n_pos)
+            else:
+                self.__move_project(item_id, n_pos)
 
     def __move_project(self, item_id: str, n_pos: int):
-        project_order = self.get_project_order()
-        move_item_in_list_by_n(item_id, project_order["project_order"], n_pos)
-        self.set_project_order(project_order)
+        self.__move_rank(self.get_project_order()["project_order"], item_id, n_pos)
 
     def __move_subitem(self, sub_item_id: str, n_pos: int):
         sub_item = self.get(sub_item_id)
@@ -177,22 +664,121 @@ class Projectboard:
         if parent is None:
             raise KeyError(f"Parent item ({parent_id}) does not exist!")
 
-        parent_items = parent["sub_items"]
-        move_item_in_list_by_n(sub_item_id, parent_items, n_pos)
-        self.insert(parent)
+        self.__move_rank(parent["sub_items"], sub_item_id, n_pos)
+
+    def __move_rank(self, order: list, item_id: str, n_pos: int):
+        """Moves item_id by n_pos within order (its siblings, sorted) by changing its rank"""
+        assert item_id in order
+        order = [sid for sid in order if self.__index__.doc_id(sid) is not None]
+        old_idx = order.index(item_id)
+        new_idx = min(max(old_idx + n_pos, 0), len(order) - 1)
+        if new_idx == old_idx:
+            return
+
+        # Siblings without rank come last (see __ordered)
+        item_ranks = self.__index__.ranks
+        n_unranked = sum(1 for sid in order if sid not in item_ranks)
+        if n_unranked:
+            last = order[-n_unranked - 1] if n_unranked < len(order) else None
+            new_ranks = ranks.spread(n_unranked, None if last is None else item_ranks[last])
+            for sid, rank in zip(order[-n_unranked:], new_ranks):
+                if sid != item_id:
+                    self.__set_rank(sid, rank)
+
+        order.insert(new_idx, order.pop(old_idx))
+        before = item_ranks[order[new_idx - 1]] if new_idx > 0 else None
+        after = item_ranks[order[new_idx + 1]] if new_idx + 1 < len(order) else None
+        if before is None or after is None or before < after:
+            rank = ranks.between(before, after)
+            if len(rank) <= ranks.MAX_LENGTH:
+                self.__set_rank(item_id, rank)
+                return
+
+        # Too long (or siblings with the same rank): spread out all ranks
+        for sid, rank in zip(order, ranks.spread(len(order))):
+            if item_ranks.get(sid) != rank:
+                self.__set_rank(sid, rank)
+
+    def __set_rank(self, item_id: str, rank: Optional[str]):
+        document = self.__stored(item_id)
+        assert document is not None
+        if rank is None:
+            del document[RANK_KEY]
+        else:
+            document[RANK_KEY] = rank
+        self.__write_item(item_id, document)
+
+    def __ordered(self, item_ids: list) -> list:
+        """item_ids (a project order or sub_items as stored) sorted by rank; returns
+        item_ids itself if none has a rank
+        """
+        if self.__mapped__ is not None:
+            if not self.__mapped__.has_key(RANK_KEY):
+                return item_ids
+            return ranks.order(item_ids, self.__mapped_rank)
+        item_ranks = self.__index__.ranks
+        if not item_ranks:
+            return item_ids
+        return ranks.order(item_ids, item_ranks.get)
+
+    def __drop_ranks(self, order: list):
+        """Removes the ranks of the items of order (set as a whole) if they contradict it"""
+        item_ranks = self.__index__.ranks
+        if item_ranks and self.__ordered(order) != order:
+            for item_id in order:
+                if item_id in item_ranks:
+                    self.__set_rank(item_id, None)
+
+    @property
+    def generation(self) -> int:
+        """Number of writes to the storage since the board was opened"""
+        if self.__mapped__ is not None:
+            return 0
+        return self.__database__.default_table.generation
+
+    def is_dirty(self) -> bool:
+        if self.__mapped__ is not None:
+            return False
+        return self.__database__.default_table.is_dirty
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        """SHA-256 of the content last read from or written to the board file.
+
+        Only available for the json and binary backend. If the board is not dirty, the file on
+        disk matches the board in memory as long as storages.file_hash() of the file
+        equals this hash.
+        """
+        if self.__mapped__ is not None:
+            return None
+        return getattr(self.__database__.storage, "content_hash", None)
 
     def save(self):
-        if isinstance(self.__database__.storage, CachingMiddleware):
-            self.__database__.storage.flush()
+        """Writes the changes to the storage; does nothing if there are none"""
+        if not self.is_dirty():
+            return
+        flush = getattr(self.__database__.storage, "flush", None)
+        if flush is not None:
+            flush()
+        table = self.__database__.default_table
+        table.saved_generation = table.generation
 
     def set_metadata(self, metadata: dict[str, str]):
+        self.__prepare_write()
         stored_metadata = self.get_metadata()
         stored_metadata.update(metadata)
-        self.__database__.upsert({"metadata": stored_metadata}, Query().metadata.exists())
+        database = self.__database__
+        database.update({"metadata": stored_metadata}, doc_ids=[database.metadata_doc_id])
 
     def get_metadata(self) -> dict[str, str]:
-        metadata = self.__database__.get(Query().metadata.exists())
-        return metadata["metadata"]
+        if self.__mapped__ is not None:
+            number = self.__mapped__.first("metadata")
+            if number is None:
+                return self.__default_metadata()
+            return dict(self.__mapped__.document(number)["metadata"])
+        database = self.__database__
+        metadata = database.get(doc_id=database.metadata_doc_id)
+        return dict(metadata["metadata"])
 
     def get_filename(self) -> str:
         return self.__filename__
@@ -203,81 +789,145 @@ class Projectboard:
     def get_states(self) -> list[str] | None:
         raise NotImplementedError
 
-    def number_milestones_and_tasks(self, pid: str) -> Tuple[int, int, int, int]:
-        """Returns (n_milestones, n_milestones_achieved, n_tasks, n_tasks_finished)"""
-        states = self.get("custom_states")
-        if states is None:
-            state_finished = defaults.DEFAULT_STATES[-1]
-        else:
-            state_finished = states["states"][-1]
-
-        n_ms = 0
-        n_ms_finished = 0
-        n_tasks = 0
-        n_tasks_finished = 0
-
-        result = self.__milestones_and_tasks(pid, state_finished)
-        n_ms += result[0]
-        n_ms_finished += result[1]
-        n_tasks += result[2]
-        n_tasks_finished += result[3]
-
-        return (n_ms, n_ms_finished, n_tasks, n_tasks_finished)
-
-    def __milestones_and_tasks(
-        self, item_id: str, state_finished: str
-    ) -> Tuple[int, int, int, int]:
-        children = self.get_children(item_id)
-        item = self.get(item_id)
+    def number_milestones_and_tasks(self, pid: str) -> Counts:
+        """Returns (n_milestones, n_milestones_achieved, n_tasks, n_tasks_finished)
 
+        The counts include the item itself and are maintained incrementally, so this
+        does not walk the sub-items.
+        """
+        item = self.__stored(pid)
         if item is None:
-            raise ValueError(f"Item with id {item_id} does not exist!")
-
-        n_ms = 0
-        n_ms_finished = 0
-        n_tasks = 0
-        n_tasks_finished = 0
-
-        for child in children:
-            result = self.__milestones_and_tasks(child["id"], state_finished)
-            n_ms += result[0]
-            n_ms_finished += result[1]
-            n_tasks += result[2]
-            n_tasks_finished += result[3]
-
-        cat = item["category"]
-        finished = item["state"] == state_finished
-        if cat == "milestone":
-            n_ms += 1
-            n_ms_finished += int(finished)
-        elif cat == "task":
-            n_tasks += 1
-            n_tasks_finished += int(finished)
-        elif cat == "project":
-            pass
-        else:
+            raise ValueError(f"Item with id {pid} does not exist!")
+        if item["category"] not in cat_values:
             raise NotImplementedError
 
-        return (n_ms, n_ms_finished, n_tasks, n_tasks_finished)
+        states = self.__index__.states
+        if self.__mapped__ is not None:
+            rollup = self.__mapped_rollup(pid)
+        else:
+            rollup = states.rollups.get(pid, NO_COUNTS)
+        return sum_counts(states.own_counts(item), rollup)
 
     def get_children(self, item_id: str) -> list[dict[str, Any]]:
-        query = Query()
-        return self.__database__.search(query.parent == item_id)
+        if self.__mapped__ is not None:
+            mapped = self.__mapped__
+            return [
+                copy_document(mapped.document(number))
+                for number in self.__mapped_child_numbers(item_id)
+            ]
+
+        return [
+            copy_document(self.__database__.get(doc_id=self.__index__.ids[child_id]))
+            for child_id in self.__child_ids(item_id)
+        ]
+
+    def get_child_items(self, item_id: str) -> list[Item]:
+        """Like get_children, but returns the children as (compact) Items"""
+        if self.__mapped__ is not None:
+            mapped = self.__mapped__
+            return [
+                Item.from_dict(mapped.document(number))
+                for number in self.__mapped_child_numbers(item_id)
+            ]
+
+        return [
+            Item.from_dict(self.__database__.get(doc_id=self.__index__.ids[child_id]))
+            for child_id in self.__child_ids(item_id)
+        ]
+
+    def __child_ids(self, item_id: str) -> list[str]:
+        """The children of an item in the order of its sub_items (see get); children
+        that are not listed follow
+        """
+        index = self.__index__
+        children = list(index.children.get(item_id, ()))
+        doc_id = index.ids.get(item_id)
+        if len(children) < 2 or doc_id is None:
+            return children
+        listed = self.__database__.get(doc_id=doc_id).get("sub_items") or []
+        position = {sid: number for number, sid in enumerate(listed)}
+        rank = index.ranks.get
+        return sorted(
+            children, key=lambda child_id: ranks.order_key(position, child_id, rank(child_id))
+        )
 
     def is_child_of(self, child_id: str, parent_id: str) -> bool:
-        children = self.get_children(parent_id)
-        for child in children:
-            if child["id"] == child_id:
-                return True
-        return False
+        if self.__mapped__ is not None:
+            mapped = self.__mapped__
+            return any(
+                mapped.column("id", number) == child_id
+                for number in self.__mapped_children(parent_id)
+            )
+        return child_id in self.__index__.children.get(parent_id, ())
 
     def n_children(self, item_id: str) -> int:
-        query = Query()
-        n_child = len(self.__database__.search(query.parent == item_id))
-        return n_child
+        if self.__mapped__ is not None:
+            return len(self.__mapped_children(item_id))
+        return len(self.__index__.children.get(item_id, ()))
+
+    def __find_mapped(self, item_id: str) -> Optional[int]:
+        mapped = self.__mapped__
+        numbers = [
+            number
+            for number in mapped.find(item_id)  # type: ignore
+            if mapped.table(number) == TinyDB.default_table_name  # type: ignore
+        ]
+        if len(numbers) > 1:
+            raise ValueError("Too many entries with same id in database!")
+        return numbers[0] if numbers else None
+
+    def __mapped_children(self, item_id: str) -> list[int]:
+        mapped = self.__mapped__
+        return [
+            number
+            for number in mapped.children(item_id)  # type: ignore
+            if mapped.table(number) == TinyDB.default_table_name  # type: ignore
+        ]
+
+    def __mapped_child_numbers(self, item_id: str) -> list[int]:
+        """Like __mapped_children, but ordered as by __child_ids"""
+        mapped = self.__mapped__
+        numbers = self.__mapped_children(item_id)
+        parent = self.__find_mapped(item_id)
+        if len(numbers) < 2 or parent is None:
+            return numbers
+        listed = mapped.document(parent).get("sub_items") or []  # type: ignore
+        position = {sid: index for index, sid in enumerate(listed)}
+        has_ranks = mapped.has_key(RANK_KEY)  # type: ignore
+
+        def key(number: int) -> tuple:
+            child_id = mapped.column("id", number)  # type: ignore
+            rank = self.__mapped_rank(child_id) if has_ranks else None
+            return ranks.order_key(position, child_id, rank)
+
+        return sorted(numbers, key=key)
+
+    def __mapped_rank(self, item_id: Any) -> Optional[str]:
+        number = self.__find_mapped(item_id) if isinstance(item_id, str) else None
+        if number is None:
+            return None
+        rank = self.__mapped__.document(number).get(RANK_KEY)  # type: ignore
+        return rank if ranks.is_rank(rank) else None
+
+    def __mapped_rollup(self, item_id: str) -> Counts:
+        """Counts the milestones and tasks below an item from the index of the board file"""
+        number = self.__find_mapped(item_id)
+        if number is None:
+            return NO_COUNTS
+        states = self.__index__.states
+        counts = NO_COUNTS
+        for (category, state), count in self.__mapped__.descendants(number).items():  # type: ignore
+            own_counts = states.own_counts({"category": category, "state": state})
+            counts = sum_counts(counts, own_counts, count)
+        return counts
 
     def __repr__(self) -> str:
         rep = []
+        if self.__mapped__ is not None:
+            for number in range(len(self.__mapped__)):
+                rep.append(repr(self.__mapped__.document(number)))
+            return "\n".join(rep)
+
         for elem in self.__database__.all():
             rep.append(repr(elem))
 
@@ -285,7 +935,7 @@ class Projectboard:
 
 
 def create_default_item(can_have_subitems: bool = True) -> dict[str, Any]:
-    today = datetime.today().date().isoformat()
+    today = dates.today()
     item: dict[str, Any] = {
         "name": "default project",
         "id": generate_id(),
@@ -303,9 +953,8 @@ def create_default_item(can_have_subitems: bool = True) -> dict[str, Any]:
 
 
 def generate_id(time: datetime | None = None) -> str:
-    """Function to create ID based on current time."""
-    time = datetime.now() if time is None else time
-    return str(time).replace(" ", "-")
+    """Creates a new compact id (see data.ids); unique within the running program"""
+    return ids.generate(time)
 
 
 def move_item_in_list_by_n(item: str, list_of_str: List[str], n_pos: int):
@@ -317,8 +966,17 @@ def move_item_in_list_by_n(item: str, list_of_str: List[str], n_pos: int):
 
 
 def read_metadata(filename: str) -> dict[str, str]:
-    board = Projectboard("", filename)
-    metadata = board.get_metadata()
-    board.close()
-    del board
+    """Reads the metadata of a board without opening (or creating) the board.
+
+    Boards without metadata get the same metadata as when they are opened.
+    """
+    metadata = storages.read_metadata(filename)
+    if metadata is None:
+        return {"filename": filename, "name": "", "description": ""}
     return metadata
+
+
+def read_metadata_many(filenames: list[str], max_workers: Optional[int] = None) -> list[dict]:
+    """Reads the metadata of several boards concurrently (in the order of filenames)"""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_metadata, filenames))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""The TinyDB database of a board (see data.Projectboard).
+
+BoardDatabase is a TinyDB whose tables apply every write directly to the table held
+by the storage (see InPlaceTable) instead of copying the complete table, and which
+knows the documents that hold the metadata and the project order.
+"""
+
+from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+# pylint: disable=import-error
+from tinydb import TinyDB
+from tinydb.table import Table
+
+# pylint: enable=import-error
+
+
+class _DocIdView(MutableMapping):
+    """Presents the raw table of a storage (keyed by str) as a table keyed by doc_id (int).
+
+    The keys of all documents that are accessed for writing are collected in touched.
+    With keep_originals, the original version of each document is stored as value
+    (None for new documents), so the changes can be undone.
+    """
+
+    def __init__(self, raw_table: dict[str, Any], touched: dict[str, Any], keep_originals: bool):
+        self.__raw__ = raw_table
+        self.__touched__ = touched
+        self.__keep_originals__ = keep_originals
+
+    def __remember(self, key: str):
+        if key not in self.__touched__:
+            document = self.__raw__.get(key) if self.__keep_originals__ else None
+            self.__touched__[key] = None if document is None else copy_document(document)
+
+    def __getitem__(self, doc_id: int) -> Any:
+        key = str(doc_id)
+        self.__remember(key)
+        return self.__raw__[key]
+
+    def __setitem__(self, doc_id: int, document: Any):
+        key = str(doc_id)
+        self.__remember(key)
+        self.__raw__[key] = document
+
+    def __delitem__(self, doc_id: int):
+        key = str(doc_id)
+        self.__remember(key)
+        del self.__raw__[key]
+
+    def __contains__(self, doc_id: object) -> bool:
+        return str(doc_id) in self.__raw__
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(doc_id) for doc_id in self.__raw__)
+
+    def __len__(self) -> int:
+        return len(self.__raw__)
+
+
+class InPlaceTable(Table):
+    """Table that applies write operations directly to the table held by the storage.
+
+    The default implementation copies the complete table twice on every write, which
+    makes every insert, update and remove O(n) in the size of the board.
+
+    Inside of batch() the changes are only applied in memory. They are written to
+    the storage once when the outermost batch ends, or undone if it raises.
+
+    Storages that provide write_documents(table_name, documents) only receive the
+    documents that changed (None for removed documents) instead of the whole database.
+
+    The generation is incremented with every write that reaches the storage; the
+    table is dirty as long as it differs from saved_generation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generation = 0
+        # A new board (metadata or project order just inserted) starts dirty
+        self.saved_generation = 0
+        self.__batch_depth__ = 0
+        self.__originals__: dict[str, Any] = {}
+        self.__tables__: Optional[dict[str, Any]] = None
+
+    @property
+    def in_batch(self) -> bool:
+        return self.__batch_depth__ > 0
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.generation != self.saved_generation
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        self.__batch_depth__ += 1
+        try:
+            yield
+        except BaseException:
+            self.__batch_depth__ -= 1
+            if self.__batch_depth__ == 0:
+                self.__rollback()
+            raise
+
+        self.__batch_depth__ -= 1
+        if self.__batch_depth__ == 0 and self.__originals__:
+            touched, self.__originals__ = self.__originals__, {}
+            self.__write(self.__tables__, touched)  # type: ignore
+
+    def __write(self, tables: dict[str, Any], touched: dict[str, Any]):
+        self.generation += 1
+        write_documents = getattr(self._storage, "write_documents", None)
+        if write_documents is None:
+            self._storage.write(tables)
+        else:
+            raw_table = tables[self.name]
+            write_documents(self.name, {key: raw_table.get(key) for key in touched})
+        self.clear_cache()
+
+    def __rollback(self):
+        if self.__originals__:
+            raw_table = self.__tables__[self.name]  # type: ignore
+            for key, document in self.__originals__.items():
+                if document is None:
+                    raw_table.pop(key, None)
+                else:
+                    raw_table[key] = document
+            self.__originals__ = {}
+            self._next_id = None
+        self.clear_cache()
+
+    def _update_table(self, updater: Callable[[dict[int, Mapping]], None]):
+        tables = self._storage.read()
+        if tables is None:
+            tables = {}
+        raw_table = tables.setdefault(self.name, {})
+
+        if self.in_batch:
+            self.__tables__ = tables
+            updater(_DocIdView(raw_table, self.__originals__, True))  # type: ignore
+            return
+
+        touched: dict[str, Any] = {}
+        updater(_DocIdView(raw_table, touched, False))  # type: ignore
+        self.__write(tables, touched)
+
+
+class BoardDatabase(TinyDB):
+    """TinyDB with InPlaceTables. metadata_doc_id and order_doc_id are the doc ids of
+    the documents that hold the metadata and the project order (-1 until they are known)
+    """
+
+    table_class = InPlaceTable
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metadata_doc_id = -1
+        self.order_doc_id = -1
+
+    @property
+    def default_table(self) -> InPlaceTable:
+        """The table that holds the items, the metadata and the project order"""
+        return self.table(self.default_table_name)  # type: ignore
+
+
+def copy_document(document: Mapping) -> dict[str, Any]:
+    """Copies a document including its lists and dicts (sub_items, metadata, ...).
+
+    Documents handed out by or passed to a Projectboard must not share lists with
+    the stored documents, otherwise changes bypass the indexes.
+    """
+    return {
+        key: value.copy() if isinstance(value, (list, dict)) else value
+        for key, value in document.items()
+    }
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Normalized dates and an interval index over the dates of the items.
+
+startdate and duedate are stored as ordinals (date.toordinal(), days since
+0001-01-01). Older boards contain ISO strings ("2024-01-09") or the default
+QDate.toString() text ("Tue Jan 9 2024"); to_ordinal understands all of them and
+normalize converts them when a board is opened for writing.
+
+DateIndex keeps the [startdate, duedate] interval of every item sorted, so the
+overdue/due-soon/window queries of Projectboard are answered with binary searches
+instead of a scan of the board.
+"""
+
+from bisect import bisect_left
+from bisect import bisect_right
+from bisect import insort
+from datetime import date
+from operator import itemgetter
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+DATE_KEYS = ("startdate", "duedate")
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+
+def today() -> int:
+    return date.today().toordinal()
+
+
+def to_ordinal(value: Any) -> Optional[int]:
+    """Ordinal of a date (ordinal, date, ISO or QDate text); None if it cannot be parsed"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value > 0 else None
+    if isinstance(value, date):
+        return value.toordinal()
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value).toordinal()
+    except ValueError:
+        pass
+    # QDate.toString() (Qt.TextDate): "Tue Jan 9 2024"
+    parts = value.split()
+    if len(parts) != 4 or parts[1] not in _MONTHS:
+        return None
+    try:
+        return date(int(parts[3]), _MONTHS[parts[1]], int(parts[2])).toordinal()
+    except ValueError:
+        return None
+
+
+def to_date(value: Any) -> Optional[date]:
+    ordinal = to_ordinal(value)
+    return None if ordinal is None else date.fromordinal(ordinal)
+
+
+def to_iso(value: Any) -> str:
+    """ISO text of a stored date for displaying it; unparsable values are returned as text"""
+    ordinal = to_ordinal(value)
+    if ordinal is None:
+        return "" if value is None else str(value)
+    return date.fromordinal(ordinal).isoformat()
+
+
+def normalize(document: dict) -> bool:
+    """Converts the dates of an item to ordinals (in place); True if it was changed.
+
+    Values that cannot be parsed are left as they are.
+    """
+    changed = False
+    for key in DATE_KEYS:
+        value = document.get(key)
+        if value is None or type(value) is int:  # pylint: disable=unidiomatic-typecheck
+            continue
+        ordinal = to_ordinal(value)
+        if ordinal is not None:
+            document[key] = ordinal
+            changed = True
+    return changed
+
+
+def interval(document: Any) -> Optional[tuple[int, int]]:
+    """(start, due) of an item; items with one date only span that day"""
+    start = to_ordinal(document.get("startdate"))
+    due = to_ordinal(document.get("duedate"))
+    if start is None and due is None:
+        return None
+    if start is None:
+        start = due
+    elif due is None:
+        due = start
+    return (start, due) if start <= due else (due, start)  # type: ignore
+
+
+_START = itemgetter(0)
+
+
+class DateIndex:
+    """Sorted intervals of the items of a board.
+
+    Unfinished items are kept sorted by due date (overdue and due-soon are a range of
+    that list). All items are kept sorted by start date together with a segment tree
+    of the maximum due dates, which finds the intervals overlapping a window without
+    looking at the others.
+
+    Changing the interval of an item updates the tree in place: only the leaves between
+    its old and new position in the start order change, in O(log n + their number),
+    which is small for a new due date or state. Adding or removing an item shifts all
+    items after it, in the sorted list (an O(n) memmove) as in the tree, so the tree
+    is rebuilt instead (in O(n), at C speed) on the first window query after such
+    changes; a batch of them costs one rebuild.
+    """
+
+    def __init__(self, items: Iterable[tuple[str, Optional[tuple[int, int]], bool]] = ()):
+        """Builds the index of (item_id, span, finished) in O(n log n)"""
+        self.__entries__: dict[str, tuple[int, int, bool]] = {
+            item_id: (span[0], span[1], finished)
+            for item_id, span, finished in items
+            if span is not None
+        }
+        self.__open_due__: list[tuple[int, str]] = sorted(
+            (due, item_id)
+            for item_id, (_, due, finished) in self.__entries__.items()
+            if not finished
+        )
+        self.__starts__: list[tuple[int, int, str]] = sorted(
+            (start, due, item_id) for item_id, (start, due, _) in self.__entries__.items()
+        )
+        self.__tree__: Optional[list[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
+
+    def set(self, item_id: str, span: Optional[tuple[int, int]], finished: bool):
+        """Adds, updates (or with span None removes) the interval of an item"""
+        old = self.__entries__.get(item_id)
+        new = None if span is None else (span[0], span[1], finished)
+        if old == new:
+            return
+        if old is None or new is None:
+            self.discard(item_id)
+            if new is None:
+                return
+            insort(self.__starts__, (new[0], new[1], item_id))
+            self.__tree__ = None
+        else:
+            self.__move(item_id, old, new)
+            if not old[2]:
+                del self.__open_due__[bisect_left(self.__open_due__, (old[1], item_id))]
+        self.__entries__[item_id] = new
+        if not finished:
+            insort(self.__open_due__, (new[1], item_id))
+
+    def __move(self, item_id: str, old: tuple[int, int, bool], new: tuple[int, int, bool]):
+        """Moves the interval of an item in the start order; only the leaves of the tree
+        between its old and new position (and their ancestors) change
+        """
+        starts = self.__starts__
+        old_position = bisect_left(starts, (old[0], old[1], item_id))
+        del starts[old_position]
+        entry = (new[0], new[1], item_id)
+        new_position = bisect_left(starts, entry)
+        starts.insert(new_position, entry)
+        tree = self.__tree__
+        if tree is None:
+            return
+        size = len(tree) // 2
+        first, last = sorted((old_position, new_position))
+        tree[size + first : size + last + 1] = [due for _, due, _ in starts[first : last + 1]]
+        first, last = (size + first) // 2, (size + last) // 2
+        while first:
+            tree[first : last + 1] = map(
+                max, tree[2 * first : 2 * last + 2 : 2], tree[2 * first + 1 : 2 * last + 2 : 2]
+            )
+            first, last = first // 2, last // 2
+
+    def discard(self, item_id: str):
+        old = self.__entries__.pop(item_id, None)
+        if old is None:
+            return
+        start, due, finished = old
+        if not finished:
+            del self.__open_due__[bisect_left(self.__open_due__, (due, item_id))]
+        del self.__starts__[bisect_left(self.__starts__, (start, due, item_id))]
+        self.__tree__ = None
+
+    def due_between(self, first: int, last: int) -> list[str]:
+        """Unfinished items with first <= due date <= last, sorted by due date"""
+        open_due = self.__open_due__
+        begin = bisect_left(open_due, first, key=_START)
+        end = bisect_right(open_due, last, key=_START)
+        return [item_id for _, item_id in open_due[begin:end]]
+
+    def overlapping(self, first: int, last: int) -> list[str]:
+        """Items whose interval overlaps [first, last], sorted by start date"""
+        starts = self.__starts__
+        # Only the items starting at or before last can overlap
+        n_candidates = bisect_right(starts, last, key=_START)
+        return [starts[i_start][2] for i_start in self.__due_from(first, n_candidates)]
+
+    def __due_from(self, first: int, n_candidates: int) -> Iterator[int]:
+        """Positions (< n_candidates) in the start order with due date >= first, ascending"""
+        tree = self.__build_tree()
+        size = len(tree) // 2
+        stack = [(1, 0, size)]
+        while stack:
+            node, begin, end = stack.pop()
+            if begin >= n_candidates or tree[node] < first:
+                continue
+            if node >= size:
+                yield node - size
+                continue
+            middle = (begin + end) // 2
+            # Right child first, so the left one is popped (and yielded) first
+            stack.append((2 * node + 1, middle, end))
+            stack.append((2 * node, begin, middle))
+
+    def __build_tree(self) -> list[int]:
+        if self.__tree__ is not None:
+            return self.__tree__
+        size = 1
+        while size < len(self.__starts__):
+            size *= 2
+        # Level by level, from the leaves (due dates in start order) to the root
+        level = [due for _, due, _ in self.__starts__]
+        level.extend([0] * (size - len(level)))
+        levels = [level]
+        while len(level) > 1:
+            level = list(map(max, level[0::2], level[1::2]))
+            levels.append(level)
+        tree = [0]
+        for level in reversed(levels):
+            tree.extend(level)
+        self.__tree__ = tree
+        return tree
@@ -23,4 +23,7 @@
 
 DEFAULT_STATES = ["Open", "Work-in-progress", "Halted", "Closed"]
 SETTINGS_FILE = "~/.config/pyprojectboard_dev/settings.json"
+CATALOG_FILE = "~/.config/pyprojectboard_dev/catalog.json"
 DATA_DIR = "~/Documents/pyprojectboards/"
+SEARCH_DIR = "~/.config/pyprojectboard_dev/search/"
+DASHBOARD_FILE = "~/.config/pyprojectboard_dev/dashboard.json"
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Export of boards to CSV, Markdown, HTML and JSON Lines.
+
+Every exporter is a generator of text chunks (one per item plus header/footer):
+the items are visited one by one in the order of the board (projects in the
+project order, then their sub-items depth first), so the output is never held in
+memory as a whole. write_export writes the chunks to a temporary file as they are
+produced and renames it when done.
+
+Headless, e.g. for nightly dumps (the board is opened read-only, binary boards
+lazily):
+
+    python -m data.export board.json board.csv
+"""
+
+import argparse
+import csv
+import html
+import io
+import os
+import threading
+from typing import Callable
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+from data import dates
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+COLUMNS = ("category", "id", "name", "state", "startdate", "duedate", "parent", "description")
+
+
+class Entry(NamedTuple):
+    depth: int
+    item: dict
+
+
+def iter_entries(board: Projectboard) -> Iterator[Entry]:
+    """Projects in project order, each followed by its sub-items (depth first)"""
+    visited: set[str] = set()
+    for pid in board.get_project_order()["project_order"]:
+        stack = [(pid, 0)]
+        while stack:
+            item_id, depth = stack.pop()
+            if item_id in visited:
+                continue
+            visited.add(item_id)
+            item = board.get(item_id)
+            if item is None:
+                continue
+            yield Entry(depth, item)
+            sub_items = item.get("sub_items") or ()
+            stack.extend((sub_id, depth + 1) for sub_id in reversed(sub_items))
+
+
+def count_items(board: Projectboard) -> int:
+    """Number of entries exported (from the milestone/task counts of the projects)"""
+    total = 0
+    for pid in board.get_project_order()["project_order"]:
+        if board.get(pid) is not None:
+            n_ms, _, n_tasks, _ = board.number_milestones_and_tasks(pid)
+            total += 1 + n_ms + n_tasks
+    return total
+
+
+def _text(item: dict, key: str) -> str:
+    value = item.get(key)
+    if key in dates.DATE_KEYS:
+        return dates.to_iso(value)
+    return "" if value is None else str(value)
+
+
+def export_csv(board: Projectboard) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield row(("depth", *COLUMNS))
+    for depth, item in iter_entries(board):
+        yield row((depth, *(_text(item, key) for key in COLUMNS)))
+
+
+def export_markdown(board: Projectboard) -> Iterator[str]:
+    yield f"# {board.get_metadata()['name']}\n"
+    for depth, item in iter_entries(board):
+        span = f"{_text(item, 'startdate')} - {_text(item, 'duedate')}"
+        if depth == 0:
+            yield f"\n## {_text(item, 'name')}\n\n{_text(item, 'state')}, {span}\n\n"
+            description = _text(item, "description").strip()
+            if description:
+                yield f"{description}\n\n"
+        else:
+            indent = "  " * (depth - 1)
+            category = _text(item, "category").capitalize()
+            name = _text(item, "name")
+            yield f"{indent}- **{category}** {name} ({_text(item, 'state')}, {span})\n"
+
+
+def export_html(board: Projectboard) -> Iterator[str]:
+    name = html.escape(board.get_metadata()["name"])
+    yield (
+        f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{name}</title>\n'
+        "</head>\n<body>\n"
+        f"<h1>{name}</h1>\n<table>\n<tr>"
+        + "".join(f"<th>{html.escape(key)}</th>" for key in COLUMNS)
+        + "</tr>\n"
+    )
+    for depth, item in iter_entries(board):
+        cells = [html.escape(_text(item, key)) for key in COLUMNS]
+        # Indent the name by the depth in the hierarchy
+        cells[2] = f'<span style="padding-left:{2 * depth}em">{cells[2]}</span>'
+        yield "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n"
+    yield "</table>\n</body>\n</html>\n"
+
+
+def export_jsonl(board: Projectboard) -> Iterator[str]:
+    """One JSON object per item, as stored (dates are ordinals), with its depth"""
+    for depth, item in iter_entries(board):
+        yield codec.dumps({"depth": depth, **item}).decode("utf-8") + "\n"
+
+
+FORMATS: dict[str, Callable[[Projectboard], Iterator[str]]] = {
+    "csv": export_csv,
+    "md": export_markdown,
+    "html": export_html,
+    "jsonl": export_jsonl,
+}
+
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lstrip(".").lower()
+    extension = {"markdown": "md", "htm": "html"}.get(extension, extension)
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown export format {extension!r} (known: {sorted(FORMATS)})!")
+    return extension
+
+
+def write_export(
+    board: Projectboard,
+    filename: str,
+    export_format: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """Exports a board to filename (format from the extension by default).
+
+    progress is called with (number of items written, total) every 1000 items and
+    at the end. If cancel is set, the export stops and the file is not written;
+    returns False in that case.
+    """
+    exporter = FORMATS[export_format or detect_format(filename)]
+    total = count_items(board) if progress is not None else 0
+    tmp_filename = f"{filename}.tmp"
+    try:
+        with open(tmp_filename, "w", encoding="utf-8", newline="") as export_file:
+            n_chunks = 0
+            for chunk in exporter(board):
+                export_file.write(chunk)
+                n_chunks += 1
+                if n_chunks % 1000 == 0:
+                    if cancel is not None and cancel.is_set():
+                        raise InterruptedError
+                    if progress is not None:
+                        progress(min(n_chunks, total), total)
+    except InterruptedError:
+        os.remove(tmp_filename)
+        return False
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    os.replace(tmp_filename, filename)
+    if progress is not None:
+        progress(total, total)
+    return True
+
+
+def export_board(
+    board_filename: str,
+    filename: str,
+    export_format: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """Exports a board file without changing it (see write_export)"""
+    board = Projectboard("", board_filename, lazy=True, read_only=True)
+    try:
+        return write_export(board, filename, export_format, progress, cancel)
+    finally:
+        board.close()
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Exports a projectboard")
+    parser.add_argument("board", help="board file (.json, .sqlite, .pbb)")
+    parser.add_argument("output", help="exported file")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="default: from the extension")
+    args = parser.parse_args(argv)
+    export_board(args.board, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Undo/redo history of a board, stored as field-level deltas.
+
+Every change of an item is recorded as ItemDelta: new and deleted items with their
+document, changed items with the old and new value of the changed fields only.
+Lists (sub items, project order) are stored as Splice: the replaced part of the
+list, so moving an item by one position costs two ids, whatever the length of
+the list. The deltas of one operation (an outermost Projectboard.batch) form a
+step, which is undone and redone as a whole.
+
+The steps are kept in a ring buffer: when the estimated size of all steps
+exceeds max_bytes (or there are more than max_steps), the oldest steps are
+dropped.
+"""
+
+import sys
+from collections import deque
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+# Marks a field that does not exist (in the old or new version of an item)
+MISSING: Any = type("Missing", (), {"__repr__": lambda self: "MISSING"})()
+
+UNDO_BYTES = 4 * 1024 * 1024
+UNDO_STEPS = 1000
+
+
+class Splice(NamedTuple):
+    """The difference of two lists: old[start:start + len(removed)] was replaced by added"""
+
+    start: int
+    removed: tuple
+    added: tuple
+
+    @classmethod
+    def between(cls, old: list, new: list) -> "Splice":
+        n_min = min(len(old), len(new))
+        start = 0
+        while start < n_min and old[start] == new[start]:
+            start += 1
+        end = 0
+        while end < n_min - start and old[-1 - end] == new[-1 - end]:
+            end += 1
+        return cls(start, tuple(old[start : len(old) - end]), tuple(new[start : len(new) - end]))
+
+    def apply(self, values: list) -> list:
+        return [*values[: self.start], *self.added, *values[self.start + len(self.removed) :]]
+
+    def revert(self, values: list) -> list:
+        return [*values[: self.start], *self.removed, *values[self.start + len(self.added) :]]
+
+
+class ItemDelta(NamedTuple):
+    """A change of one item. For new (deleted) items, old (new) is None and the other
+    one is the document; for changed items both are None and changes holds
+    (old value, new value) or Splice of every changed field.
+    """
+
+    item_id: str
+    old: Optional[dict]
+    new: Optional[dict]
+    changes: Optional[dict[str, Any]] = None
+
+    @classmethod
+    def between(cls, item_id: str, old: Optional[dict], new: Optional[dict]) -> "ItemDelta":
+        if old is None or new is None:
+            return cls(item_id, old, new)
+        changes: dict[str, Any] = {}
+        for key in old.keys() | new.keys():
+            old_value, new_value = old.get(key, MISSING), new.get(key, MISSING)
+            if old_value == new_value:
+                continue
+            if isinstance(old_value, list) and isinstance(new_value, list):
+                changes[key] = Splice.between(old_value, new_value)
+            else:
+                changes[key] = (old_value, new_value)
+        return cls(item_id, None, None, changes)
+
+    def apply(self, document: Optional[Mapping], undo: bool = False) -> Optional[dict]:
+        """The document after (or with undo before) the change, given the one before
+        (after) it
+        """
+        if self.changes is None:
+            return self.old if undo else self.new
+        assert document is not None
+        result = dict(document)
+        for key, change in self.changes.items():
+            if isinstance(change, Splice):
+                value = change.revert(result[key]) if undo else change.apply(result[key])
+            else:
+                value = change[0] if undo else change[1]
+            if value is MISSING:
+                result.pop(key, None)
+            else:
+                result[key] = value
+        return result
+
+
+class OrderDelta(NamedTuple):
+    """A change of the project order"""
+
+    splice: Splice
+
+    def apply(self, order: list, undo: bool = False) -> list:
+        return self.splice.revert(order) if undo else self.splice.apply(order)
+
+
+Step = list[ItemDelta | OrderDelta]
+
+
+def estimate_size(value: Any) -> int:
+    """Rough number of bytes used by value and the objects it holds (the keys of dicts
+    are field names, which are shared, so they are not counted)
+    """
+    kind = type(value)
+    if kind is str:
+        return 49 + len(value)
+    if kind is dict:
+        return sys.getsizeof(value) + sum(map(estimate_size, value.values()))
+    if isinstance(value, (list, tuple)):
+        return 56 + 8 * len(value) + sum(map(estimate_size, value))
+    return 28
+
+
+class History:
+    def __init__(self, max_bytes: int = UNDO_BYTES, max_steps: int = UNDO_STEPS):
+        self.max_bytes = max_bytes
+        self.__undo__: deque[tuple[Step, int]] = deque(maxlen=max_steps)
+        self.__redo__: list[tuple[Step, int]] = []
+        self.__pending__: Step = []
+        self.__size__ = 0
+        self.__paused__ = 0
+
+    @property
+    def size(self) -> int:
+        """Estimated number of bytes of all undo and redo steps"""
+        return self.__size__
+
+    def __len__(self) -> int:
+        return len(self.__undo__)
+
+    def can_undo(self) -> bool:
+        return bool(self.__undo__)
+
+    def can_redo(self) -> bool:
+        return bool(self.__redo__)
+
+    def record(self, item_id: str, old: Optional[dict], new: Optional[dict]):
+        """Records the change of an item for the current step"""
+        if not self.__paused__:
+            self.__pending__.append(ItemDelta.between(item_id, old, new))
+
+    def record_order(self, old: list, new: list):
+        if not self.__paused__ and old != new:
+            self.__pending__.append(OrderDelta(Splice.between(old, new)))
+
+    def commit(self):
+        """Ends the current step; a new step makes the undone steps unavailable"""
+        if not self.__pending__:
+            return
+        step, self.__pending__ = self.__pending__, []
+        for _step, size in self.__redo__:
+            self.__size__ -= size
+        self.__redo__.clear()
+        self.__push(self.__undo__, step)
+
+    def discard(self):
+        """Drops the changes recorded for the current step (e.g. rolled back)"""
+        self.__pending__ = []
+
+    def clear(self):
+        self.__undo__.clear()
+        self.__redo__.clear()
+        self.__pending__ = []
+        self.__size__ = 0
+
+    def __push(self, stack: deque | list, step: Step):
+        size = 56 + 8 * len(step)
+        for delta in step:
+            size += estimate_size(delta)
+            if size > self.max_bytes:
+                # Not counted further, the step is dropped anyway
+                break
+        if stack is self.__undo__ and len(stack) == self.__undo__.maxlen:
+            # Dropped by the deque
+            self.__size__ -= stack[0][1]
+        if size > self.max_bytes:
+            # Too large to keep, and the older steps depend on it
+            self.clear()
+            return
+        stack.append((step, size))
+        self.__size__ += size
+        # Ring buffer: the oldest steps make room
+        while self.__size__ > self.max_bytes:
+            if self.__undo__:
+                self.__size__ -= self.__undo__.popleft()[1]
+            else:
+                self.__size__ -= self.__redo__.pop(0)[1]
+
+    def pop_undo(self) -> Optional[Step]:
+        """The last step (to be undone); push_redo it once it is undone"""
+        if not self.__undo__:
+            return None
+        step, size = self.__undo__.pop()
+        self.__size__ -= size
+        return step
+
+    def pop_redo(self) -> Optional[Step]:
+        if not self.__redo__:
+            return None
+        step, size = self.__redo__.pop()
+        self.__size__ -= size
+        return step
+
+    def push_undo(self, step: Step):
+        self.__push(self.__undo__, step)
+
+    def push_redo(self, step: Step):
+        self.__push(self.__redo__, step)
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Nothing is recorded inside (while a step is undone or redone)"""
+        self.__paused__ += 1
+        try:
+            yield
+        finally:
+            self.__paused__ -= 1
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compact, time-ordered item ids.
+
+An id is a 55 bit number written as 11 characters of Crockford's base32: the
+milliseconds since 1970 (42 bits, enough until 2109) followed by a 13 bit
+sequence number. The ids of a generator are strictly increasing, also when many
+are created within one millisecond (the sequence is used, and when it runs out,
+the following milliseconds), so they never collide. As text, they sort in the
+order they were created.
+
+Older boards use the creation time as id ("2023-12-08-16:19:16.781414", 26
+characters), which collides when items are created within one clock tick.
+migrate_board rewrites these ids (and all references to them) offline:
+
+    python -m data.ids board.json
+"""
+
+import argparse
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Iterator
+from typing import Optional
+
+# pylint: disable=import-error
+from data import storages  # type: ignore
+
+# pylint: enable=import-error
+
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ID_LENGTH = 11
+SEQUENCE_BITS = 13
+
+# Keys of documents that refer to other items (see also schedule.DEPENDS_ON)
+REFERENCE_KEYS = ("parent",)
+REFERENCE_LIST_KEYS = ("sub_items", "depends_on", "project_order")
+CATEGORIES = ("project", "milestone", "task")
+
+_LEGACY_ID = re.compile(r"\d{4}-\d\d-\d\d-\d\d:\d\d:\d\d(\.\d{1,6})?")
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+
+def encode(value: int) -> str:
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    if value:
+        raise ValueError("Value too large for an id!")
+    return "".join(reversed(chars))
+
+
+def decode(item_id: str) -> int:
+    if len(item_id) != ID_LENGTH:
+        raise ValueError(f"{item_id!r} is not a compact id!")
+    value = 0
+    for char in item_id:
+        try:
+            value = value * 32 + _DECODE[char]
+        except KeyError as error:
+            raise ValueError(f"{item_id!r} is not a compact id!") from error
+    return value
+
+
+def is_compact(item_id: str) -> bool:
+    return len(item_id) == ID_LENGTH and all(char in _DECODE for char in item_id)
+
+
+def creation_time(item_id: str) -> datetime:
+    """The (local) time a compact id was created"""
+    return datetime.fromtimestamp((decode(item_id) >> SEQUENCE_BITS) / 1000)
+
+
+class IdGenerator:
+    def __init__(self):
+        self.__last__ = 0
+        self.__lock__ = threading.Lock()
+
+    def __call__(self, when: Optional[datetime] = None) -> str:
+        """A new id for the current time (or when). It is larger than all ids generated
+        before, so if when lies before the last id, it is not its creation time.
+        """
+        if when is None:
+            millis = time.time_ns() // 1_000_000
+        else:
+            millis = int(when.timestamp() * 1000)
+        with self.__lock__:
+            value = max(millis << SEQUENCE_BITS, self.__last__ + 1)
+            self.__last__ = value
+        return encode(value)
+
+
+generate = IdGenerator()
+
+
+def legacy_time(item_id: str) -> Optional[datetime]:
+    """The creation time of an id of the old format, None for other ids"""
+    if not isinstance(item_id, str) or _LEGACY_ID.fullmatch(item_id) is None:
+        return None
+    return datetime.fromisoformat(f"{item_id[:10]} {item_id[11:]}")
+
+
+class _Renamer:
+    """Maps the old ids of a board to compact ids (derived from their creation time)"""
+
+    def __init__(self):
+        self.__new_ids__: dict[str, list[str]] = {}
+        self.__used__: set[int] = set()
+        self.__seen__: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self.__new_ids__.values()))
+
+    def add(self, item_id: str):
+        """Assigns a new id to an item; items that share an old id get one each"""
+        created = legacy_time(item_id)
+        if created is None:
+            return
+        value = int(created.timestamp() * 1000) << SEQUENCE_BITS
+        while value in self.__used__:
+            value += 1
+        self.__used__.add(value)
+        self.__new_ids__.setdefault(item_id, []).append(encode(value))
+
+    def reference(self, item_id: str) -> str:
+        """The new id of an item referenced by parent, sub_items, ... (the first item if
+        several share the old id)
+        """
+        new_ids = self.__new_ids__.get(item_id)
+        return item_id if new_ids is None else new_ids[0]
+
+    def references(self, item_ids: list) -> list[str]:
+        """The new ids of a list of references; if an old id occurs several times
+        (the sub items of a parent whose children share an id), each occurrence gets the
+        next of its new ids
+        """
+        counts: dict[str, int] = {}
+        result = []
+        for item_id in item_ids:
+            new_ids = self.__new_ids__.get(item_id)
+            if new_ids is None:
+                result.append(item_id)
+                continue
+            occurrence = counts.get(item_id, 0)
+            counts[item_id] = occurrence + 1
+            result.append(new_ids[min(occurrence, len(new_ids) - 1)])
+        return result
+
+    def rename(self, document: dict) -> dict:
+        changed = dict(document)
+        for key in REFERENCE_KEYS:
+            if isinstance(document.get(key), str):
+                changed[key] = self.reference(document[key])
+        for key in REFERENCE_LIST_KEYS:
+            if isinstance(document.get(key), list):
+                changed[key] = self.references(document[key])
+        item_id = document.get("id")
+        new_ids = self.__new_ids__.get(item_id)  # type: ignore
+        if new_ids is not None:
+            occurrence = self.__seen__.get(item_id, 0)  # type: ignore
+            self.__seen__[item_id] = occurrence + 1  # type: ignore
+            changed["id"] = new_ids[occurrence]
+        return changed
+
+
+def migrate_board(filename: str, target: Optional[str] = None) -> int:
+    """Replaces the old (time stamp) ids of a board file by compact ids.
+
+    Also the parents, sub items, dependencies and the project order are rewritten.
+    Items that share an id (created within one clock tick) get an id each;
+    a list that names a shared id n times refers to its first n items, other
+    references point to the first of them. The board must not be
+    open. The file is read twice, document by document: once to collect the ids
+    and once to write the changed documents to target (default: filename, which is
+    replaced when done). Returns the number of changed ids.
+    """
+    renamer = _Renamer()
+    for table, _doc_id, document in storages.iter_documents(filename):
+        if table == storages.DEFAULT_TABLE and document.get("category") in CATEGORIES:
+            renamer.add(document["id"])
+    if not renamer and target is None:
+        return 0
+
+    def renamed() -> Iterator[storages.Document]:
+        for table, doc_id, document in storages.iter_documents(filename):
+            if table == storages.DEFAULT_TABLE:
+                document = renamer.rename(document)
+            yield table, doc_id, document
+
+    storages.write_board(filename if target is None else target, renamed())
+    return len(renamer)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Gives the items of boards compact ids")
+    parser.add_argument("boards", nargs="+", help="board files (.json, .sqlite, .pbb)")
+    args = parser.parse_args(argv)
+    for filename in args.boards:
+        print(f"{filename}: {migrate_board(filename)} ids changed")
+
+
+if __name__ == "__main__":
+    main()
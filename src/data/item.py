@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Compact representation of board items.
+
+The board stores every item as a dict with string keys and string values for the
+category and the state. Item holds the same content in __slots__, with the category
+and the state as small ints and the ids interned. It takes about half the memory of
+the dict (see benchmarks/bench_items.py) and turns category/state comparisons into
+int comparisons:
+
+    item = Item.from_dict(board.get(item_id))
+    if item.category == TASK and item.state == state_code("Closed"): ...
+    board.insert(item.to_dict())
+
+Categories and states are interned process-wide: the codes of the known categories
+are fixed (they are the values of data.cat_values), other names get the next free
+code the first time they are seen. Codes are only meaningful within a process, so
+they are never stored.
+"""
+
+import sys
+import threading
+from typing import Any
+from typing import Mapping
+from typing import Optional
+
+# pylint: disable=import-error
+from data import defaults  # type: ignore
+
+# pylint: enable=import-error
+
+
+class _Names:
+    """Bidirectional mapping between names and small int codes"""
+
+    def __init__(self, names: list[Optional[str]]):
+        self.__names__ = list(names)
+        self.__codes__ = {name: code for code, name in enumerate(names)}
+        self.__lock__ = threading.Lock()
+
+    def code(self, name: Optional[str]) -> int:
+        code = self.__codes__.get(name)
+        if code is None:
+            with self.__lock__:
+                code = self.__codes__.get(name)
+                if code is None:
+                    code = len(self.__names__)
+                    self.__names__.append(name)
+                    self.__codes__[name] = code
+        return code
+
+    def name(self, code: int) -> Optional[str]:
+        return self.__names__[code]
+
+
+# Code 0 stands for items without a category/state (None)
+_CATEGORIES = _Names([None, "project", "milestone", "task"])
+_STATES = _Names([None, *defaults.DEFAULT_STATES])
+
+NO_CATEGORY = 0
+PROJECT = _CATEGORIES.code("project")
+MILESTONE = _CATEGORIES.code("milestone")
+TASK = _CATEGORIES.code("task")
+
+
+def category_code(name: Optional[str]) -> int:
+    return _CATEGORIES.code(name)
+
+
+def category_name(code: int) -> Optional[str]:
+    return _CATEGORIES.name(code)
+
+
+def state_code(name: Optional[str]) -> int:
+    return _STATES.code(name)
+
+
+def state_name(code: int) -> Optional[str]:
+    return _STATES.name(code)
+
+
+def intern_id(item_id: Any) -> Any:
+    return sys.intern(item_id) if type(item_id) is str else item_id  # pylint: disable=C0123
+
+
+class Item:
+    """An item of a board (project, milestone or task)"""
+
+    # Keys of the stored dict with their own slot, in the order of create_default_item
+    FIELDS = (
+        "name",
+        "id",
+        "category",
+        "description",
+        "startdate",
+        "duedate",
+        "state",
+        "parent",
+        "sub_items",
+    )
+
+    __slots__ = (*FIELDS, "extra", "_absent")
+
+    def __init__(
+        self,
+        item_id: str,
+        category: int = NO_CATEGORY,
+        state: int = 0,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        startdate: Optional[int] = None,
+        duedate: Optional[int] = None,
+        parent: Optional[str] = None,
+        sub_items: Optional[list[str]] = None,
+        extra: Optional[dict[str, Any]] = None,
+    ):
+        self.id = intern_id(item_id)  # pylint: disable=invalid-name
+        self.category = category
+        self.state = state
+        self.name = name
+        self.description = description
+        self.startdate = startdate
+        self.duedate = duedate
+        self.parent = intern_id(parent)
+        self.sub_items = None if sub_items is None else [intern_id(sid) for sid in sub_items]
+        # Keys of the stored dict without a slot
+        self.extra = extra
+        # Bit mask of the FIELDS missing in the stored dict (their slot is None)
+        self._absent = 0 if sub_items is not None else _SUB_ITEMS_BIT
+
+    @classmethod
+    def from_dict(cls, document: Mapping[str, Any]) -> "Item":
+        """Converts a stored item; lists and dicts are copied"""
+        item = cls.__new__(cls)
+        absent = 0
+        for bit, field in enumerate(cls.FIELDS):
+            if field not in document:
+                absent |= 1 << bit
+        get = document.get
+        item.id = intern_id(get("id"))
+        item.category = _CATEGORIES.code(get("category"))
+        item.state = _STATES.code(get("state"))
+        item.name = get("name")
+        item.description = get("description")
+        item.startdate = get("startdate")
+        item.duedate = get("duedate")
+        item.parent = intern_id(get("parent"))
+        sub_items = get("sub_items")
+        item.sub_items = None if sub_items is None else [intern_id(sid) for sid in sub_items]
+        item._absent = absent
+
+        extra = None
+        if len(document) + absent.bit_count() != len(cls.FIELDS):
+            extra = {
+                key: value.copy() if isinstance(value, (list, dict)) else value
+                for key, value in document.items()
+                if key not in _FIELD_SET
+            }
+        item.extra = extra
+        return item
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converts to the stored representation"""
+        values = (
+            self.name,
+            self.id,
+            _CATEGORIES.name(self.category),
+            self.description,
+            self.startdate,
+            self.duedate,
+            _STATES.name(self.state),
+            self.parent,
+            None if self.sub_items is None else list(self.sub_items),
+        )
+        absent = self._absent
+        if absent:
+            document = {
+                field: value
+                for bit, (field, value) in enumerate(zip(self.FIELDS, values))
+                if value is not None or not absent >> bit & 1
+            }
+        else:
+            document = dict(zip(self.FIELDS, values))
+        if self.extra:
+            for key, value in self.extra.items():
+                document[key] = value.copy() if isinstance(value, (list, dict)) else value
+        return document
+
+    @property
+    def category_name(self) -> Optional[str]:
+        return _CATEGORIES.name(self.category)
+
+    @property
+    def state_name(self) -> Optional[str]:
+        return _STATES.name(self.state)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"Item({self.to_dict()!r})"
+
+
+_FIELD_SET = frozenset(Item.FIELDS)
+_SUB_ITEMS_BIT = 1 << Item.FIELDS.index("sub_items")
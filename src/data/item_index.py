@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""In-memory indexes of the items of a board (see data.Projectboard).
+
+The indexes are built with one pass over the board database. Changes made through
+ItemIndex.write, insert and remove update them, so finding an item, its children,
+the lists that contain it or the milestone/task counts below it does not search the
+database.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+from typing import Optional
+from typing import Tuple
+
+# pylint: disable=import-error
+from data import dates  # type: ignore
+from data import defaults  # type: ignore
+from data import ranks  # type: ignore
+from data.database import BoardDatabase  # type: ignore
+from data.history import MISSING  # type: ignore
+
+# pylint: enable=import-error
+
+
+# Key of the (optional) rank of an item among its siblings, see data.ranks
+RANK_KEY = "rank"
+
+Counts = Tuple[int, int, int, int]
+NO_COUNTS: Counts = (0, 0, 0, 0)
+
+
+class ItemIndex:
+    """Indexes of the items (the documents with an id) of a board database.
+
+    ids: the doc id of every item; ids used more than once are in duplicate_ids
+    children: the ids of the items with a given parent (None: without parent)
+    member_of: the containers of an item: the items whose sub_items list it, and None
+        if it is in the project order
+    ranks: the valid ranks (see data.ranks) of the items
+    states: the indexes that depend on the state of the items (see StateIndex)
+
+    Without database (a board that is not loaded yet), only states is used.
+    """
+
+    def __init__(self, database: Optional[BoardDatabase] = None):
+        self.__database__ = database
+        self.ids: dict[str, int] = {}
+        self.duplicate_ids: set[str] = set()
+        self.children: dict[Optional[str], dict[str, None]] = {}
+        self.member_of: dict[str, dict[Optional[str], None]] = {}
+        self.ranks: dict[str, str] = {}
+        self.states = StateIndex(self)
+        if database is not None:
+            self.__build(database)
+
+    @property
+    def database(self) -> BoardDatabase:
+        if self.__database__ is None:
+            raise ValueError("The board is not loaded!")
+        return self.__database__
+
+    def __build(self, database: BoardDatabase):
+        for doc in database:
+            if "id" in doc:
+                item_id = doc["id"]
+                if item_id in self.ids:
+                    self.duplicate_ids.add(item_id)
+                    continue
+                self.ids[item_id] = doc.doc_id
+                self.__add(item_id, doc)
+            elif "metadata" in doc:
+                database.metadata_doc_id = doc.doc_id
+            elif "project_order" in doc:
+                database.order_doc_id = doc.doc_id
+                self.__index_sub_items(None, [], doc["project_order"])
+        self.states.rebuild()
+
+    def __add(self, item_id: str, document: Mapping):
+        if ranks.is_rank(document.get(RANK_KEY)):
+            self.ranks[item_id] = document[RANK_KEY]
+        if "parent" in document:
+            self.__link_child(item_id, document["parent"])
+        for sub_item_id in document.get("sub_items", ()):
+            self.member_of.setdefault(sub_item_id, {})[item_id] = None
+
+    def doc_id(self, item_id: str) -> Optional[int]:
+        """The doc id of an item (None if there is none); raises a ValueError if several
+        items have the id
+        """
+        if item_id in self.duplicate_ids:
+            raise ValueError("Too many entries with same id in database!")
+        return self.ids.get(item_id)
+
+    def get(self, item_id: str) -> Optional[Mapping[str, Any]]:
+        """The stored document of an item (see doc_id); its lists must not be changed"""
+        doc_id = self.doc_id(item_id)
+        return None if doc_id is None else self.database.get(doc_id=doc_id)
+
+    def in_order(self, item_id: str) -> bool:
+        """Whether item_id is in the project order"""
+        return None in self.member_of.get(item_id, ())
+
+    def set_order(self, old_order: list[str], new_order: list[str]):
+        """Updates the index after the project order was changed from old_order"""
+        self.__index_sub_items(None, old_order, new_order)
+
+    def write(self, item_id: str, document: Optional[dict]) -> Optional[Mapping[str, Any]]:
+        """Replaces (or with None deletes) the document of an item and updates the
+        indexes; returns the old document (None if there was none).
+
+        Only the item itself is changed, not its parent, sub items or the project order.
+        """
+        database = self.database
+        doc_id = self.doc_id(item_id)
+        old = None if doc_id is None else database.get(doc_id=doc_id)
+        if old is None and document is None:
+            return None
+
+        self.__move_child(item_id, old, document)
+        self.__index_sub_items(
+            item_id,
+            [] if old is None else old.get("sub_items", []),
+            [] if document is None else document.get("sub_items", []),
+        )
+        self.states.update_rollups(item_id, old, document)
+        if document is None or not ranks.is_rank(document.get(RANK_KEY)):
+            self.ranks.pop(item_id, None)
+        else:
+            self.ranks[item_id] = document[RANK_KEY]
+
+        if document is None:
+            database.remove(doc_ids=[doc_id])
+            del self.ids[item_id]
+        elif doc_id is None:
+            self.ids[item_id] = database.insert(document)
+        else:
+
+            def replace(stored: dict):
+                stored.clear()
+                stored.update(document)
+
+            database.update(replace, doc_ids=[doc_id])
+        self.states.index_dates(item_id, document)
+
+        if item_id == "custom_states":
+            # The finished state may have changed
+            self.states.rebuild()
+        return old
+
+    def insert(self, documents: dict[str, dict]):
+        """Inserts the documents of new items (by id) with one write"""
+        doc_ids = self.database.insert_multiple(documents.values())
+        for (item_id, document), doc_id in zip(documents.items(), doc_ids):
+            self.ids[item_id] = doc_id
+            self.__add(item_id, document)
+            self.states.index_dates(item_id, document)
+        self.states.add_rollups(documents)
+
+    def remove(self, items: dict[str, Mapping]):
+        """Deletes the stored documents of items (by id) with one write. items must hold
+        all sub items of its items (see subtree); the sub_items of other items and the
+        project order are not changed.
+        """
+        doc_ids = [self.ids[item_id] for item_id in items]
+        for item_id, item in items.items():
+            if item.get("parent") not in items:
+                self.states.update_rollups(item_id, item, None)
+                self.__unlink_child(item_id, item.get("parent"))
+            self.__index_sub_items(item_id, item.get("sub_items", []), [])
+
+        for item_id in items:
+            self.member_of.pop(item_id, None)
+            self.children.pop(item_id, None)
+            self.ranks.pop(item_id, None)
+            self.states.rollups.pop(item_id, None)
+            self.states.index_dates(item_id, None)
+            del self.ids[item_id]
+        self.database.remove(doc_ids=doc_ids)
+
+    def subtree(self, item_id: str) -> list[str]:
+        """Returns the ids of all sub items of an item and their sub items"""
+        subtree: list[str] = []
+        visited = {item_id}
+        stack = [item_id]
+        while stack:
+            for child_id in self.children.get(stack.pop(), ()):
+                if child_id not in visited:
+                    visited.add(child_id)
+                    subtree.append(child_id)
+                    stack.append(child_id)
+        return subtree
+
+    def __move_child(self, item_id: str, old: Optional[Mapping], new: Optional[Mapping]):
+        old_parent = MISSING if old is None else old.get("parent", MISSING)
+        new_parent = MISSING if new is None else new.get("parent", MISSING)
+        if old_parent == new_parent:
+            return
+        if old_parent is not MISSING:
+            self.__unlink_child(item_id, old_parent)
+        if new_parent is not MISSING:
+            self.__link_child(item_id, new_parent)
+
+    def __link_child(self, item_id: str, parent_id: Optional[str]):
+        self.children.setdefault(parent_id, {})[item_id] = None
+
+    def __unlink_child(self, item_id: str, parent_id: Optional[str]):
+        children = self.children.get(parent_id)
+        if children is None:
+            return
+        children.pop(item_id, None)
+        if not children:
+            del self.children[parent_id]
+
+    def __index_sub_items(
+        self, item_id: Optional[str], old_sub_items: list[str], new_sub_items: list[str]
+    ):
+        for sub_item_id in set(old_sub_items).difference(new_sub_items):
+            containers = self.member_of[sub_item_id]
+            containers.pop(item_id, None)
+            if not containers:
+                del self.member_of[sub_item_id]
+        for sub_item_id in new_sub_items:
+            self.member_of.setdefault(sub_item_id, {})[item_id] = None
+
+
+class StateIndex:
+    """The indexes that depend on the finished state (the last state of the board): the
+    milestone/task counts below every item (rollups) and the date index (see
+    data.dates.DateIndex, built by the board on first use).
+    """
+
+    def __init__(self, index: ItemIndex):
+        self.__index__ = index
+        self.finished = defaults.DEFAULT_STATES[-1]
+        self.rollups: dict[str, Counts] = {}
+        self.date_index: Optional[dates.DateIndex] = None
+
+    def rebuild(self):
+        """Reads the finished state and recomputes the rollups in one pass over the items"""
+        index = self.__index__
+        states = index.get("custom_states")
+        self.finished = defaults.DEFAULT_STATES[-1] if states is None else states["states"][-1]
+        self.date_index = None
+
+        self.rollups = {}
+        database = index.database
+        for item_id, doc_id in index.ids.items():
+            item = database.get(doc_id=doc_id)
+            counts = self.own_counts(item)
+            if counts != NO_COUNTS:
+                self.__add_to_ancestors(item_id, item.get("parent"), counts)
+
+    def is_finished(self, item: Mapping) -> bool:
+        return item.get("state") == self.finished
+
+    def own_counts(self, item: Mapping) -> Counts:
+        finished = int(self.is_finished(item))
+        match item.get("category"):
+            case "milestone":
+                return (1, finished, 0, 0)
+            case "task":
+                return (0, 0, 1, finished)
+            case _:
+                return NO_COUNTS
+
+    def index_dates(self, item_id: str, item: Optional[Mapping]):
+        """Updates the dates of an item (None: deleted) once the date index is built"""
+        if self.date_index is None:
+            return
+        if item is None:
+            self.date_index.discard(item_id)
+        elif "category" in item:
+            self.date_index.set(item_id, dates.interval(item), self.is_finished(item))
+
+    def __add_to_ancestors(self, item_id: str, parent_id: Optional[str], counts: Counts):
+        """Adds counts to the rollups of all ancestors, starting with parent_id"""
+        index = self.__index__
+        visited = {item_id}
+        while parent_id is not None and parent_id not in visited:
+            self.rollups[parent_id] = sum_counts(self.rollups.get(parent_id, NO_COUNTS), counts)
+            doc_id = index.ids.get(parent_id)
+            if doc_id is None:
+                break
+            visited.add(parent_id)
+            parent_id = index.database.get(doc_id=doc_id).get("parent")
+
+    def update_rollups(
+        self, item_id: str, old_item: Optional[Mapping], new_item: Optional[Mapping]
+    ):
+        """Moves the counts of an item (and its sub-items) along the ancestor chain"""
+        subtree = self.rollups.get(item_id, NO_COUNTS)
+        old_parent, old_counts = None, NO_COUNTS
+        new_parent, new_counts = None, NO_COUNTS
+        if old_item is not None:
+            old_parent = old_item.get("parent")
+            old_counts = sum_counts(self.own_counts(old_item), subtree)
+        if new_item is not None:
+            new_parent = new_item.get("parent")
+            new_counts = sum_counts(self.own_counts(new_item), subtree)
+
+        if old_parent == new_parent:
+            diff = sum_counts(new_counts, old_counts, -1)
+            if diff != NO_COUNTS:
+                self.__add_to_ancestors(item_id, new_parent, diff)
+            return
+
+        if old_counts != NO_COUNTS:
+            self.__add_to_ancestors(item_id, old_parent, sum_counts(NO_COUNTS, old_counts, -1))
+        if new_counts != NO_COUNTS:
+            self.__add_to_ancestors(item_id, new_parent, new_counts)
+
+    def add_rollups(self, documents: dict[str, dict]):
+        """Adds the counts of new items to their ancestors, walking through documents
+        (the new items) before reading the ancestors on the board
+        """
+        outside: dict[str, tuple[str, Counts]] = {}
+        for item_id, document in documents.items():
+            counts = self.own_counts(document)
+            if counts == NO_COUNTS:
+                continue
+            parent_id = document.get("parent")
+            while parent_id in documents:
+                self.rollups[parent_id] = sum_counts(self.rollups.get(parent_id, NO_COUNTS), counts)
+                parent_id = documents[parent_id].get("parent")
+            if parent_id is not None:
+                child_id, total = outside.get(parent_id, (item_id, NO_COUNTS))
+                outside[parent_id] = (child_id, sum_counts(total, counts))
+        for parent_id, (child_id, counts) in outside.items():
+            self.__add_to_ancestors(child_id, parent_id, counts)
+
+
+def sum_counts(counts: Counts, other: Counts, factor: int = 1) -> Counts:
+    """counts + factor * other"""
+    return (
+        counts[0] + factor * other[0],
+        counts[1] + factor * other[1],
+        counts[2] + factor * other[2],
+        counts[3] + factor * other[3],
+    )
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Fractional rank keys for ordering items without rewriting lists.
+
+A rank is a string of base 62 digits (0-9, A-Z, a-z, in ASCII order) read as a
+fraction between 0 and 1: "V" is 31/62, "V1" is 31/62 + 1/62**2. Ranks compare
+like strings, never end with "0" and there is always a rank between two others,
+so moving an item means giving it a rank between those of its new neighbours.
+Appending and prepending count up or down in the last digit, so that ranks only
+grow slowly; repeated inserts at the same place make them one digit longer about
+every six times. Ranks longer than MAX_LENGTH should be spread out again.
+
+order sorts the ids of items (e.g. the project order) by their ranks.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+MAX_LENGTH = 16
+
+_VALUES = {digit: value for value, digit in enumerate(DIGITS)}
+
+
+def _value(rank: str, width: int) -> int:
+    """The rank as integer of width digits (rank padded with zeros)"""
+    value = 0
+    for digit in rank.ljust(width, DIGITS[0]):
+        value = value * BASE + _VALUES[digit]
+    return value
+
+
+def _rank(value: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits)).rstrip(DIGITS[0])
+
+
+def is_rank(rank: object) -> bool:
+    return (
+        isinstance(rank, str)
+        and rank != ""
+        and rank[-1] != DIGITS[0]
+        and all(digit in _VALUES for digit in rank)
+    )
+
+
+def spread(count: int, before: Optional[str] = None, after: Optional[str] = None) -> list[str]:
+    """count evenly spaced ranks between before and after (None: no bound).
+
+    The ranks use the middle half of the gap, so there is room for about count
+    ranks before and after them.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"No rank between {before!r} and {after!r}!")
+    width = max(len(before or ""), len(after or ""), 1)
+    while True:
+        low = 0 if before is None else _value(before, width)
+        high = BASE ** width if after is None else _value(after, width)
+        if high - low >= 4 * (count + 1):
+            break
+        width += 1
+    margin = (high - low) // 4
+    low, high = low + margin, high - margin
+    values = (low + (high - low) * i // (count + 1) for i in range(1, count + 1))
+    # The ranks are at least two apart, so they stay in order
+    return [_rank(value + 1 if value % BASE == 0 else value, width) for value in values]
+
+
+def between(before: Optional[str], after: Optional[str]) -> str:
+    """A rank between before and after (None: no bound), as short as possible"""
+    # Without trailing zero, so that the next rank has the same length
+    if after is None and before is not None:
+        width = len(before)
+        value = _value(before, width) + 1
+        value += value % BASE == 0
+        if value < BASE**width:
+            return _rank(value, width)
+    elif before is None and after is not None:
+        width = len(after)
+        value = _value(after, width) - 1
+        value -= value % BASE == 0
+        if value > 0:
+            return _rank(value, width)
+    return spread(1, before, after)[0]
+
+
+def order(item_ids: list, rank_of: Callable[[Any], Optional[str]]) -> list:
+    """item_ids sorted by rank; the ids without rank follow in their order"""
+    ranked = []
+    unranked = []
+    for item_id in item_ids:
+        rank = rank_of(item_id)
+        if rank is None:
+            unranked.append(item_id)
+        else:
+            ranked.append((rank, item_id))
+    if not ranked:
+        return item_ids
+    ranked.sort(key=lambda pair: pair[0])
+    return [item_id for _rank, item_id in ranked] + unranked
+
+
+def order_key(position: dict, item_id: Any, rank: Optional[str]) -> tuple:
+    """Sort key of a child as placed by order among the stored sub items of its
+    parent (position: index of each sub item); children that are not listed come last
+    """
+    if rank is None:
+        return (1, position.get(item_id, len(position)), "")
+    return (0, 0, rank)
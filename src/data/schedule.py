@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Project schedule: finish-to-start dependencies and the critical path.
+
+Tasks and milestones can depend on other tasks and milestones: an item cannot
+start before all items it depends on (stored as a list of ids in its "depends_on")
+are finished. Schedule computes for every item
+
+- the earliest start/finish: not before its own startdate and not before all its
+  predecessors are finished (finish is exclusive, a one-day item starting on day d
+  finishes on d + 1),
+- the latest start/finish that does not delay the end of the schedule,
+- the slack (latest - earliest start); items without slack are critical.
+
+Durations come from the dates of the items (duedate - startdate + 1 days, 0 for
+items without dates). All days are ordinals (see data.dates).
+
+The dependency graph is kept in topological order. The complete computation is one
+forward and one backward pass over that order; with NumPy installed the passes are
+vectorized over the levels of the graph (items whose predecessors are all on lower
+levels). After an edit (Schedule.update, add_dependency, remove_dependency) only the
+items whose times can change are recomputed.
+
+    schedule = Schedule(board)
+    schedule.add_dependency("T2", "T1")     # T2 starts after T1 is finished
+    schedule.timing("T2").slack
+    schedule.critical_path()
+"""
+
+import heapq
+from types import ModuleType
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+
+# pylint: disable=import-error
+from data import dates  # type: ignore
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+_numpy: Optional[ModuleType]
+try:
+    import numpy as _numpy  # type: ignore  # pylint: disable=import-error
+except ImportError:  # pragma: no cover - depends on the environment
+    _numpy = None
+
+HAVE_NUMPY = _numpy is not None
+
+
+DEPENDS_ON = "depends_on"
+SCHEDULED_CATEGORIES = ("task", "milestone")
+
+
+class Timing(NamedTuple):
+    earliest_start: int
+    earliest_finish: int
+    latest_start: int
+    latest_finish: int
+    slack: int
+
+
+def dependencies(item: dict) -> list[str]:
+    return list(item.get(DEPENDS_ON) or [])
+
+
+def duration(item: dict) -> int:
+    span = dates.interval(item)
+    return 0 if span is None else span[1] - span[0] + 1
+
+
+class Schedule:
+    def __init__(self, board: Projectboard, use_numpy: Optional[bool] = None):
+        """Computes the schedule of all tasks and milestones of a board.
+
+        Raises a ValueError if the dependencies contain a cycle. Dependencies on items
+        that do not exist (anymore) or are not scheduled are ignored.
+        """
+        self.__board__ = board
+        self.__use_numpy__ = HAVE_NUMPY if use_numpy is None else use_numpy
+        if self.__use_numpy__ and not HAVE_NUMPY:
+            raise ValueError("NumPy is not installed!")
+
+        items = [
+            values
+            for values in board.iter_values("id", "category", "startdate", "duedate", DEPENDS_ON)
+            if values[1] in SCHEDULED_CATEGORIES
+        ]
+        self.__ids__: list[str] = [values[0] for values in items]
+        self.__nodes__: dict[str, int] = {
+            item_id: node for node, item_id in enumerate(self.__ids__)
+        }
+        self.__durations__: list[int] = []
+        starts: list[Optional[int]] = []
+        for _, _, startdate, duedate, _ in items:
+            span = dates.interval({"startdate": startdate, "duedate": duedate})
+            starts.append(None if span is None else span[0])
+            self.__durations__.append(0 if span is None else span[1] - span[0] + 1)
+        # Items without dates start with the schedule
+        known_starts = [start for start in starts if start is not None]
+        self.__begin__ = min(known_starts) if known_starts else dates.today()
+        self.__starts__ = [self.__begin__ if start is None else start for start in starts]
+
+        self.__preds__: list[list[int]] = [[] for _ in items]
+        self.__succs__: list[list[int]] = [[] for _ in items]
+        for node, (*_, depends_on) in enumerate(items):
+            for predecessor_id in depends_on or ():
+                predecessor = self.__nodes__.get(predecessor_id)
+                if predecessor is not None and predecessor not in self.__preds__[node]:
+                    self.__preds__[node].append(predecessor)
+                    self.__succs__[predecessor].append(node)
+
+        self.__order__ = self.__topological_order()
+        self.__positions__ = [0] * len(items)
+        for position, node in enumerate(self.__order__):
+            self.__positions__[node] = position
+
+        # Earliest start and the longest chain of durations after the item ("tail")
+        self.__earliest__: list[int] = []
+        self.__tails__: list[int] = []
+        if self.__use_numpy__:
+            self.__compute_numpy()
+        else:
+            self.__compute()
+
+    def __len__(self) -> int:
+        return len(self.__ids__)
+
+    def __topological_order(self) -> list[int]:
+        n_preds = [len(preds) for preds in self.__preds__]
+        order = [node for node, count in enumerate(n_preds) if count == 0]
+        for node in order:  # order grows while it is iterated
+            for successor in self.__succs__[node]:
+                n_preds[successor] -= 1
+                if n_preds[successor] == 0:
+                    order.append(successor)
+        if len(order) < len(n_preds):
+            in_cycle = sorted(self.__ids__[node] for node, count in enumerate(n_preds) if count)
+            raise ValueError(f"Cyclic dependencies between {in_cycle}!")
+        return order
+
+    def __compute(self):
+        durations, preds, succs = self.__durations__, self.__preds__, self.__succs__
+        earliest = list(self.__starts__)
+        for node in self.__order__:
+            for predecessor in preds[node]:
+                finish = earliest[predecessor] + durations[predecessor]
+                if finish > earliest[node]:
+                    earliest[node] = finish
+        tails = [0] * len(earliest)
+        for node in reversed(self.__order__):
+            for successor in succs[node]:
+                tail = durations[successor] + tails[successor]
+                if tail > tails[node]:
+                    tails[node] = tail
+        self.__earliest__ = earliest
+        self.__tails__ = tails
+
+    def __compute_numpy(self):
+        """The passes of __compute, vectorized over the levels of the graph"""
+        n_nodes = len(self.__ids__)
+        levels = [0] * n_nodes
+        for node in self.__order__:
+            for successor in self.__succs__[node]:
+                levels[successor] = max(levels[successor], levels[node] + 1)
+
+        level = _numpy.array(levels, dtype=_numpy.int64)
+        durations = _numpy.array(self.__durations__, dtype=_numpy.int64)
+        earliest = _numpy.array(self.__starts__, dtype=_numpy.int64)
+        tails = _numpy.zeros(n_nodes, dtype=_numpy.int64)
+        sources = _numpy.array(
+            [node for node in range(n_nodes) for _ in self.__succs__[node]], dtype=_numpy.int64
+        )
+        targets = _numpy.array(
+            [successor for node in range(n_nodes) for successor in self.__succs__[node]],
+            dtype=_numpy.int64,
+        )
+        n_levels = int(level.max()) + 1 if n_nodes else 0
+
+        # Edges grouped by the level of their source (forward) and target (backward)
+        by_source = _numpy.argsort(level[sources], kind="stable")
+        source_bounds = _numpy.searchsorted(level[sources][by_source], _numpy.arange(n_levels + 1))
+        for i_level in range(n_levels):
+            edges = by_source[source_bounds[i_level] : source_bounds[i_level + 1]]
+            if len(edges):
+                finish = earliest[sources[edges]] + durations[sources[edges]]
+                _numpy.maximum.at(earliest, targets[edges], finish)
+
+        by_target = _numpy.argsort(level[targets], kind="stable")
+        target_bounds = _numpy.searchsorted(level[targets][by_target], _numpy.arange(n_levels + 1))
+        for i_level in reversed(range(n_levels)):
+            edges = by_target[target_bounds[i_level] : target_bounds[i_level + 1]]
+            if len(edges):
+                tail = durations[targets[edges]] + tails[targets[edges]]
+                _numpy.maximum.at(tails, sources[edges], tail)
+
+        self.__earliest__ = earliest.tolist()
+        self.__tails__ = tails.tolist()
+
+    @property
+    def end(self) -> int:
+        """Day (exclusive) on which all scheduled items are finished"""
+        durations = self.__durations__
+        return max(
+            (start + durations[node] for node, start in enumerate(self.__earliest__)),
+            default=self.__begin__,
+        )
+
+    def __node(self, item_id: str) -> int:
+        node = self.__nodes__.get(item_id)
+        if node is None:
+            raise ValueError(f"Item with id {item_id} is not scheduled!")
+        return node
+
+    def timing(self, item_id: str) -> Timing:
+        node = self.__node(item_id)
+        return self.__timing(node, self.end)
+
+    def __timing(self, node: int, end: int) -> Timing:
+        earliest, duration_ = self.__earliest__[node], self.__durations__[node]
+        latest_finish = end - self.__tails__[node]
+        latest_start = latest_finish - duration_
+        return Timing(
+            earliest, earliest + duration_, latest_start, latest_finish, latest_start - earliest
+        )
+
+    def timings(self) -> dict[str, Timing]:
+        end = self.end
+        return {item_id: self.__timing(node, end) for node, item_id in enumerate(self.__ids__)}
+
+    def predecessors(self, item_id: str) -> list[str]:
+        return [self.__ids__[node] for node in self.__preds__[self.__node(item_id)]]
+
+    def successors(self, item_id: str) -> list[str]:
+        return [self.__ids__[node] for node in self.__succs__[self.__node(item_id)]]
+
+    def critical_path(self) -> list[str]:
+        """Ids of a chain of critical items that determines the end, in schedule order"""
+        if not self.__ids__:
+            return []
+        end = self.end
+        durations, earliest, tails = self.__durations__, self.__earliest__, self.__tails__
+        # Start with the critical item (no slack) that starts first
+        node = min(
+            (
+                node
+                for node in self.__order__
+                if earliest[node] + durations[node] + tails[node] == end
+            ),
+            key=lambda node: (earliest[node], self.__positions__[node]),
+        )
+        path = [node]
+        while self.__tails__[node] > 0:
+            # Follow a successor that is part of the longest remaining chain
+            node = next(
+                successor
+                for successor in self.__succs__[node]
+                if durations[successor] + tails[successor] == tails[node]
+            )
+            path.append(node)
+        return [self.__ids__[node] for node in path]
+
+    def add_dependency(self, item_id: str, predecessor_id: str):
+        """item_id cannot start before predecessor_id is finished (stored on the board)"""
+        node, predecessor = self.__node(item_id), self.__node(predecessor_id)
+        if predecessor in self.__preds__[node]:
+            return
+        self.__reorder(predecessor, node)
+
+        item = self.__board__.get(item_id)
+        assert item is not None
+        depends_on = dependencies(item) + [predecessor_id]
+        self.__board__.insert({"id": item_id, "category": item["category"], DEPENDS_ON: depends_on})
+
+        self.__preds__[node].append(predecessor)
+        self.__succs__[predecessor].append(node)
+        self.__propagate([node], [predecessor])
+
+    def remove_dependency(self, item_id: str, predecessor_id: str):
+        node, predecessor = self.__node(item_id), self.__node(predecessor_id)
+        if predecessor not in self.__preds__[node]:
+            return
+
+        item = self.__board__.get(item_id)
+        assert item is not None
+        depends_on = [
+            dependency for dependency in dependencies(item) if dependency != predecessor_id
+        ]
+        self.__board__.insert({"id": item_id, "category": item["category"], DEPENDS_ON: depends_on})
+
+        self.__preds__[node].remove(predecessor)
+        self.__succs__[predecessor].remove(node)
+        self.__propagate([node], [predecessor])
+
+    def update(self, item_ids: Iterable[str]):
+        """Takes over changed dates of scheduled items from the board.
+
+        Items added to or deleted from the board need a new Schedule.
+        """
+        changed = []
+        for item_id in item_ids:
+            node = self.__node(item_id)
+            item = self.__board__.get(item_id)
+            assert item is not None
+            span = dates.interval(item)
+            start = self.__begin__ if span is None else span[0]
+            duration_ = duration(item)
+            if (start, duration_) != (self.__starts__[node], self.__durations__[node]):
+                self.__starts__[node] = start
+                self.__durations__[node] = duration_
+                changed.append(node)
+        self.__propagate(changed, changed)
+
+    def __reorder(self, predecessor: int, node: int):
+        """Keeps the topological order valid for a new edge predecessor -> node.
+
+        Only the items between both in the order are moved (Pearce-Kelly). Raises a
+        ValueError if the edge would close a cycle.
+        """
+        positions = self.__positions__
+        upper = positions[predecessor]
+        if positions[node] > upper:
+            return
+        # Items reachable from node that are not after predecessor in the order
+        forward = self.__reachable(node, self.__succs__, lambda other: positions[other] <= upper)
+        if predecessor in forward:
+            raise ValueError(
+                f"Dependency of {self.__ids__[node]} on {self.__ids__[predecessor]} "
+                "would create a cycle!"
+            )
+        lower = positions[node]
+        backward = self.__reachable(
+            predecessor, self.__preds__, lambda other: positions[other] >= lower
+        )
+
+        moved = sorted(backward, key=positions.__getitem__) + sorted(
+            forward, key=positions.__getitem__
+        )
+        for position, other in zip(sorted(positions[other] for other in moved), moved):
+            positions[other] = position
+            self.__order__[position] = other
+
+    @staticmethod
+    def __reachable(start: int, edges: list[list[int]], within) -> set[int]:
+        reached = {start}
+        stack = [start]
+        while stack:
+            for other in edges[stack.pop()]:
+                if other not in reached and within(other):
+                    reached.add(other)
+                    stack.append(other)
+        return reached
+
+    def __propagate(self, forward: list[int], backward: list[int]):
+        """Recomputes the earliest starts after forward and the tails before backward
+
+        Items are visited in topological order and only as long as times change.
+        """
+        durations, preds, succs = self.__durations__, self.__preds__, self.__succs__
+        earliest, tails, positions = self.__earliest__, self.__tails__, self.__positions__
+
+        heap = [(positions[node], node) for node in forward]
+        heapq.heapify(heap)
+        seeds, done = set(forward), set()
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            value = max(
+                (earliest[other] + durations[other] for other in preds[node]),
+                default=self.__starts__[node],
+            )
+            value = max(value, self.__starts__[node])
+            if value != earliest[node] or node in seeds:
+                earliest[node] = value
+                for successor in succs[node]:
+                    heapq.heappush(heap, (positions[successor], successor))
+
+        heap = [(-positions[node], node) for node in backward]
+        heapq.heapify(heap)
+        seeds, done = set(backward), set()
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            value = max((durations[other] + tails[other] for other in succs[node]), default=0)
+            if value != tails[node] or node in seeds:
+                tails[node] = value
+                for predecessor in preds[node]:
+                    heapq.heappush(heap, (-positions[predecessor], predecessor))
@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Full-text search over the names and descriptions of the items of all boards.
+
+SearchIndex is an inverted index of one board: for every token the items that
+contain it, weighted by how often (a token in the name counts NAME_WEIGHT times).
+It follows the changes of an open board as observer (see Projectboard.observe),
+so it never has to be rebuilt while the board is open. A sorted vocabulary makes
+prefix queries a bisect.
+
+Queries: all terms have to match, "OR" between two terms matches either of them,
+"-term" or "NOT term" excludes items, "term*" matches all tokens starting with
+term. Hits are ranked by tf-idf.
+
+BoardSearch holds the indexes of all registered boards. The index of a board is
+stored in defaults.SEARCH_DIR together with the signature of the board file, so
+closed boards only have to be read again after they changed.
+
+    search = BoardSearch()
+    search.attach(board)
+    hits = search.search("report OR review -draft", filenames)
+"""
+
+import bisect
+import hashlib
+import heapq
+import math
+import os
+import re
+import threading
+from collections.abc import Iterable
+from collections.abc import Mapping
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+from data import defaults
+from data import storages
+from data.catalog import Signature
+from data.catalog import signature
+from data.data import Projectboard
+
+# pylint: enable=import-error
+
+
+SEARCH_VERSION = 1
+NAME_WEIGHT = 3
+# Shorter prefixes are matched as complete words
+MIN_PREFIX = 2
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """The lower case words of text"""
+    if not text:
+        return []
+    return _TOKEN.findall(text.casefold())
+
+
+def item_terms(name: Optional[str], description: Optional[str]) -> dict[str, int]:
+    """The weight of every token of an item"""
+    terms: dict[str, int] = {}
+    for token in tokenize(name):
+        terms[token] = terms.get(token, 0) + NAME_WEIGHT
+    for token in tokenize(description):
+        terms[token] = terms.get(token, 0) + 1
+    return terms
+
+
+class Hit(NamedTuple):
+    score: float
+    item_id: str
+    name: str
+    category: str
+    filename: str = ""
+
+
+class _Term(NamedTuple):
+    token: str
+    prefix: bool
+
+
+def parse_query(query: str, prefix_last: bool = False) -> tuple[list[list[_Term]], list[_Term]]:
+    """Splits query into the groups of alternatives that all have to match and the
+    excluded terms.
+
+    With prefix_last, the last word is a prefix unless query ends with a space
+    (search as you type).
+    """
+    words = query.split()
+    if prefix_last and words and not query[-1].isspace() and not words[-1].endswith("*"):
+        words[-1] += "*"
+
+    groups: list[list[_Term]] = []
+    excluded: list[_Term] = []
+    join = negate = False
+    for word in words:
+        if word == "OR":
+            join = bool(groups)
+            continue
+        if word == "NOT":
+            negate = True
+            continue
+        if word.startswith("-"):
+            negate = True
+            word = word[1:]
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        terms = [_Term(token, False) for token in tokens[:-1]] + [_Term(tokens[-1], prefix)]
+        if negate:
+            excluded.extend(terms)
+        elif join:
+            # "a OR b-c" : the alternative is the first token, the others are required
+            groups[-1].append(terms[0])
+            groups.extend([term] for term in terms[1:])
+        else:
+            groups.extend([term] for term in terms)
+        join = negate = False
+    return groups, excluded
+
+
+class SearchIndex:
+    def __init__(self):
+        # token -> {item id: weight}
+        self.__postings__: dict[str, dict[str, int]] = {}
+        # item id -> [name, category]
+        self.__items__: dict[str, list[str]] = {}
+        self.__vocabulary__: list[str] = []
+
+    @classmethod
+    def from_board(cls, board: Projectboard) -> "SearchIndex":
+        index = cls()
+        postings = index.__postings__
+        for item_id, name, category, description in board.iter_values(
+            "id", "name", "category", "description"
+        ):
+            if item_id is None or not category:
+                continue
+            index.__items__[item_id] = [name or "", category]
+            for token, weight in item_terms(name, description).items():
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = {item_id: weight}
+                else:
+                    posting[item_id] = weight
+        index.__vocabulary__ = sorted(postings)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.__items__)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self.__items__
+
+    def add(self, item: Mapping[str, Any]):
+        """Adds (or replaces) an item (dict or Item)"""
+        item_id = item["id"]
+        self.remove(item_id)
+        self.__items__[item_id] = [item.get("name") or "", item.get("category") or ""]
+        for token, weight in item_terms(item.get("name"), item.get("description")).items():
+            posting = self.__postings__.get(token)
+            if posting is None:
+                self.__postings__[token] = {item_id: weight}
+                bisect.insort(self.__vocabulary__, token)
+            else:
+                posting[item_id] = weight
+
+    def remove(self, item_id: str, item: Optional[Mapping[str, Any]] = None):
+        """Removes an item. Pass the indexed version of the item if it is known, otherwise
+        all tokens have to be checked.
+        """
+        if self.__items__.pop(item_id, None) is None:
+            return
+        if item is None:
+            tokens: Iterable[str] = list(self.__postings__)
+        else:
+            tokens = item_terms(item.get("name"), item.get("description"))
+        for token in tokens:
+            posting = self.__postings__.get(token)
+            if posting is None or posting.pop(item_id, None) is None or posting:
+                continue
+            del self.__postings__[token]
+            del self.__vocabulary__[bisect.bisect_left(self.__vocabulary__, token)]
+
+    def update(
+        self,
+        item_id: str,
+        old: Optional[Mapping[str, Any]],
+        new: Optional[Mapping[str, Any]],
+    ):
+        """Follows a change of an item; fits as observer of a Projectboard (except for the
+        rebuild after a rollback, see Projectboard.observe)
+        """
+        self.remove(item_id, old)
+        if new is not None and new.get("category"):
+            self.add(new)
+
+    def tokens(self, prefix: str) -> list[str]:
+        """All tokens of the index that start with prefix"""
+        vocabulary = self.__vocabulary__
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(prefix):
+            end += 1
+        return vocabulary[start:end]
+
+    def __postings(self, term: _Term) -> list[dict[str, int]]:
+        if term.prefix and len(term.token) >= MIN_PREFIX:
+            return [self.__postings__[token] for token in self.tokens(term.token)]
+        posting = self.__postings__.get(term.token)
+        return [] if posting is None else [posting]
+
+    def __scores(
+        self, group: list[_Term], candidates: Optional[dict[str, float]] = None
+    ) -> dict[str, float]:
+        """tf-idf scores of the items matching any term of group (and in candidates)"""
+        n_items = len(self.__items__)
+        scores: dict[str, float] = {}
+        for term in group:
+            for posting in self.__postings(term):
+                idf = math.log(1 + n_items / len(posting))
+                if candidates is not None and len(candidates) < len(posting):
+                    matches = (
+                        (item_id, posting[item_id]) for item_id in candidates if item_id in posting
+                    )
+                else:
+                    matches = posting.items()
+                for item_id, weight in matches:
+                    if candidates is None or item_id in candidates:
+                        scores[item_id] = scores.get(item_id, 0.0) + weight * idf
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = 50, prefix_last: bool = False) -> list[Hit]:
+        """The best matching items, best first (see parse_query)"""
+        groups, excluded = parse_query(query, prefix_last)
+        if not groups:
+            return []
+
+        # The most selective group first, the others only score its matches
+        groups.sort(key=lambda group: sum(map(len, map(self.__postings, group))))
+        result = self.__scores(groups[0])
+        for group in groups[1:]:
+            if not result:
+                break
+            scores = self.__scores(group, result)
+            result = {item_id: result[item_id] + score for item_id, score in scores.items()}
+        for term in excluded:
+            for posting in self.__postings(term):
+                for item_id in posting:
+                    result.pop(item_id, None)
+
+        if limit is None:
+            best = sorted(result.items(), key=lambda entry: -entry[1])
+        else:
+            best = heapq.nlargest(limit, result.items(), key=lambda entry: entry[1])
+        items = self.__items__
+        return [Hit(score, item_id, *items[item_id]) for item_id, score in best]
+
+    def to_dict(self) -> dict[str, Any]:
+        """The content of the index (not copied), e.g. to store it as JSON"""
+        return {"items": self.__items__, "postings": self.__postings__}
+
+    @classmethod
+    def from_dict(cls, content: Mapping[str, Any]) -> "SearchIndex":
+        """The index of content (see to_dict), which is taken over, not copied"""
+        index = cls()
+        index.__items__ = content["items"]
+        index.__postings__ = content["postings"]
+        index.__vocabulary__ = sorted(index.__postings__)
+        return index
+
+
+def index_filename(filename: str, directory: str = defaults.SEARCH_DIR) -> str:
+    """The file the search index of a board is stored in"""
+    key = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+    return os.path.join(os.path.expanduser(directory), f"{key}.json")
+
+
+class BoardSearch:
+    def __init__(self, directory: str = defaults.SEARCH_DIR):
+        self.__directory__ = directory
+        self.__indexes__: dict[str, SearchIndex] = {}
+        # Signature of the board file an index of a closed board was built from
+        self.__signatures__: dict[str, Optional[Signature]] = {}
+        # Open boards: filename -> (board, observer)
+        self.__attached__: dict[str, tuple[Projectboard, Any]] = {}
+        self.__lock__ = threading.RLock()
+
+    def attach(self, board: Projectboard):
+        """Keeps the index of an open board up to date with its changes"""
+        key = os.path.abspath(board.get_filename())
+        self.detach(board)
+
+        def changed(item_id: Optional[str], old: Optional[dict], new: Optional[dict]):
+            with self.__lock__:
+                if item_id is None:
+                    self.__indexes__[key] = SearchIndex.from_board(board)
+                else:
+                    self.__indexes__[key].update(item_id, old, new)
+
+        with self.__lock__:
+            if board.is_dirty() or self.__load(key) is None:
+                self.__indexes__[key] = SearchIndex.from_board(board)
+            self.__attached__[key] = (board, changed)
+        board.observe(changed)
+
+    def detach(self, board: Projectboard):
+        key = os.path.abspath(board.get_filename())
+        with self.__lock__:
+            attached = self.__attached__.pop(key, None)
+            if attached is None:
+                return
+            if board.is_dirty():
+                # The file does not contain the indexed changes
+                self.__indexes__.pop(key, None)
+            else:
+                self.__signatures__[key] = signature(key)
+        board.unobserve(attached[1])
+
+    def save_index(self, board: Projectboard):
+        """Stores the index of an attached board; call it after the board was saved"""
+        if board.is_dirty():
+            return
+        key = os.path.abspath(board.get_filename())
+        with self.__lock__:
+            index = self.__indexes__.get(key)
+            if index is not None:
+                self.__store(key, index, signature(key))
+
+    def forget(self, filename: str):
+        """Drops the index of a board that is no longer registered"""
+        key = os.path.abspath(filename)
+        with self.__lock__:
+            self.__indexes__.pop(key, None)
+            self.__signatures__.pop(key, None)
+        try:
+            os.remove(index_filename(key, self.__directory__))
+        except OSError:
+            pass
+
+    def __store(self, key: str, index: SearchIndex, file_signature: Optional[Signature]):
+        content = codec.dumps(
+            {
+                "version": SEARCH_VERSION,
+                "filename": key,
+                "signature": file_signature,
+                "items": index.to_dict(),
+            }
+        )
+        filename = index_filename(key, self.__directory__)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        storages.write_atomic(filename, content)
+
+    def __load(self, key: str) -> Optional[SearchIndex]:
+        """Reads the stored index of a board if it matches the board file"""
+        try:
+            with open(index_filename(key, self.__directory__), "rb") as index_file:
+                content = codec.loads(index_file.read())
+        except (OSError, ValueError):
+            return None
+        file_signature = signature(key)
+        if (
+            content.get("version") != SEARCH_VERSION
+            or content.get("filename") != key
+            or content.get("signature") != file_signature
+        ):
+            return None
+        index = SearchIndex.from_dict(content["items"])
+        self.__indexes__[key] = index
+        self.__signatures__[key] = file_signature
+        return index
+
+    def index(self, filename: str) -> Optional[SearchIndex]:
+        """The index of a board; read (and stored) again if the board file changed.
+
+        None if the file does not exist or cannot be read.
+        """
+        key = os.path.abspath(filename)
+        file_signature = signature(key)
+        with self.__lock__:
+            index = self.__indexes__.get(key)
+            if key in self.__attached__ or (
+                index is not None and self.__signatures__.get(key) == file_signature
+            ):
+                return index
+            if file_signature is None:
+                return None
+            index = self.__load(key)
+            if index is not None:
+                return index
+        return self.__build(key, file_signature)
+
+    def __build(self, key: str, file_signature: Signature) -> Optional[SearchIndex]:
+        """Indexes a board file that has no (valid) stored index and stores the index"""
+        try:
+            board = Projectboard("", key, lazy=True, read_only=True)
+        except (OSError, ValueError):
+            return None
+        try:
+            index = SearchIndex.from_board(board)
+        finally:
+            board.close()
+
+        with self.__lock__:
+            if key in self.__attached__:
+                # Opened in the meantime
+                return self.__indexes__[key]
+            self.__indexes__[key] = index
+            self.__signatures__[key] = file_signature
+            self.__store(key, index, file_signature)
+        return index
+
+    def refresh(self, filenames: Iterable[str]):
+        """Builds the missing and outdated indexes of filenames"""
+        for filename in filenames:
+            self.index(filename)
+
+    def refresh_in_background(self, filenames: Iterable[str]) -> threading.Thread:
+        """Like refresh, in a background thread, so the first search is fast"""
+        thread = threading.Thread(target=self.refresh, args=(list(filenames),), daemon=True)
+        thread.start()
+        return thread
+
+    def search(
+        self,
+        query: str,
+        filenames: Iterable[str],
+        limit: Optional[int] = 50,
+        prefix_last: bool = False,
+    ) -> list[Hit]:
+        """The best matching items of all boards in filenames, best first"""
+        hits: list[Hit] = []
+        for filename in filenames:
+            index = self.index(filename)
+            if index is None:
+                continue
+            with self.__lock__:
+                board_hits = index.search(query, limit, prefix_last)
+            hits.extend(hit._replace(filename=filename) for hit in board_hits)
+        if limit is None:
+            return sorted(hits, key=lambda hit: -hit.score)
+        return heapq.nlargest(limit, hits, key=lambda hit: hit.score)
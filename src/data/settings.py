@@ -21,13 +21,13 @@
 
 # pylint: disable=missing-docstring
 
-import json
 import os
 from pathlib import Path
 from typing import Any
 
 # pylint: disable=import-error
-from data import defaults  # type: ignore
+from data import codec  # type: ignore
+from data import defaults
 
 # pylint: enable=import-error
 
@@ -42,6 +42,7 @@ def __set_default_settings__():
     __settings__["window_height"] = 800
     __settings__["data_dir"] = os.path.expanduser(defaults.DATA_DIR)
     __settings__["default_states"] = defaults.DEFAULT_STATES
+    __settings__["journal"] = True
 
 
 def reset_to_default_settings():
@@ -84,17 +85,12 @@ def load_settings():
         save_settings()
         return
 
-    with open(filename, "rt", encoding="UTF-8") as settings_file:
-        json_str = "\n".join(settings_file.readlines())
-
-    decoder = json.JSONDecoder()
-    json_dict = decoder.decode(json_str)
+    with open(filename, "rb") as settings_file:
+        json_dict = codec.loads(settings_file.read())
     __settings__.update(json_dict)
 
 
 def save_settings():
-    encoder = json.JSONEncoder()
-    json_str = encoder.encode(__settings__)
     filename = os.path.expanduser(__SETTINGS_FILE__)
-    with open(filename, "wt", encoding="UTF-8") as settings_file:
-        settings_file.write(json_str)
+    with open(filename, "wb") as settings_file:
+        settings_file.write(codec.dumps(__settings__))
@@ -25,15 +25,23 @@ from typing import List
 from typing import Optional
 from typing import Self
 
+HISTORY_LENGTH = 16
+
 
 class StateInt:
     def __init__(
-        self, initial_state: int, allowed_states: List[int], state_names: Optional[List[str]] = None
+        self,
+        initial_state: int,
+        allowed_states: List[int],
+        state_names: Optional[List[str]] = None,
+        history_length: int = HISTORY_LENGTH,
     ):
+        """The last history_length states are kept (at least 2, see prev_state)"""
         if initial_state not in allowed_states:
             raise ValueError("Initial state must be an allowed state!")
         self.__state__ = [initial_state]
         self.__allowed__ = list(allowed_states)
+        self.__history_length__ = max(2, history_length)
 
         self.__state_names__ = None
         if state_names is not None and len(allowed_states) == len(state_names):
@@ -50,6 +58,9 @@ class StateInt:
                 f"{new_state=} is not a valid state! Valid states: {self.__allowed__}!"
             )
         self.__state__.append(new_state)
+        if len(self.__state__) > 2 * self.__history_length__:
+            # Trimmed in chunks, so setting a state stays O(1) on average
+            del self.__state__[: -self.__history_length__]
 
     @property
     def prev_state(self) -> int:
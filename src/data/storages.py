@@ -0,0 +1,700 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+
+# pylint: disable=import-error
+from tinydb.storages import MemoryStorage
+from tinydb.storages import Storage
+
+from data import boardfile  # type: ignore
+from data import codec
+
+# pylint: enable=import-error
+
+
+BACKENDS = ("json", "journal", "sqlite", "binary")
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+SQLITE_MEMORY = ":memory:"
+JOURNAL_SUFFIX = ".journal"
+# Journal being compacted (see JournalStorage)
+PENDING_SUFFIX = JOURNAL_SUFFIX + ".1"
+# SQLite write-ahead log
+WAL_SUFFIX = "-wal"
+# Files next to a board that hold saved changes not yet merged into the board file
+COMPANION_SUFFIXES = (JOURNAL_SUFFIX, PENDING_SUFFIX, WAL_SUFFIX)
+COMPACTION_MIN_SIZE = 2**20
+
+Tables = dict[str, dict[str, Any]]
+Document = tuple[str, str, dict]
+
+DEFAULT_TABLE = "_default"
+JSON_CHUNK_SIZE = 2**16
+SQLITE_CHUNK_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    tbl TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    id,
+    parent,
+    category,
+    state,
+    document TEXT NOT NULL,
+    PRIMARY KEY (tbl, doc_id)
+);
+CREATE INDEX IF NOT EXISTS documents_id ON documents (id);
+CREATE INDEX IF NOT EXISTS documents_parent ON documents (parent);
+CREATE INDEX IF NOT EXISTS documents_category ON documents (category);
+CREATE INDEX IF NOT EXISTS documents_state ON documents (state);
+"""
+
+_UPSERT = (
+    "INSERT OR REPLACE INTO documents (tbl, doc_id, id, parent, category, state, document) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class AtomicJSONStorage(Storage):
+    """Stores a board as JSON file that is only written by flush().
+
+    The file is read once and then served from memory, like with
+    CachingMiddleware(JSONStorage). flush() writes a temporary file, fsyncs it and
+    renames it over the board file, so an interrupted save never leaves a
+    half-written board behind. If the content did not change since the last read or
+    flush, nothing is written.
+    """
+
+    def __init__(self, path: str, create_dirs: bool = False, **_kwargs):
+        super().__init__()
+        if create_dirs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__path__ = path
+        self.__cache__: Optional[Tables] = None
+        self.__modified__ = False
+        self.content_hash: Optional[str] = None
+
+    def read(self) -> Optional[Tables]:
+        if self.__cache__ is None and os.path.exists(self.__path__):
+            with open(self.__path__, "rb") as board_file:
+                content = board_file.read()
+            if content:
+                self.__cache__ = self._decode(content)
+                self.content_hash = hashlib.sha256(content).hexdigest()
+        return self.__cache__
+
+    def write(self, data: Tables):
+        self.__cache__ = data
+        self.__modified__ = True
+
+    def flush(self):
+        if not self.__modified__:
+            return
+        content = self._encode(self.__cache__)
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash != self.content_hash:
+            write_atomic(self.__path__, content)
+            self.content_hash = content_hash
+        self.__modified__ = False
+
+    def close(self):
+        self.flush()
+
+    def _encode(self, data: Tables) -> bytes:
+        return codec.dumps(data)
+
+    def _decode(self, content: bytes) -> Tables:
+        return codec.loads(content)
+
+
+class BinaryStorage(AtomicJSONStorage):
+    """Stores a board in the binary format of data.boardfile (.pbb).
+
+    Saving works like for AtomicJSONStorage (atomic, skipped without changes).
+    """
+
+    def _encode(self, data: Tables) -> bytes:
+        return boardfile.dumps(data)
+
+    def _decode(self, content: bytes) -> Tables:
+        return boardfile.loads(content)
+
+
+class SQLiteStorage(Storage):
+    """Stores the documents of a board as rows of an SQLite database.
+
+    The id, parent, category and state of every document are kept in indexed
+    columns next to the JSON text of the document. The database is read once and
+    then served from memory. Changed documents are written as single rows
+    (see write_documents) and committed by flush(), so saving a board does not
+    rewrite the unchanged documents.
+    """
+
+    def __init__(self, path: str, **_kwargs):
+        super().__init__()
+        self.__path__ = path
+        self.__connection__: Optional[sqlite3.Connection] = sqlite3.connect(path)
+        if path != SQLITE_MEMORY:
+            self.__connection__.execute("PRAGMA journal_mode=WAL")
+            self.__connection__.execute("PRAGMA synchronous=NORMAL")
+        self.__connection__.executescript(_SCHEMA)
+        self.__cache__: Optional[Tables] = None
+
+    def __cursor(self) -> sqlite3.Connection:
+        if self.__connection__ is None:
+            raise ValueError(f"SQLite database {self.__path__} is closed!")
+        return self.__connection__
+
+    def read(self) -> Tables:
+        if self.__cache__ is None:
+            tables: Tables = {}
+            rows = self.__cursor().execute("SELECT tbl, doc_id, document FROM documents")
+            for table, doc_id, document in rows:
+                tables.setdefault(table, {})[doc_id] = codec.loads(document)
+            self.__cache__ = tables
+        return self.__cache__
+
+    def write(self, data: Tables):
+        """Replaces the complete content of the database"""
+        connection = self.__cursor()
+        connection.execute("DELETE FROM documents")
+        for table, documents in data.items():
+            self.write_documents(table, documents)
+        self.__cache__ = data
+
+    def write_documents(self, table: str, documents: dict[str, Optional[dict]]):
+        """Writes the given documents of a table; documents that are None are deleted"""
+        connection = self.__cursor()
+        removed = [(table, doc_id) for doc_id, document in documents.items() if document is None]
+        rows = [
+            (
+                table,
+                doc_id,
+                document.get("id"),
+                document.get("parent"),
+                document.get("category"),
+                document.get("state"),
+                codec.dumps(document).decode("utf-8"),
+            )
+            for doc_id, document in documents.items()
+            if document is not None
+        ]
+        connection.executemany("DELETE FROM documents WHERE tbl = ? AND doc_id = ?", removed)
+        connection.executemany(_UPSERT, rows)
+
+    def flush(self):
+        self.__cursor().commit()
+
+    def close(self):
+        if self.__connection__ is not None:
+            self.__connection__.commit()
+            self.__connection__.close()
+            self.__connection__ = None
+
+
+class JournalStorage(Storage):
+    """Stores a board as JSON snapshot plus an append-only journal of changed documents.
+
+    Every write appends one line with the changed documents (see write_documents) to
+    <path>.journal; flush() only has to fsync the journal. On opening, the journal is
+    replayed on top of the snapshot. The snapshot file has the same format as the one
+    written by JSONStorage.
+
+    Once the journal is larger than the snapshot (and at least COMPACTION_MIN_SIZE),
+    the journal is compacted: the current state is serialized, the journal is moved to
+    <path>.journal.1 and a new journal is started. Writing the snapshot and removing
+    the old journal happens in a background thread. Replaying is idempotent, because
+    every journal line holds complete documents.
+    """
+
+    def __init__(self, path: str, create_dirs: bool = False, **_kwargs):
+        super().__init__()
+        if create_dirs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__path__ = path
+        self.__journal_path__ = path + JOURNAL_SUFFIX
+        self.__pending_path__ = path + PENDING_SUFFIX
+        self.__compaction__: Optional[threading.Thread] = None
+        self.__snapshot_size__ = 0
+        self.__journal_size__ = 0
+        self.__journal__: Optional[Any] = None
+
+        self.__cache__ = self.__replay()
+        if os.path.exists(self.__pending_path__):
+            # An earlier compaction was interrupted
+            self.__write_snapshot(codec.dumps(self.__cache__), self.__pending_path__)
+            self.__truncate_journal()
+        self.__journal__ = open(self.__journal_path__, "ab")  # pylint: disable=consider-using-with
+
+    def __replay(self) -> Tables:
+        tables: Tables = {}
+        if os.path.exists(self.__path__) and os.path.getsize(self.__path__) > 0:
+            with open(self.__path__, "rb") as snapshot:
+                tables = codec.loads(snapshot.read())
+            self.__snapshot_size__ = os.path.getsize(self.__path__)
+
+        for journal_path in (self.__pending_path__, self.__journal_path__):
+            if not os.path.exists(journal_path):
+                continue
+            valid_size = 0
+            with open(journal_path, "rb") as journal:
+                for line in journal:
+                    try:
+                        entry = codec.loads(line)
+                    except ValueError:
+                        # Incomplete last line of a crashed write
+                        break
+                    _apply_documents(tables, entry["table"], entry["documents"])
+                    valid_size += len(line)
+            if valid_size < os.path.getsize(journal_path):
+                os.truncate(journal_path, valid_size)
+            if journal_path == self.__journal_path__:
+                self.__journal_size__ = valid_size
+
+        return tables
+
+    def __handle(self) -> Any:
+        if self.__journal__ is None:
+            raise ValueError(f"Journal of {self.__path__} is closed!")
+        return self.__journal__
+
+    def read(self) -> Tables:
+        return self.__cache__
+
+    def write(self, data: Tables):
+        """Replaces the complete content: writes a new snapshot and clears the journal"""
+        self.__wait_for_compaction()
+        self.__cache__ = data
+        self.__write_snapshot(codec.dumps(data))
+        self.__truncate_journal()
+
+    def write_documents(self, table: str, documents: dict[str, Optional[dict]]):
+        line = codec.dumps({"table": table, "documents": documents}) + b"\n"
+        self.__handle().write(line)
+        self.__journal_size__ += len(line)
+
+        if self.__journal_size__ > max(COMPACTION_MIN_SIZE, self.__snapshot_size__):
+            self.compact(background=True)
+
+    def flush(self):
+        journal = self.__handle()
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    def compact(self, background: bool = False):
+        """Writes the current state as snapshot and starts a new journal"""
+        self.__wait_for_compaction()
+        journal = self.__handle()
+        journal.close()
+        os.replace(self.__journal_path__, self.__pending_path__)
+        self.__journal__ = open(self.__journal_path__, "ab")  # pylint: disable=consider-using-with
+        self.__journal_size__ = 0
+
+        serialized = codec.dumps(self.__cache__)
+        self.__snapshot_size__ = len(serialized)
+        if background:
+            self.__compaction__ = threading.Thread(
+                target=self.__write_snapshot, args=(serialized, self.__pending_path__)
+            )
+            self.__compaction__.start()
+        else:
+            self.__write_snapshot(serialized, self.__pending_path__)
+
+    def __wait_for_compaction(self):
+        if self.__compaction__ is not None:
+            self.__compaction__.join()
+            self.__compaction__ = None
+
+    def __write_snapshot(self, serialized: bytes, processed_journal: Optional[str] = None):
+        write_atomic(self.__path__, serialized)
+        self.__snapshot_size__ = len(serialized)
+        if processed_journal is not None and os.path.exists(processed_journal):
+            os.remove(processed_journal)
+
+    def __truncate_journal(self):
+        if self.__journal__ is not None:
+            self.__journal__.truncate(0)
+        elif os.path.exists(self.__journal_path__):
+            os.truncate(self.__journal_path__, 0)
+        self.__journal_size__ = 0
+
+    def close(self):
+        if self.__journal__ is None:
+            return
+        if self.__journal_size__ > 0:
+            self.compact()
+        self.__wait_for_compaction()
+        self.__journal__.close()
+        self.__journal__ = None
+
+
+def _apply_documents(tables: Tables, table: str, documents: dict[str, Optional[dict]]):
+    raw_table = tables.setdefault(table, {})
+    for doc_id, document in documents.items():
+        if document is None:
+            raw_table.pop(doc_id, None)
+        else:
+            raw_table[doc_id] = document
+
+
+def write_atomic(filename: str, content: bytes):
+    """Writes content to a temporary file, fsyncs it and renames it to filename"""
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "wb") as tmp_file:
+        tmp_file.write(content)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_filename, filename)
+
+
+def file_hash(filename: str) -> str:
+    """SHA-256 of a file, to compare with Projectboard.content_hash"""
+    with open(filename, "rb") as board_file:
+        return hashlib.file_digest(board_file, "sha256").hexdigest()
+
+
+def detect_backend(filename: str, journal: bool = False) -> str:
+    """Returns the backend for a board file.
+
+    Binary boards are recognized by their extension or content, so a binary board
+    is also opened correctly if it was renamed to .json.
+    .json boards use the journal backend if journal is set or a journal exists.
+    """
+    if filename.endswith(SQLITE_EXTENSIONS):
+        return "sqlite"
+    if filename.endswith(boardfile.EXTENSIONS) or boardfile.is_board_file(filename):
+        return "binary"
+    if journal or os.path.exists(filename + JOURNAL_SUFFIX):
+        return "journal"
+    return "json"
+
+
+def create_storage(backend: str, in_memory: bool = False) -> Callable[..., Storage]:
+    """Returns the storage (factory) that TinyDB should use for the backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend} (valid backends: {BACKENDS})!")
+
+    if backend == "sqlite":
+        return SQLiteStorage
+    if in_memory:
+        return MemoryStorage
+    if backend == "journal":
+        return JournalStorage
+    if backend == "binary":
+        return BinaryStorage
+    return AtomicJSONStorage
+
+
+def read_tables(filename: str) -> Tables:
+    """Reads all documents of a board file.
+
+    The file is only read: journals are replayed in memory but not compacted and
+    SQLite databases are opened read-only, so this is safe while the board is open.
+    """
+    backend = detect_backend(filename)
+    tables: Tables = {}
+    if backend == "sqlite":
+        for table, doc_id, document in _iter_sqlite_documents(filename):
+            tables.setdefault(table, {})[doc_id] = document
+        return tables
+
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        with open(filename, "rb") as board_file:
+            content = board_file.read()
+        tables = boardfile.loads(content) if backend == "binary" else codec.loads(content)
+    if backend == "journal":
+        for table, documents in _iter_journal_entries(filename):
+            _apply_documents(tables, table, documents)
+    return tables
+
+
+def convert_board(source: str, target: str):
+    """Copies a board to a file of another format, e.g. from .json to .sqlite or .pbb.
+
+    The conversion is lossless: all documents and their doc_ids are copied as they are.
+    """
+    if os.path.exists(target):
+        raise FileExistsError(f"Target file {target} already exists!")
+
+    tables = read_tables(source)
+    storage = create_storage(detect_backend(target))(target)
+    try:
+        storage.write(tables)
+    finally:
+        storage.close()
+
+
+def iter_documents(filename: str) -> Iterator[Document]:
+    """Yields all documents of a board file as (table, doc_id, document) tuples.
+
+    JSON, binary and SQLite boards are read front to back, without holding the whole
+    board in memory. Boards with a journal are replayed in memory first.
+    """
+    backend = detect_backend(filename)
+    if backend == "sqlite":
+        yield from _iter_sqlite_documents(filename)
+    elif backend == "journal":
+        for table, documents in read_tables(filename).items():
+            for doc_id, document in documents.items():
+                yield table, doc_id, document
+    elif os.path.exists(filename) and os.path.getsize(filename) > 0:
+        if backend == "binary":
+            with open(filename, "rb") as board_file:
+                yield from boardfile.iter_documents(board_file)
+        else:
+            with open(filename, "rt", encoding="utf-8") as board_file:
+                yield from iter_json_documents(board_file)
+
+
+def write_board(filename: str, documents: Iterable[Document]):
+    """Writes a board file document by document (e.g. from iter_documents).
+
+    The documents of a table have to follow each other. They are written to a
+    temporary file that replaces filename when all are written, so documents may be
+    read from filename while it is written. The journal of a board is merged.
+    """
+    backend = detect_backend(filename)
+    tmp_filename = f"{filename}.tmp"
+    if backend == "sqlite":
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        storage = SQLiteStorage(tmp_filename)
+        try:
+            for table, chunk in _chunks(documents, SQLITE_CHUNK_SIZE):
+                storage.write_documents(table, chunk)
+        finally:
+            storage.close()
+    else:
+        with open(tmp_filename, "wb") as board_file:
+            if backend == "binary":
+                with boardfile.BoardWriter(board_file) as writer:
+                    for table, doc_id, document in documents:
+                        writer.write_document(table, doc_id, document)
+            else:
+                _write_json_documents(board_file, documents)
+            board_file.flush()
+            os.fsync(board_file.fileno())
+    os.replace(tmp_filename, filename)
+
+    if backend == "journal":
+        for journal_path in (filename + PENDING_SUFFIX, filename + JOURNAL_SUFFIX):
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+
+
+def _chunks(
+    documents: Iterable[Document], size: int
+) -> Iterator[tuple[str, dict[str, Optional[dict]]]]:
+    """Groups documents into (table, {doc_id: document}) of at most size documents"""
+    table = ""
+    chunk: dict[str, Optional[dict]] = {}
+    for doc_table, doc_id, document in documents:
+        if chunk and (doc_table != table or len(chunk) >= size):
+            yield table, chunk
+            chunk = {}
+        table = doc_table
+        chunk[doc_id] = document
+    if chunk:
+        yield table, chunk
+
+
+def _write_json_documents(board_file: BinaryIO, documents: Iterable[Document]):
+    """Writes documents in the format of TinyDB's JSON storage"""
+    written: set[str] = set()
+    table = None
+    board_file.write(b"{")
+    for doc_table, doc_id, document in documents:
+        if doc_table != table:
+            if doc_table in written:
+                raise ValueError(f"The documents of table {doc_table} do not follow each other!")
+            if table is not None:
+                board_file.write(b"}, ")
+            table = doc_table
+            written.add(table)
+            board_file.write(codec.dumps(table) + b": {")
+        else:
+            board_file.write(b", ")
+        board_file.write(codec.dumps(str(doc_id)) + b": " + codec.dumps(document))
+    board_file.write(b"}}" if table is not None else b"}")
+
+
+class _JSONScanner:
+    """Reads the values of a JSON file one by one, reading only as much as needed"""
+
+    def __init__(self, json_file: TextIO):
+        self.__file__ = json_file
+        self.__buffer__ = ""
+        self.__pos__ = 0
+        self.__decoder__ = json.JSONDecoder()
+
+    def __read_more(self, size: int) -> bool:
+        chunk = self.__file__.read(size)
+        self.__buffer__ = self.__buffer__[self.__pos__ :] + chunk
+        self.__pos__ = 0
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Returns the next character that is not whitespace (without consuming it)"""
+        while True:
+            buffer = self.__buffer__
+            while self.__pos__ < len(buffer) and buffer[self.__pos__] in " \t\n\r":
+                self.__pos__ += 1
+            if self.__pos__ < len(buffer):
+                return buffer[self.__pos__]
+            if not self.__read_more(JSON_CHUNK_SIZE):
+                raise ValueError("Unexpected end of JSON file!")
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Invalid JSON file: expected one of {chars!r}, got {char!r}!")
+        self.__pos__ += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, self.__pos__ = self.__decoder__.raw_decode(self.__buffer__, self.__pos__)
+                return value
+            except json.JSONDecodeError as error:
+                # Incomplete value: read (at least) as much again as is buffered
+                if not self.__read_more(max(JSON_CHUNK_SIZE, len(self.__buffer__))):
+                    raise ValueError(f"Invalid JSON file: {error}") from error
+
+
+def iter_json_documents(json_file: TextIO) -> Iterator[Document]:
+    """Yields the documents of a TinyDB JSON file as (table, doc_id, document) tuples.
+
+    The file is read in chunks while iterating, so stopping early (e.g. once the
+    metadata is found) does not read or parse the rest of the file.
+    """
+    scanner = _JSONScanner(json_file)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        table = scanner.value()
+        scanner.expect(":")
+        scanner.expect("{")
+        if scanner.peek() == "}":
+            scanner.expect("}")
+        else:
+            while True:
+                doc_id = scanner.value()
+                scanner.expect(":")
+                yield table, doc_id, scanner.value()
+                if scanner.expect(",}") == "}":
+                    break
+        if scanner.expect(",}") == "}":
+            return
+
+
+def _iter_sqlite_documents(filename: str, header_only: bool = False) -> Iterator[Document]:
+    uri = f"file:{filename}?mode=ro"
+    where = "WHERE id IS NULL " if header_only else ""
+    with contextlib.closing(sqlite3.connect(uri, uri=True)) as connection:
+        rows = connection.execute(
+            f"SELECT tbl, doc_id, document FROM documents {where}"
+            "ORDER BY tbl, CAST(doc_id AS INTEGER)"
+        )
+        for table, doc_id, document in rows:
+            yield table, doc_id, codec.loads(document)
+
+
+def _iter_journal_entries(filename: str) -> Iterator[tuple[str, dict[str, Optional[dict]]]]:
+    """Yields the (table, documents) entries of the journal of a board, oldest first"""
+    for journal_path in (filename + PENDING_SUFFIX, filename + JOURNAL_SUFFIX):
+        if not os.path.exists(journal_path):
+            continue
+        with open(journal_path, "rb") as journal:
+            for line in journal:
+                try:
+                    entry = codec.loads(line)
+                except ValueError:
+                    # Incomplete last line of a crashed write
+                    break
+                yield entry["table"], entry["documents"]
+
+
+def _iter_header_documents(filename: str) -> Iterator[tuple[str, str, Optional[dict]]]:
+    """Yields the documents of a board file, front to back, without changing the file.
+
+    Documents without id (metadata, project order) come first for SQLite boards.
+    Documents deleted in the journal of a board are yielded as None.
+    """
+    backend = detect_backend(filename)
+    if backend == "sqlite":
+        yield from _iter_sqlite_documents(filename, header_only=True)
+        return
+
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        if backend == "binary":
+            with open(filename, "rb") as board_file:
+                yield from boardfile.iter_documents(board_file)
+        else:
+            with open(filename, "rt", encoding="utf-8") as board_file:
+                yield from iter_json_documents(board_file)
+
+    if backend == "journal":
+        for table, documents in _iter_journal_entries(filename):
+            for doc_id, document in documents.items():
+                yield table, doc_id, document
+
+
+def read_metadata(filename: str) -> Optional[dict[str, str]]:
+    """Reads the metadata of a board file, or None if it has none (or does not exist).
+
+    Only the file is read, no board is created. For .json, .pbb and .sqlite boards,
+    reading stops at the metadata document, which is the first document of a board.
+    Boards with a journal are read up to the end of the journal, because the
+    metadata might have been changed since the last compaction.
+    """
+    if not os.path.isfile(filename) and not os.path.isfile(filename + JOURNAL_SUFFIX):
+        return None
+
+    journal = detect_backend(filename) == "journal"
+    metadata: Optional[dict[str, str]] = None
+    metadata_doc_id = None
+    for table, doc_id, document in _iter_header_documents(filename):
+        if table != DEFAULT_TABLE:
+            continue
+        if document is not None and "metadata" in document:
+            metadata, metadata_doc_id = document["metadata"], doc_id
+            if not journal:
+                break
+        elif document is None and doc_id == metadata_doc_id:
+            metadata = None
+    return None if metadata is None else dict(metadata)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+"""Layout of the project plan (Gantt chart).
+
+The layout is computed once from the board: one row per project, milestone and
+task with dates, projects in the project order and the sub-items of every item
+below it, sorted by start date. Drawing only reads the layout (never the board):
+the rows of a viewport are a range of row numbers, and when the rows are too small
+to be told apart, aggregate() merges 2**level neighbouring rows into one span.
+
+Days are ordinals (see data.dates); the end of a bar is exclusive.
+"""
+
+from array import array
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+# pylint: disable=import-error
+from data import dates  # type: ignore
+from data import defaults
+from data.data import Projectboard
+from data.item import category_code  # type: ignore
+
+# pylint: enable=import-error
+
+
+class Bar(NamedTuple):
+    item_id: str
+    name: str
+    category: int
+    depth: int
+    start: int
+    end: int
+    finished: bool
+
+
+class TimelineLayout:
+    def __init__(self, bars: list[Bar]):
+        self.bars = bars
+        self.__starts__ = array("q", (bar_item.start for bar_item in bars))
+        self.__ends__ = array("q", (bar_item.end for bar_item in bars))
+        self.first_day = min(self.__starts__, default=dates.today())
+        self.last_day = max(self.__ends__, default=self.first_day + 1)
+        # Level k: (starts, ends) of the buckets of 2**k rows, level 0 are the rows
+        self.__levels__ = [(self.__starts__, self.__ends__)]
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    @classmethod
+    def from_board(cls, board: Projectboard) -> "TimelineLayout":
+        """Lays out all items of a board with one pass over it"""
+        states = board.get("custom_states")
+        state_finished = (defaults.DEFAULT_STATES if states is None else states["states"])[-1]
+        items, children = _read_items(board)
+        return cls(_bars(items, children, _roots(board, items, children), state_finished))
+
+    def rows(self, first_day: int, last_day: int, first_row: int, last_row: int) -> Iterator[int]:
+        """Rows in [first_row, last_row] with a bar overlapping the days [first_day, last_day)"""
+        starts, ends = self.__starts__, self.__ends__
+        for row in range(max(first_row, 0), min(last_row + 1, len(starts))):
+            if starts[row] < last_day and ends[row] > first_day:
+                yield row
+
+    def aggregate(
+        self, level: int, first_day: int, last_day: int, first_bucket: int, last_bucket: int
+    ) -> Iterator[tuple[int, int, int]]:
+        """(bucket, start, end) of the buckets of 2**level rows, like rows()"""
+        starts, ends = self.__level(level)
+        for bucket in range(max(first_bucket, 0), min(last_bucket + 1, len(starts))):
+            if starts[bucket] < last_day and ends[bucket] > first_day:
+                yield bucket, starts[bucket], ends[bucket]
+
+    def __level(self, level: int) -> tuple[array, array]:
+        """Computed on first use from the level below, with pairwise min/max"""
+        while len(self.__levels__) <= level:
+            starts, ends = self.__levels__[-1]
+            if len(starts) % 2:
+                starts, ends = starts + array("q", [starts[-1]]), ends + array("q", [ends[-1]])
+            self.__levels__.append(
+                (
+                    array("q", map(min, starts[0::2], starts[1::2])),
+                    array("q", map(max, ends[0::2], ends[1::2])),
+                )
+            )
+        return self.__levels__[level]
+
+
+# (name, category, state, (start, due) or None) of an item by id
+_Items = dict[str, tuple]
+# The ids of the children of every parent (None: without parent)
+_Children = dict[Optional[str], list[str]]
+
+
+def _read_items(board: Projectboard) -> tuple[_Items, _Children]:
+    """The items of a board and the ids of the children of every parent, by start date"""
+    items = {}
+    children: _Children = {}
+    keys = ("id", "name", "category", "state", "startdate", "duedate", "parent")
+    for item_id, name, category, state, startdate, duedate, parent in board.iter_values(*keys):
+        items[item_id] = (
+            name,
+            category,
+            state,
+            dates.interval({"startdate": startdate, "duedate": duedate}),
+        )
+        children.setdefault(parent, []).append(item_id)
+
+    def start_of(item_id: str) -> tuple:
+        span = items[item_id][3]
+        return (span is None, span[0] if span else 0)
+
+    for child_ids in children.values():
+        child_ids.sort(key=start_of)
+    return items, children
+
+
+def _roots(board: Projectboard, items: _Items, children: _Children) -> list[str]:
+    """The projects in the project order; items whose parent is missing are shown after them"""
+    roots = [pid for pid in board.get_project_order()["project_order"] if pid in items]
+    ordered_roots = set(roots)
+    roots.extend(
+        item_id
+        for parent, child_ids in children.items()
+        if parent is None or parent not in items
+        for item_id in child_ids
+        if item_id not in ordered_roots
+    )
+    return roots
+
+
+def _bars(items: _Items, children: _Children, roots: list[str], state_finished: str) -> list[Bar]:
+    """The bars of the items with dates, each item followed by its sub-items"""
+    bars = []
+    visited = set()
+    stack = [(item_id, 0) for item_id in reversed(roots)]
+    while stack:
+        item_id, depth = stack.pop()
+        if item_id in visited:
+            continue
+        name, category, state, span = items[item_id]
+        visited.add(item_id)
+        if span is not None:
+            bars.append(
+                Bar(
+                    item_id,
+                    name or "",
+                    category_code(category),
+                    depth,
+                    span[0],
+                    span[1] + 1,
+                    state == state_finished,
+                )
+            )
+        stack.extend((child_id, depth + 1) for child_id in reversed(children.get(item_id, ())))
+    return bars
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+"""Project plan (Gantt chart) drawn from a precomputed data.timeline.TimelineLayout.
+
+The scene has no items: its rect spans the whole plan (for the scroll bars) and
+drawForeground paints only the bars in the exposed rect. If a row is less than
+MIN_ROW_PIXELS high (zoomed out), neighbouring rows are merged into one bar per
+group of rows (see TimelineLayout.aggregate). Ctrl + mouse wheel zooms.
+"""
+
+import math
+from datetime import date
+from typing import Optional
+
+# pylint: disable=import-error
+# pylint: disable=no-name-in-module
+from PySide6.QtCore import QLineF  # type: ignore
+from PySide6.QtCore import QRectF
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush  # type: ignore
+from PySide6.QtGui import QColor
+from PySide6.QtGui import QPainter
+from PySide6.QtGui import QPen
+from PySide6.QtWidgets import QGraphicsScene  # type: ignore
+from PySide6.QtWidgets import QGraphicsSceneWheelEvent
+
+from data import dates  # type: ignore
+from data.item import MILESTONE  # type: ignore
+from data.item import PROJECT
+from data.timeline import TimelineLayout  # type: ignore
+
+# pylint: enable=import-error
+# pylint: enable=no-name-in-module
+
+
+ROW_HEIGHT = 20
+DAY_WIDTH = 8
+BAR_MARGIN = 3
+INDENT = 12
+MIN_ROW_PIXELS = 3
+MIN_LABEL_PIXELS = 12
+ZOOM_STEP = 1.25
+
+COLORS = {
+    PROJECT: QColor(52, 101, 164),
+    MILESTONE: QColor(245, 121, 0),
+}
+TASK_COLOR = QColor(115, 210, 22)
+FINISHED_COLOR = QColor(186, 189, 182)
+AGGREGATE_COLOR = QColor(136, 138, 133)
+GRID_COLOR = QColor(211, 215, 207)
+TODAY_COLOR = QColor(204, 0, 0)
+
+
+class GanttScene(QGraphicsScene):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.__layout__: Optional[TimelineLayout] = None
+
+    def set_layout(self, layout: TimelineLayout):
+        self.__layout__ = layout
+        n_days = layout.last_day - layout.first_day
+        self.setSceneRect(0, 0, n_days * DAY_WIDTH, max(len(layout), 1) * ROW_HEIGHT)
+        self.update()
+
+    def clear_layout(self):
+        self.__layout__ = None
+        self.setSceneRect(0, 0, 0, 0)
+        self.update()
+
+    def __days(self, rect: QRectF) -> tuple[int, int]:
+        """Days [first, last) visible in rect"""
+        first_day = self.__layout__.first_day  # type: ignore
+        return (
+            first_day + math.floor(rect.left() / DAY_WIDTH),
+            first_day + math.ceil(rect.right() / DAY_WIDTH) + 1,
+        )
+
+    def __x(self, day: int) -> float:
+        return (day - self.__layout__.first_day) * DAY_WIDTH  # type: ignore
+
+    def drawBackground(self, painter: QPainter, rect: QRectF):  # pylint: disable=invalid-name
+        painter.fillRect(rect, Qt.white)
+        if self.__layout__ is None:
+            return
+        first_day, last_day = self.__days(rect)
+
+        # A line at the first day of every month (of every year if months get too small)
+        month_pixels = 30 * DAY_WIDTH * painter.worldTransform().m11()
+        months = 1 if month_pixels >= 8 else 12
+        painter.setPen(QPen(GRID_COLOR, 0))
+        day = date.fromordinal(max(first_day, 1))
+        month = day.year * 12 + day.month - 1
+        month -= month % months
+        while True:
+            line_day = date(month // 12, month % 12 + 1, 1).toordinal()
+            if line_day >= last_day:
+                break
+            if line_day >= first_day:
+                x_pos = self.__x(line_day)
+                painter.drawLine(QLineF(x_pos, rect.top(), x_pos, rect.bottom()))
+            month += months
+
+        today = dates.today()
+        if first_day <= today < last_day:
+            painter.setPen(QPen(TODAY_COLOR, 0))
+            x_pos = self.__x(today)
+            painter.drawLine(QLineF(x_pos, rect.top(), x_pos, rect.bottom()))
+
+    def drawForeground(self, painter: QPainter, rect: QRectF):  # pylint: disable=invalid-name
+        layout = self.__layout__
+        if not layout:
+            return
+        first_day, last_day = self.__days(rect)
+        row_pixels = ROW_HEIGHT * painter.worldTransform().m22()
+        painter.setPen(Qt.NoPen)
+
+        if row_pixels < MIN_ROW_PIXELS:
+            # Level of detail: one bar per group of 2**level rows
+            level = math.ceil(math.log2(MIN_ROW_PIXELS / row_pixels))
+            self.__draw_aggregates(painter, rect, level, first_day, last_day)
+            return
+
+        first_row = math.floor(rect.top() / ROW_HEIGHT)
+        last_row = math.floor(rect.bottom() / ROW_HEIGHT)
+        rows = list(layout.rows(first_day, last_day, first_row, last_row))
+        self.__draw_bars(painter, rows)
+        if row_pixels >= MIN_LABEL_PIXELS:
+            self.__draw_labels(painter, rows)
+
+    def __draw_aggregates(
+        self, painter: QPainter, rect: QRectF, level: int, first_day: int, last_day: int
+    ):
+        height = ROW_HEIGHT * 2**level
+        first_bucket = math.floor(rect.top() / height)
+        last_bucket = math.floor(rect.bottom() / height)
+        painter.setBrush(QBrush(AGGREGATE_COLOR))
+        painter.drawRects(
+            [
+                QRectF(self.__x(start), bucket * height, (end - start) * DAY_WIDTH, height)
+                for bucket, start, end in self.__layout__.aggregate(  # type: ignore
+                    level, first_day, last_day, first_bucket, last_bucket
+                )
+            ]
+        )
+
+    def __draw_bars(self, painter: QPainter, rows: list[int]):
+        bars = self.__layout__.bars  # type: ignore
+        # One drawRects call per color
+        rects: dict[int, list[QRectF]] = {}
+        for row in rows:
+            bar_item = bars[row]
+            color = -1 if bar_item.finished else bar_item.category
+            rects.setdefault(color, []).append(
+                QRectF(
+                    self.__x(bar_item.start),
+                    row * ROW_HEIGHT + BAR_MARGIN,
+                    (bar_item.end - bar_item.start) * DAY_WIDTH,
+                    ROW_HEIGHT - 2 * BAR_MARGIN,
+                )
+            )
+        for color, color_rects in rects.items():
+            if color == -1:
+                painter.setBrush(QBrush(FINISHED_COLOR))
+            else:
+                painter.setBrush(QBrush(COLORS.get(color, TASK_COLOR)))
+            painter.drawRects(color_rects)
+
+    def __draw_labels(self, painter: QPainter, rows: list[int]):
+        """Names right of the bars, at a fixed size in pixels"""
+        bars = self.__layout__.bars  # type: ignore
+        painter.setPen(QPen(Qt.black, 0))
+        x_scale = painter.worldTransform().m11()
+        y_scale = painter.worldTransform().m22()
+        painter.save()
+        painter.scale(1 / x_scale, 1 / y_scale)
+        for row in rows:
+            bar_item = bars[row]
+            x_pos = (self.__x(bar_item.end) + 4 + bar_item.depth * INDENT) * x_scale
+            y_pos = (row + 1) * ROW_HEIGHT * y_scale - BAR_MARGIN - 2
+            painter.drawText(int(x_pos), int(y_pos), bar_item.name)
+        painter.restore()
+
+    def wheelEvent(self, event: QGraphicsSceneWheelEvent):  # pylint: disable=invalid-name
+        if not event.modifiers() & Qt.ControlModifier:
+            super().wheelEvent(event)
+            return
+        factor = ZOOM_STEP if event.delta() > 0 else 1 / ZOOM_STEP
+        for view in self.views():
+            view.setTransformationAnchor(view.ViewportAnchor.AnchorUnderMouse)
+            view.scale(factor, factor)
+        event.accept()
@@ -21,6 +21,8 @@
 
 # pylint: disable=missing-docstring
 import os
+import threading
+from datetime import date
 from functools import partial
 from typing import Dict
 from typing import List
@@ -31,30 +33,134 @@ from typing import Optional
 from PySide6 import QtCore  # type: ignore
 from PySide6 import QtUiTools
 from PySide6.QtCore import Qt  # type: ignore
+from PySide6.QtGui import QKeySequence  # type: ignore
+from PySide6.QtGui import QShortcut
 from PySide6.QtWidgets import QFileDialog  # type: ignore
 from PySide6.QtWidgets import QHeaderView
 from PySide6.QtWidgets import QInputDialog
 from PySide6.QtWidgets import QLineEdit
 from PySide6.QtWidgets import QMainWindow
 from PySide6.QtWidgets import QMessageBox
+from PySide6.QtWidgets import QProgressDialog
+from PySide6.QtWidgets import QPushButton
 from PySide6.QtWidgets import QSizePolicy
 from PySide6.QtWidgets import QStackedWidget
 from PySide6.QtWidgets import QTableWidget
 from PySide6.QtWidgets import QTableWidgetItem
 from PySide6.QtWidgets import QTabWidget
 from PySide6.QtWidgets import QTreeWidgetItem
+from PySide6.QtWidgets import QVBoxLayout
 from PySide6.QtWidgets import QWidget
 
-from data import settings  # type: ignore
-from data.data import Projectboard  # type: ignore
-from data.data import generate_id
-from data.data import read_metadata
+from data import dates  # type: ignore
+from data import settings
+from data import storages
+from data.catalog import Catalog  # type: ignore
+from data.dashboard import Dashboard
+from data.dashboard import table_rows
+from data.data import Projectboard
+from data.data import read_metadata_many
+from data.export import export_board
+from data.search import BoardSearch
+from data.search import Hit
 from data.state import StateInt  # type: ignore
+from data.timeline import TimelineLayout
+from gui.qt.gantt import GanttScene  # type: ignore
 
 # pylint: enable=import-error
 # pylint: enable=no-name-in-module
 
 
+EXPORT_FILTER = "CSV (*.csv);;Markdown (*.md);;HTML (*.html);;JSON Lines (*.jsonl)"
+SEARCH_DELAY_MS = 200
+SEARCH_LIMIT = 100
+
+
+class _ExportWorker(QtCore.QObject):
+    """Exports a board file in a worker thread (see data.export)"""
+
+    progress = QtCore.Signal(int, int)
+    done = QtCore.Signal(bool)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, board_filename: str, filename: str):
+        super().__init__()
+        self.board_filename = board_filename
+        self.filename = filename
+        self.cancel = threading.Event()
+
+    def run(self):
+        try:
+            completed = export_board(
+                self.board_filename, self.filename, progress=self.progress.emit, cancel=self.cancel
+            )
+        except (OSError, ValueError) as err:
+            self.failed.emit(str(err))
+            return
+        self.done.emit(completed)
+
+
+class _CatalogSignals(QtCore.QObject):
+    # Emitted (from a background thread) with the filename of an updated catalog entry
+    updated = QtCore.Signal(str)
+
+
+class _DashboardSignals(QtCore.QObject):
+    # Emitted (from a background thread) with the refreshed summaries
+    refreshed = QtCore.Signal(dict)
+
+
+class DashboardWindow(QWidget):
+    """Status of all registered boards (see data.dashboard)"""
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Dashboard")
+        self.dashboard = Dashboard()
+        self.signals = _DashboardSignals()
+        self.signals.refreshed.connect(self.__refreshed)
+        self.__thread: Optional[threading.Thread] = None
+
+        self.btn_refresh = QPushButton("&Refresh", self)
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.table = QTableWidget(self)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.btn_refresh)
+        layout.addWidget(self.table)
+
+    def refresh(self):
+        """Shows the cached summaries right away and updates outdated ones in the background"""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        filenames = [board.split(":")[0] for board in settings.get_setting("boards")]
+        cached = {filename: self.dashboard.get(filename) for filename in filenames}
+        self.show_summaries({key: summary for key, summary in cached.items() if summary})
+        self.btn_refresh.setEnabled(False)
+
+        def refresh():
+            self.signals.refreshed.emit(self.dashboard.refresh(filenames))
+
+        self.__thread = threading.Thread(target=refresh, daemon=True)
+        self.__thread.start()
+
+    def __refreshed(self, summaries: dict):
+        self.btn_refresh.setEnabled(True)
+        self.show_summaries(summaries)
+
+    def show_summaries(self, summaries: dict):
+        header, *rows = table_rows(summaries)
+        self.table.clear()
+        self.table.setColumnCount(len(header))
+        self.table.setHorizontalHeaderLabels(header)
+        self.table.setRowCount(len(rows))
+        for i_row, row in enumerate(rows):
+            for i_col, text in enumerate(row):
+                self.table.setItem(i_row, i_col, QTableWidgetItem(text))
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -83,14 +189,22 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.settings_page.pb_list.setEditTriggers(QTableWidget.NoEditTriggers)
         self.settings_page.pb_list.cellDoubleClicked.connect(self.__open_from_list)
+
+        self.catalog = Catalog()
+        self.catalog_signals = _CatalogSignals()
+        self.catalog_signals.updated.connect(self.__show_board_stats)
+        self.search = BoardSearch()
+        self.dashboard_window: Optional[DashboardWindow] = None
         self.open_boards()
+        self.__refresh_catalog([board.split(":")[0] for board in settings.get_setting("boards")])
         self.setCentralWidget(self.tabs)
 
     def closeEvent(self, event):
         # pylint: disable=invalid-name
         for child in self.findChildren(Page):
             child.save()
-            child.close()
+            child.close(self.catalog)
+        self.catalog.save()
         settings.set_setting("window_width", self.width())
         settings.set_setting("window_height", self.height())
         settings.save_settings()
@@ -101,6 +215,14 @@ class MainWindow(QMainWindow):
         self.settings_page.btn_imp.clicked.connect(self.settings_import_clicked)
         self.settings_page.btn_ren.clicked.connect(self.rename_board)
         self.settings_page.btn_rem.clicked.connect(self.remove_board)
+        self.settings_page.btn_dash.clicked.connect(self.show_dashboard)
+
+    def show_dashboard(self):
+        if self.dashboard_window is None:
+            self.dashboard_window = DashboardWindow(self)
+        self.dashboard_window.show()
+        self.dashboard_window.raise_()
+        self.dashboard_window.refresh()
 
     def settings_add_clicked(self):
         text, ok_clicked = pb_name_dialog(self)
@@ -119,18 +241,21 @@ class MainWindow(QMainWindow):
 
     def settings_import_clicked(self):
         filenames = QFileDialog.getOpenFileNames(
-            self, "Open ProjectBoard", settings.get_setting("data_dir"), "PB2 (*.json)"
+            self,
+            "Open ProjectBoard",
+            settings.get_setting("data_dir"),
+            "PB2 (*.json *.sqlite *.pbb)",
         )
         filenames = filenames[0]
         if filenames:
             rows = self.settings_page.pb_list.rowCount()
-            for filename in filenames:
-                metadata = read_metadata(filename)
+            for filename, metadata in zip(filenames, read_metadata_many(filenames)):
                 name = metadata["name"]
                 board = f"{filename}:{name}:closed"
                 self.__append_to_pb_list(board, rows)
                 settings.append_to_setting("boards", board)
                 rows += 1
+            self.__refresh_catalog(filenames)
 
     def open_boards(self):
         boards = settings.get_setting("boards")
@@ -202,9 +327,11 @@ class MainWindow(QMainWindow):
             boards.remove(item_text)
             self.settings_page.pb_list.removeRow(row)
             settings.set_setting("boards", boards)
+            self.catalog.remove(filename)
+            self.search.forget(filename)
 
     def __add_board(self, name: str, filename: str, n_tabs: int):
-        new_tab = Page(name, filename)
+        new_tab = Page(name, filename, self.search)
         new_tab.widget.btn_close.clicked.connect(new_tab.close)
         new_tab.widget.btn_close.clicked.connect(partial(self.__close_board, new_tab))
         new_tab.widget.btn_ren.clicked.connect(partial(self.rename_board, name, filename))
@@ -233,13 +360,43 @@ class MainWindow(QMainWindow):
         self.tabs.removeTab(idx)
         del new_tab
         self.tabs.setCurrentIndex(0)
+        self.__refresh_catalog([filename])
 
     def __append_to_pb_list(self, board: str, row: int):
         self.settings_page.pb_list.insertRow(row)
         self.settings_page.pb_list.setItem(row, 0, QTableWidgetItem(board))
-
-    def __open_from_list(self, row, column):
-
+        self.__show_board_stats(board.split(":")[0])
+
+    def __refresh_catalog(self, filenames: List[str]):
+        """Shows the cached statistics right away and updates outdated ones (and the search
+        indexes) in the background"""
+        self.catalog.refresh_in_background(filenames, self.catalog_signals.updated.emit)
+        self.search.refresh_in_background(filenames)
+
+    def __show_board_stats(self, filename: str):
+        entry = self.catalog.get(filename)
+        if entry is None:
+            texts = ["", "", ""]
+        else:
+            n_ms, n_ms_finished, n_tasks, n_tasks_finished = entry["counts"]
+            texts = [
+                f"{entry['n_projects']}",
+                f"{n_ms_finished}/{n_ms}",
+                f"{n_tasks_finished}/{n_tasks}",
+            ]
+
+        pb_list = self.settings_page.pb_list
+        for row in range(pb_list.rowCount()):
+            item = pb_list.item(row, 0)
+            if item is None or item.text().split(":")[0] != filename:
+                continue
+            for i_col, text in enumerate(texts, start=1):
+                pb_list.setItem(row, i_col, QTableWidgetItem(text))
+
+    def __open_from_list(self, row, _column):
+
+        # The board (filename:name:state) is shown in the first column
+        column = 0
         board_item = self.settings_page.pb_list.takeItem(row, column)
         board = board_item.text()
         boards = settings.get_setting("boards")
@@ -263,10 +420,12 @@ class MainWindow(QMainWindow):
 
 
 class Page(QStackedWidget):
-    def __init__(self, name: str, filename: str):
+    def __init__(self, name: str, filename: str, search: Optional[BoardSearch] = None):
         super().__init__()
         self.widget = load_ui_file("projectboard_horizontal.ui", self)
-        self.projectboard = Projectboard(name, filename)
+        self.__name = name
+        backend = storages.detect_backend(filename, settings.get_setting("journal"))
+        self.projectboard = Projectboard(name, filename, backend=backend, lazy=True)
 
         self.ui_state = StateInt(
             0,
@@ -274,12 +433,7 @@ class Page(QStackedWidget):
             ["Project plan", "Projectboard", "Project", "Milestone", "Task"],
         )
 
-        project_list = self.projectboard.get_project_order()
-        project_list = project_list["project_order"]
-        self.widget.list_projects.setRowCount(len(project_list))
-        for i_p, pid in enumerate(project_list):
-            data = self.projectboard.get(pid)
-            self.__add_project_to_list(data, i_p)
+        self.__fill_project_list()
 
         self.widget.setCurrentIndex(0)
         self.__hide_tm_fields()
@@ -321,11 +475,38 @@ class Page(QStackedWidget):
         # self.widget.le_id.setHidden(True)
         # self.widget.le_parent_id.setHidden(True)
 
-        self.widget.btn_pp.setHidden(True)
-        # self.widget.btn_pp.clicked.connect(self.project_plan)
-        # self.widget.btn_pp_close.clicked.connect(self.widget.project_plan.clear())
+        self.gantt_scene = GanttScene(self.widget)
+        self.widget.project_plan.setScene(self.gantt_scene)
+        self.widget.btn_pp.setEnabled(True)
+        self.widget.btn_pp.clicked.connect(self.project_plan)
+        self.widget.btn_pp_close.clicked.connect(self.gantt_scene.clear_layout)
         self.widget.btn_pp_close.clicked.connect(partial(self.widget.setCurrentIndex, 0))
-        self.widget.btn_exp.setHidden(True)
+        self.widget.btn_exp.setEnabled(True)
+        self.widget.btn_exp.clicked.connect(self.export)
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Redo, self, self.redo)
+        # The running export; the worker is referenced until its thread finished
+        self.__export: Optional[tuple[QtCore.QThread, _ExportWorker]] = None
+
+        self.search = search
+        self.__search_hits: List[Hit] = []
+        self.widget.list_search.setColumnHidden(0, True)
+        self.widget.list_search.setHidden(True)
+        header = self.widget.list_search.horizontalHeader()
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.widget.list_search.cellDoubleClicked.connect(self.__open_search_hit)
+        # Search while typing, but not on every key stroke
+        self.__search_timer = QtCore.QTimer(self)
+        self.__search_timer.setSingleShot(True)
+        self.__search_timer.setInterval(SEARCH_DELAY_MS)
+        self.__search_timer.timeout.connect(self.run_search)
+        self.widget.le_search.textChanged.connect(lambda _text: self.__search_timer.start())
+        if search is None:
+            self.widget.le_search.setHidden(True)
+        else:
+            search.attach(self.projectboard)
 
     def __set_list_headers(self):
         header = self.widget.list_projects.horizontalHeader()
@@ -381,7 +562,7 @@ class Page(QStackedWidget):
         self.__clear()
 
         if data is None:
-            self.widget.le_id.setText(generate_id())
+            self.widget.le_id.setText(self.projectboard.new_id())
         else:
             self.widget.le_name.setText(data["name"])
             self.widget.te_desc.setMarkdown(data["description"])
@@ -394,8 +575,8 @@ class Page(QStackedWidget):
 
             if self.ui_state > 1:
                 parent = self.projectboard.get(parent_id)
-                min_date = QtCore.QDate.fromString(parent["startdate"])
-                max_date = QtCore.QDate.fromString(parent["duedate"])
+                min_date = to_qdate(parent["startdate"])
+                max_date = to_qdate(parent["duedate"])
                 self.widget.date_start.setDateRange(min_date, max_date)
                 self.widget.date_due.setDateRange(min_date, max_date)
             else:
@@ -404,8 +585,8 @@ class Page(QStackedWidget):
                 self.widget.date_start.setDateRange(min_date, max_date)
                 self.widget.date_due.setDateRange(min_date, max_date)
 
-            duedate = QtCore.QDate.fromString(data["duedate"])
-            startdate = QtCore.QDate.fromString(data["startdate"])
+            duedate = to_qdate(data["duedate"])
+            startdate = to_qdate(data["startdate"])
             self.widget.date_start.setDate(startdate)
             self.widget.date_due.setDate(duedate)
 
@@ -416,8 +597,8 @@ class Page(QStackedWidget):
         data = {}
         data["name"] = self.widget.le_name.text()
         data["description"] = self.widget.te_desc.toMarkdown()
-        data["duedate"] = self.widget.date_due.date().toString()
-        data["startdate"] = self.widget.date_start.date().toString()
+        data["duedate"] = from_qdate(self.widget.date_due.date())
+        data["startdate"] = from_qdate(self.widget.date_start.date())
         data["state"] = self.widget.cb_states.currentText()
         data["parent"] = self.widget.le_parent_id.text()
         data["id"] = self.widget.le_id.text()
@@ -435,37 +616,38 @@ class Page(QStackedWidget):
     def apply_clicked(self):
         data = self.get_data()
 
-        match data["category"].lower():
-            case "project":
-                self.projectboard.insert(data)
-                self.ui_state.state = 0
-                self.widget.setCurrentIndex(0)
-                if self.widget.list_projects.findItems(data["id"], Qt.MatchExactly):
-                    rows = self.widget.list_projects.currentRow()
-                    self.widget.list_projects.removeRow(rows)
-                    self.widget.list_projects.insertRow(rows)
-                else:
-                    rows = self.widget.list_projects.rowCount()
-                    self.widget.list_projects.setRowCount(rows + 1)
-                self.widget.list_projects.setCurrentCell(rows, 1)
-                self.__add_project_to_list(data, rows)
-            case "milestone":
-                self.ui_state.state = 1
-                parent = self.projectboard.get(data["parent"])
-                self.projectboard.insert_sub_item(data, parent)
-                self.set_data(parent)
-            case "task":
-                diff = self.ui_state.state - self.ui_state.prev_state
-                if diff < 1 or diff > 2:
-                    raise NotImplementedError
+        with self.projectboard.batch():
+            match data["category"].lower():
+                case "project":
+                    self.projectboard.insert(data)
+                    self.ui_state.state = 0
+                    self.widget.setCurrentIndex(0)
+                    if self.widget.list_projects.findItems(data["id"], Qt.MatchExactly):
+                        rows = self.widget.list_projects.currentRow()
+                        self.widget.list_projects.removeRow(rows)
+                        self.widget.list_projects.insertRow(rows)
+                    else:
+                        rows = self.widget.list_projects.rowCount()
+                        self.widget.list_projects.setRowCount(rows + 1)
+                    self.widget.list_projects.setCurrentCell(rows, 1)
+                    self.__add_project_to_list(data, rows)
+                case "milestone":
+                    self.ui_state.state = 1
+                    parent = self.projectboard.get(data["parent"])
+                    self.projectboard.insert_sub_item(data, parent)
+                    self.set_data(parent)
+                case "task":
+                    diff = self.ui_state.state - self.ui_state.prev_state
+                    if diff < 1 or diff > 2:
+                        raise NotImplementedError
 
-                self.ui_state.state = self.ui_state.prev_state
-                parent = self.projectboard.get(data["parent"])
-                assert parent is not None
-                self.projectboard.insert_sub_item(data, parent)
-                if diff == 2:
-                    parent = self.projectboard.get(parent["parent"])
-                self.set_data(parent)
+                    self.ui_state.state = self.ui_state.prev_state
+                    parent = self.projectboard.get(data["parent"])
+                    assert parent is not None
+                    self.projectboard.insert_sub_item(data, parent)
+                    if diff == 2:
+                        parent = self.projectboard.get(parent["parent"])
+                    self.set_data(parent)
         self.__set_buttons()
 
     def add_milestone(self, item_id: Optional[str] = None):
@@ -493,8 +675,9 @@ class Page(QStackedWidget):
             parent = self.get_data()
             parent_id = parent["id"]
             grandparent_id = parent["parent"]
-            grandparent = self.projectboard.get(grandparent_id)
-            self.projectboard.insert_sub_item(parent, grandparent)
+            with self.projectboard.batch():
+                grandparent = self.projectboard.get(grandparent_id)
+                self.projectboard.insert_sub_item(parent, grandparent)
 
         self.ui_state.state = 3
         self.__set_buttons()
@@ -506,7 +689,8 @@ class Page(QStackedWidget):
         item = self.get_data()
         resp = confirm_del_dialog(self, f"{item['category']}: {item['name']}")
         if resp == QMessageBox.Ok:
-            self.projectboard.delete_subelements(_id, True)
+            with self.projectboard.batch():
+                self.projectboard.delete_subelements(_id, True)
 
             match self.ui_state.state:
                 case 1:
@@ -538,13 +722,131 @@ class Page(QStackedWidget):
     def project_plan(self):
         metadata = self.projectboard.get_metadata()
         self.widget.label_pp.setText(f"Project plan: {metadata['name']}")
+        # Laid out once; drawing does not access the board
+        self.gantt_scene.set_layout(TimelineLayout.from_board(self.projectboard))
         self.widget.setCurrentIndex(2)
 
+    def export(self):
+        """Exports the board file in a worker thread; unsaved changes are saved first"""
+        if self.__export is not None:
+            return
+        if self.projectboard.is_dirty():
+            resp = QMessageBox.question(
+                self.widget,
+                "Export board",
+                "The board has unsaved changes. It will be saved before it is exported.",
+                QMessageBox.Ok | QMessageBox.Cancel,
+                QMessageBox.Ok,
+            )
+            if resp != QMessageBox.Ok:
+                return
+        filename, _ = QFileDialog.getSaveFileName(self.widget, "Export board", "", EXPORT_FILTER)
+        if not filename:
+            return
+        self.save()
+
+        dialog = QProgressDialog("Exporting board ...", "Cancel", 0, 0, self.widget)
+        dialog.setWindowModality(Qt.WindowModal)
+        thread = QtCore.QThread(self.widget)
+        worker = _ExportWorker(self.projectboard.get_filename(), filename)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(partial(self.__export_progress, dialog))
+        dialog.canceled.connect(worker.cancel.set)
+        worker.done.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        worker.failed.connect(partial(QMessageBox.warning, self.widget, "Export failed"))
+        thread.finished.connect(dialog.reset)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(self.__export_finished)
+
+        self.__export = (thread, worker)
+        thread.start()
+        dialog.show()
+
+    @staticmethod
+    def __export_progress(dialog: QProgressDialog, n_done: int, total: int):
+        dialog.setMaximum(total)
+        dialog.setValue(n_done)
+
+    def __export_finished(self):
+        assert self.__export is not None
+        thread, _ = self.__export
+        thread.deleteLater()
+        self.__export = None
+
+    def run_search(self):
+        """Shows the items of all registered boards that match the search text"""
+        text = self.widget.le_search.text()
+        list_search = self.widget.list_search
+        if self.search is None or not text.strip():
+            self.__search_hits = []
+            list_search.setRowCount(0)
+            list_search.setHidden(True)
+            return
+
+        names = {}
+        for board in settings.get_setting("boards"):
+            filename, name, _state = board.split(":")
+            names[os.path.abspath(filename)] = name
+        names.setdefault(os.path.abspath(self.projectboard.get_filename()), self.__name)
+
+        self.__search_hits = self.search.search(text, names, SEARCH_LIMIT, prefix_last=True)
+        list_search.setRowCount(len(self.__search_hits))
+        for row, hit in enumerate(self.__search_hits):
+            cols = [hit.item_id, names[hit.filename], hit.category.capitalize(), hit.name]
+            for i_col, col in enumerate(cols):
+                list_search.setItem(row, i_col, QTableWidgetItem(col))
+        list_search.setHidden(False)
+
+    def __open_search_hit(self, row, _column):
+        hit = self.__search_hits[row]
+        if hit.filename != os.path.abspath(self.projectboard.get_filename()):
+            # Items of other boards are opened in their tab
+            return
+        match hit.category:
+            case "project":
+                self.ui_state.state = 1
+                self.set_data(self.projectboard.get(hit.item_id))
+                self.__set_buttons()
+            case "milestone":
+                self.add_milestone(hit.item_id)
+            case "task":
+                self.add_task(hit.item_id)
+            case _:
+                return
+        self.widget.setCurrentIndex(1)
+
+    def undo(self):
+        if self.projectboard.undo():
+            self.__show_board()
+
+    def redo(self):
+        if self.projectboard.redo():
+            self.__show_board()
+
+    def __show_board(self):
+        """Shows the project list again, e.g. after the board was changed by undo"""
+        self.widget.list_projects.setSortingEnabled(False)
+        self.widget.list_projects.clearContents()
+        self.__fill_project_list()
+        self.widget.list_projects.setSortingEnabled(True)
+        self.ui_state.state = 0
+        self.widget.setCurrentIndex(0)
+
     def save(self):
         self.projectboard.save()
-
-    def close(self):
-        self.projectboard.close()
+        if self.search is not None:
+            self.search.save_index(self.projectboard)
+
+    def close(self, catalog: Optional[Catalog] = None):
+        """Closes the board; with catalog, its catalog entry is updated"""
+        if self.search is not None:
+            self.search.detach(self.projectboard)
+        if catalog is None:
+            self.projectboard.close()
+        else:
+            catalog.close_board(self.projectboard)
 
     def __hide_tm_fields(self, hide: bool = True):
         self.widget.label_type.setHidden(hide)
@@ -563,6 +865,14 @@ class Page(QStackedWidget):
         self.widget.cb_states.setCurrentIndex(0)
         self.widget.list_tasks.clear()
 
+    def __fill_project_list(self):
+        project_list = self.projectboard.get_project_order()
+        project_list = project_list["project_order"]
+        self.widget.list_projects.setRowCount(len(project_list))
+        for i_p, pid in enumerate(project_list):
+            data = self.projectboard.get(pid)
+            self.__add_project_to_list(data, i_p)
+
     def __add_project_to_list(self, data: dict, row: int):
 
         (
@@ -580,8 +890,8 @@ class Page(QStackedWidget):
             QTableWidgetItem(f"{n_ms_finished}"),
             QTableWidgetItem(f"{n_tasks}"),
             QTableWidgetItem(f"{n_tasks_finished}"),
-            QTableWidgetItem(data["startdate"]),
-            QTableWidgetItem(data["duedate"]),
+            QTableWidgetItem(dates.to_iso(data["startdate"])),
+            QTableWidgetItem(dates.to_iso(data["duedate"])),
         ]
 
         for i_col, col in enumerate(cols[1:], start=1):
@@ -596,8 +906,8 @@ class Page(QStackedWidget):
             type_ = item["category"].capitalize()
             name = item["name"]
             state = item["state"]
-            startdate = item["startdate"]
-            duedate = item["duedate"]
+            startdate = dates.to_iso(item["startdate"])
+            duedate = dates.to_iso(item["duedate"])
             entry = [type_[0], item_id, name, state, startdate, duedate]
             wid = QTreeWidgetItem(parent, entry)
 
@@ -622,6 +932,19 @@ class Page(QStackedWidget):
                 raise NotImplementedError
 
 
+def to_qdate(value) -> QtCore.QDate:
+    """QDate of a stored date (see data.dates); today if it is missing or invalid"""
+    day = dates.to_date(value)
+    if day is None:
+        return QtCore.QDate.currentDate()
+    return QtCore.QDate(day.year, day.month, day.day)
+
+
+def from_qdate(qdate: QtCore.QDate) -> int:
+    """Stored (ordinal) form of a QDate"""
+    return date(qdate.year(), qdate.month(), qdate.day()).toordinal()
+
+
 def load_ui_file(filename, parent=None) -> QWidget:
     loader = QtUiTools.QUiLoader()
     file_path = os.path.dirname(__file__)
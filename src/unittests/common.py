@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import shutil
+import tempfile
+import unittest
+
+TEST_BOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test1.json")
+
+
+def temporary_directory(test: unittest.TestCase) -> str:
+    """Creates a directory that is removed after the test (after tearDown)"""
+    tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    test.addCleanup(tmp_dir.cleanup)
+    return tmp_dir.name
+
+
+def copy_test_board(directory: str, name: str = "board.json") -> str:
+    """Copies TEST_BOARD into directory; returns the path of the copy"""
+    filename = os.path.join(directory, name)
+    shutil.copy(TEST_BOARD, filename)
+    return filename
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+import io
+import json
+import os
+import unittest
+
+# pylint: disable=import-error
+from data import boardfile  # type: ignore
+from data import storages
+from data.data import Projectboard
+from data.data import create_default_item
+from data.storages import convert_board
+from data.storages import read_tables
+from unittests.common import TEST_BOARD
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+TABLES = {
+    "_default": {
+        "1": {"metadata": {"name": "Größe"}},
+        "2": {"project_order": ["P1", "P2"]},
+        "3": {
+            "id": "P1",
+            "n": -(2**70),
+            "x": 0.1,
+            "flags": [True, False, None, 0, -1, 127, 128],
+            "description": "long text " * 20,
+            "nested": {"empty": {}, "list": [[], [""]]},
+        },
+    },
+    "other": {"7": {"n": 1}},
+}
+
+
+class TestBoardFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+
+    def test_1_round_trip(self):
+        content = boardfile.dumps(TABLES)
+        self.assertEqual(TABLES, boardfile.loads(content))
+        # Same key order as the original
+        self.assertEqual(json.dumps(TABLES), json.dumps(boardfile.loads(content)))
+
+    def test_2_streaming_reader(self):
+        stream = io.BytesIO()
+        with boardfile.BoardWriter(stream) as writer:
+            writer.write_document("_default", "1", {"id": "P1"})
+            writer.write_document("_default", "2", {"id": "P2", "parent": "P1"})
+        stream.seek(0)
+        documents = boardfile.iter_documents(stream)
+        self.assertEqual(("_default", "1", {"id": "P1"}), next(documents))
+        self.assertEqual(("_default", "2", {"id": "P2", "parent": "P1"}), next(documents))
+        with self.assertRaises(StopIteration):
+            next(documents)
+
+    def test_3_invalid_files(self):
+        content = boardfile.dumps(TABLES)
+        with self.assertRaises(ValueError):
+            boardfile.loads(content[: len(content) // 2])
+        with self.assertRaises(ValueError):
+            boardfile.loads(b"{}")
+        self.assertIsNone(boardfile.read_index(content[:-1]))
+        self.assertIsNotNone(boardfile.read_index(content))
+        with self.assertRaises(TypeError):
+            boardfile.dumps({"_default": {"1": {"date": object()}}})
+
+    def test_4_mapped_board(self):
+        filename = os.path.join(self.tmp_dir, "cycle.pbb")
+        documents = [
+            {"id": "P1", "category": "project", "parent": None},
+            {"id": "M1", "category": "milestone", "parent": "P1", "state": "Closed"},
+            {"id": "T1", "category": "task", "parent": "M1", "state": "Open"},
+            {"id": "T2", "category": "task", "parent": "M1", "state": "Open"},
+            # Parent cycle and unknown parent
+            {"id": "A", "category": "task", "parent": "B"},
+            {"id": "B", "category": "task", "parent": "A"},
+            {"id": "C", "category": "task", "parent": "X"},
+        ]
+        with open(filename, "wb") as board_file, boardfile.BoardWriter(board_file) as writer:
+            for doc_id, document in enumerate(documents, start=1):
+                writer.write_document("_default", str(doc_id), document)
+
+        mapped = boardfile.MappedBoard(filename)
+        self.assertEqual(7, len(mapped))
+        self.assertEqual([2], mapped.find("T1"))
+        self.assertEqual([], mapped.find("T3"))
+        self.assertEqual([2, 3], mapped.children("M1"))
+        self.assertEqual("M1", mapped.column("parent", 3))
+        self.assertEqual(None, mapped.column("state", 0))
+        self.assertEqual({("milestone", "Closed"): 1, ("task", "Open"): 2}, mapped.descendants(0))
+        self.assertEqual({("task", None): 1}, mapped.descendants(4))
+        self.assertEqual({}, mapped.descendants(6))
+        self.assertEqual(0, mapped.first("id"))
+        self.assertEqual(documents[3], mapped.document(3))
+        self.assertEqual(2, mapped.n_decoded)
+        mapped.close()
+
+    def test_5_convert_lossless(self):
+        binary_file = os.path.join(self.tmp_dir, "test1.pbb")
+        json_file = os.path.join(self.tmp_dir, "test1.json")
+        convert_board(TEST_BOARD, binary_file)
+        convert_board(binary_file, json_file)
+
+        self.assertEqual("binary", storages.detect_backend(binary_file))
+        self.assertEqual(read_tables(TEST_BOARD), read_tables(binary_file))
+        self.assertEqual(read_tables(TEST_BOARD), read_tables(json_file))
+        self.assertLess(os.path.getsize(binary_file), os.path.getsize(TEST_BOARD))
+
+        # Detected by content, not by name
+        renamed = os.path.join(self.tmp_dir, "renamed.json")
+        os.rename(binary_file, renamed)
+        self.assertEqual("binary", storages.detect_backend(renamed, journal=True))
+
+    def test_6_save_and_reopen(self):
+        filename = os.path.join(self.tmp_dir, "board.pbb")
+        pboard = Projectboard("Test", filename)
+        item = create_default_item()
+        item["id"] = "P1"
+        pboard.insert(item)
+        pboard.save()
+        pboard.close()
+
+        pboard = Projectboard("", filename)
+        self.assertEqual("Test", pboard.get_metadata()["name"])
+        self.assertEqual(item, pboard.get("P1"))
+        self.assertEqual(storages.file_hash(filename), pboard.content_hash)
+        pboard.close()
+
+    def test_7_empty_tables(self):
+        tables = {"metadata": {}, **TABLES, "empty": {}}
+        self.assertEqual(json.dumps(tables), json.dumps(boardfile.loads(boardfile.dumps(tables))))
+
+        json_file = os.path.join(self.tmp_dir, "board.json")
+        storage = storages.create_storage("json")(json_file)
+        storage.write({"metadata": {}, "_default": TABLES["_default"] | {"3": {}}, "empty": {}})
+        storage.close()
+        binary_file = os.path.join(self.tmp_dir, "board.pbb")
+        copy_file = os.path.join(self.tmp_dir, "copy.json")
+        convert_board(json_file, binary_file)
+        convert_board(binary_file, copy_file)
+        with open(json_file, "rb") as original, open(copy_file, "rb") as copy:
+            self.assertEqual(original.read(), copy.read())
+
+
+class TestLazyBoard(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.filename = os.path.join(self.tmp_dir, "board.pbb")
+        pboard = Projectboard("Lazy", self.filename)
+        with pboard.batch():
+            for i_proj in range(3):
+                project = create_default_item()
+                project["id"] = f"P{i_proj}"
+                pboard.insert(project)
+                for i_ms in range(2):
+                    milestone = create_default_item()
+                    milestone["category"] = "milestone"
+                    milestone["id"] = f"P{i_proj}-M{i_ms}"
+                    pboard.insert_sub_item(milestone, project)
+                    for i_task in range(3):
+                        task = create_default_item(False)
+                        task["category"] = "task"
+                        task["id"] = f"P{i_proj}-M{i_ms}-T{i_task}"
+                        task["state"] = "Closed" if i_task == 0 else "Open"
+                        pboard.insert_sub_item(task, milestone)
+        pboard.close()
+        self.pboard = Projectboard("", self.filename)
+
+    def test_1_same_as_loaded_board(self):
+        lazy = Projectboard("", self.filename, lazy=True)
+        self.assertTrue(lazy.is_lazy)
+        self.assertEqual(self.pboard.get_metadata(), lazy.get_metadata())
+        self.assertEqual(self.pboard.get_project_order(), lazy.get_project_order())
+        for pid in self.pboard.get_project_order()["project_order"]:
+            self.assertEqual(self.pboard.get(pid), lazy.get(pid))
+            self.assertEqual(
+                self.pboard.number_milestones_and_tasks(pid),
+                lazy.number_milestones_and_tasks(pid),
+            )
+            self.assertEqual(self.pboard.get_children(pid), lazy.get_children(pid))
+            self.assertEqual(self.pboard.n_children(pid), lazy.n_children(pid))
+        self.assertTrue(lazy.is_child_of("P1-M0-T2", "P1-M0"))
+        self.assertFalse(lazy.is_child_of("P1-M0-T2", "P1-M1"))
+        self.assertEqual(None, lazy.get("P9"))
+        self.assertEqual(repr(self.pboard), repr(lazy))
+        lazy.close()
+
+    def test_2_decode_on_access(self):
+        lazy = Projectboard("", self.filename, lazy=True, read_only=True)
+        mapped = lazy.__mapped__
+        self.assertLessEqual(mapped.n_decoded, 2)
+        lazy.number_milestones_and_tasks("P0")
+        lazy.get("P2-M1-T0")
+        self.assertLessEqual(mapped.n_decoded, 4)
+        lazy.close()
+
+    def test_3_load_on_change(self):
+        lazy = Projectboard("", self.filename, lazy=True)
+        lazy.delete("P1-M0-T2")
+        self.assertFalse(lazy.is_lazy)
+        self.assertEqual(["P1-M0-T0", "P1-M0-T1"], lazy.get("P1-M0")["sub_items"])
+        self.assertEqual((2, 0, 5, 2), lazy.number_milestones_and_tasks("P1"))
+        lazy.close()
+        self.assertEqual(None, Projectboard("", self.filename, lazy=True).get("P1-M0-T2"))
+
+    def test_4_read_only(self):
+        content_hash = storages.file_hash(self.filename)
+        for lazy in (True, False):
+            board = Projectboard("", self.filename, lazy=lazy, read_only=True)
+            self.assertEqual(lazy, board.is_lazy)
+            with self.assertRaises(ValueError):
+                board.delete("P1")
+            with self.assertRaises(ValueError):
+                board.set_metadata({"name": "Changed"})
+            self.assertEqual(self.pboard.get("P1"), board.get("P1"))
+            board.save()
+            board.close()
+        self.assertEqual(content_hash, storages.file_hash(self.filename))
+
+    def test_5_moved_items(self):
+        self.pboard.move_item_by("P2", -2)
+        self.pboard.move_item_by("P1-M0-T2", -1, True)
+        self.pboard.move_item_by("P1-M1", -1, True)
+        self.pboard.save()
+
+        lazy = Projectboard("", self.filename, lazy=True, read_only=True)
+        self.assertEqual(["P2", "P0", "P1"], lazy.get_project_order()["project_order"])
+        self.assertEqual(["P1-M0-T0", "P1-M0-T2", "P1-M0-T1"], lazy.get("P1-M0")["sub_items"])
+        for pid in ("P1", "P1-M0"):
+            self.assertEqual(self.pboard.get(pid), lazy.get(pid))
+            self.assertEqual(self.pboard.get_children(pid), lazy.get_children(pid))
+        self.assertEqual(["P1-M1", "P1-M0"], [child["id"] for child in lazy.get_children("P1")])
+        lazy.close()
+
+    def tearDown(self):
+        self.pboard.close()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+
+# pylint: disable=import-error
+from data.catalog import Catalog  # type: ignore
+from data.catalog import read_entry
+from data.data import Projectboard
+from data.data import create_default_item
+from unittests.common import copy_test_board
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.board_file = copy_test_board(self.tmp_dir)
+        self.catalog_file = os.path.join(self.tmp_dir, "catalog.json")
+
+    def __add_project(self):
+        board = Projectboard("", self.board_file)
+        board.insert(create_default_item())
+        board.close()
+
+    def test_1_entry(self):
+        entry = read_entry(self.board_file)
+        assert entry is not None
+        board = Projectboard("", self.board_file)
+        pids = board.get_project_order()["project_order"]
+        self.assertEqual(board.get_metadata(), entry["metadata"])
+        self.assertEqual(len(pids), entry["n_projects"])
+        for pid in pids:
+            self.assertEqual(list(board.number_milestones_and_tasks(pid)), entry["projects"][pid])
+        board.close()
+        self.assertIsNone(read_entry(os.path.join(self.tmp_dir, "missing.json")))
+
+    def test_2_valid_until_file_changes(self):
+        catalog = Catalog(self.catalog_file)
+        self.assertFalse(catalog.is_valid(self.board_file))
+        self.assertEqual([self.board_file], catalog.refresh([self.board_file]))
+        self.assertTrue(catalog.is_valid(self.board_file))
+        # Nothing is recomputed for unchanged files
+        self.assertEqual([], catalog.refresh([self.board_file]))
+
+        n_projects = catalog.get(self.board_file)["n_projects"]
+        self.__add_project()
+        self.assertFalse(catalog.is_valid(self.board_file))
+        self.assertEqual([self.board_file], catalog.refresh([self.board_file]))
+        self.assertEqual(n_projects + 1, catalog.get(self.board_file)["n_projects"])
+
+    def test_3_open_board(self):
+        catalog = Catalog(self.catalog_file)
+        board = Projectboard("", self.board_file)
+        board.insert(create_default_item())
+        board.save()
+        entry = catalog.update(self.board_file, board)
+        board.close()
+        self.assertTrue(catalog.is_valid(self.board_file))
+        self.assertEqual(read_entry(self.board_file), entry)
+
+    def test_4_save_and_load(self):
+        catalog = Catalog(self.catalog_file)
+        catalog.refresh_in_background([self.board_file]).join()
+        self.assertTrue(os.path.exists(self.catalog_file))
+        reloaded = Catalog(self.catalog_file)
+        self.assertEqual(catalog.get(self.board_file), reloaded.get(self.board_file))
+        self.assertTrue(reloaded.is_valid(self.board_file))
+
+        reloaded.remove(self.board_file)
+        reloaded.save()
+        self.assertIsNone(Catalog(self.catalog_file).get(self.board_file))
+
+    def test_5_broken_file(self):
+        with open(self.catalog_file, "w", encoding="utf-8") as catalog_file:
+            catalog_file.write("{broken")
+        catalog = Catalog(self.catalog_file)
+        self.assertIsNone(catalog.get(self.board_file))
+        updated = []
+        catalog.refresh_in_background([self.board_file], updated.append).join()
+        self.assertEqual([self.board_file], updated)
+        self.assertIsNotNone(Catalog(self.catalog_file).get(self.board_file))
+
+    def test_6_saved_while_open(self):
+        # Journal and SQLite boards keep their saves next to the board file until closed
+        catalog = Catalog(self.catalog_file)
+        sqlite_file = os.path.join(self.tmp_dir, "board.sqlite")
+        for filename, backend in ((self.board_file, "journal"), (sqlite_file, "sqlite")):
+            board = Projectboard("", filename, backend=backend)
+            board.insert(create_default_item())
+            board.save()
+            self.assertEqual([filename], catalog.refresh([filename]))
+            n_projects = catalog.get(filename)["n_projects"]
+
+            board.insert(create_default_item())
+            board.save()
+            self.assertFalse(catalog.is_valid(filename))
+            self.assertEqual([filename], catalog.refresh([filename]))
+            self.assertEqual(n_projects + 1, catalog.get(filename)["n_projects"])
+            self.assertTrue(catalog.is_valid(filename))
+            board.close()
+
+    def test_7_close_board(self):
+        # Closing a journal board compacts the journal into the board file
+        catalog = Catalog(self.catalog_file)
+        board = Projectboard("", self.board_file, backend="journal")
+        board.insert(create_default_item())
+        board.save()
+        entry = catalog.close_board(board)
+        self.assertTrue(catalog.is_valid(self.board_file))
+        self.assertEqual(read_entry(self.board_file), entry)
+        catalog.save()
+        self.assertEqual([], Catalog(self.catalog_file).refresh([self.board_file]))
+
+    def test_8_read_sqlite_board(self):
+        # Reading an SQLite board leaves an empty write-ahead log behind
+        sqlite_file = os.path.join(self.tmp_dir, "board.sqlite")
+        board = Projectboard("", sqlite_file, backend="sqlite")
+        board.insert(create_default_item())
+        board.close()
+        entry = read_entry(sqlite_file)
+        self.assertEqual(entry, read_entry(sqlite_file))
+        catalog = Catalog(self.catalog_file)
+        catalog.refresh([sqlite_file])
+        self.assertEqual(entry, catalog.get(sqlite_file))
+        self.assertEqual([], catalog.refresh([sqlite_file]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# pylint: disable=missing-docstring
+
+import json
+import unittest
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+
+# pylint: enable=import-error
+
+
+DOCUMENT = {"1": {"name": "Größe", "sub_items": ["M1", "T2"], "n": 3, "done": None}}
+
+
+class TestCodec(unittest.TestCase):
+    def test_1_round_trip(self):
+        encoded = codec.dumps(DOCUMENT)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(DOCUMENT, codec.loads(encoded))
+        self.assertEqual(DOCUMENT, codec.loads(encoded.decode("utf-8")))
+
+    def test_2_same_bytes_as_fallback(self):
+        # Files must not change when switching between orjson and the standard library
+        self.assertEqual(codec.dumps_json(DOCUMENT), codec.dumps(DOCUMENT))
+        self.assertEqual(DOCUMENT, json.loads(codec.dumps(DOCUMENT)))
+
+    def test_3_int_keys(self):
+        self.assertEqual({"1": "a"}, codec.loads(codec.dumps({1: "a"})))
+
+    def test_4_invalid_input(self):
+        with self.assertRaises(ValueError):
+            codec.loads(b'{"table": ')
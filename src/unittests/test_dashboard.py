@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+from datetime import date
+
+# pylint: disable=import-error
+from data.dashboard import Dashboard  # type: ignore
+from data.dashboard import board_files
+from data.dashboard import format_table
+from data.dashboard import summarize_file
+from data.dashboard import total
+from data.data import Projectboard
+from data.data import create_default_item
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+TODAY = date(2024, 6, 1).toordinal()
+
+
+def _create_board(filename: str, name: str):
+    """A project with an overdue milestone and two tasks, one of them finished"""
+    board = Projectboard(name, filename)
+    project = create_default_item()
+    project.update(id=f"{name}-P", state="Open", duedate=TODAY + 30)
+    milestone = create_default_item()
+    milestone.update(id=f"{name}-M", category="milestone", state="Open", duedate=TODAY - 1)
+    board.insert(project)
+    board.insert_sub_item(milestone, project)
+    for i_task, state in enumerate(("Open", "Closed")):
+        task = create_default_item(False)
+        task.update(id=f"{name}-T{i_task}", category="task", state=state, duedate=TODAY - 5)
+        board.insert_sub_item(task, milestone)
+    board.close()
+
+
+class TestDashboard(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.filenames = [os.path.join(self.tmp_dir, f"board{i}.json") for i in range(3)]
+        for i_board, filename in enumerate(self.filenames):
+            _create_board(filename, f"B{i_board}")
+        self.cache_file = os.path.join(self.tmp_dir, "cache", "dashboard.json")
+
+    def test_1_summary(self):
+        summary = summarize_file(self.filenames[0], TODAY)
+        assert summary is not None
+        self.assertEqual("B0", summary["name"])
+        self.assertEqual({"Open": 1}, summary["projects"])
+        self.assertEqual([0, 1], summary["milestones"])
+        self.assertEqual([1, 2], summary["tasks"])
+        self.assertEqual({"project": 0, "milestone": 1, "task": 1}, summary["overdue"])
+        self.assertIsNone(summarize_file(os.path.join(self.tmp_dir, "missing"), TODAY))
+
+        rollup = total([summary, summary])
+        self.assertEqual({"Open": 2}, rollup["projects"])
+        self.assertEqual([2, 4], rollup["tasks"])
+        self.assertEqual(4, sum(rollup["overdue"].values()))
+
+    def test_2_refresh_in_processes(self):
+        dashboard = Dashboard(self.cache_file)
+        summaries = dashboard.refresh(self.filenames, TODAY, max_workers=2)
+        self.assertEqual(self.filenames, list(summaries))
+        self.assertEqual(
+            [summarize_file(filename, TODAY) for filename in self.filenames],
+            list(summaries.values()),
+        )
+        self.assertEqual([], Dashboard(self.cache_file).outdated(self.filenames, TODAY))
+        # The overdue items change with the day
+        self.assertEqual(self.filenames, dashboard.outdated(self.filenames, TODAY + 1))
+
+    def test_3_only_changed_boards(self):
+        dashboard = Dashboard(self.cache_file)
+        dashboard.refresh(self.filenames, TODAY)
+        board = Projectboard("", self.filenames[1])
+        board.delete_subelements("B1-P", True)
+        board.close()
+        self.assertEqual([self.filenames[1]], dashboard.outdated(self.filenames, TODAY))
+
+        summaries = dashboard.refresh(self.filenames, TODAY)
+        self.assertEqual({}, summaries[self.filenames[1]]["projects"])
+        os.remove(self.filenames[2])
+        self.assertEqual(self.filenames[:2], list(dashboard.refresh(self.filenames, TODAY)))
+
+    def test_4_table(self):
+        self.assertEqual(sorted(self.filenames), board_files([self.tmp_dir]))
+        summaries = Dashboard(None).refresh(self.filenames, TODAY, max_workers=1)
+        lines = format_table(summaries)
+        self.assertEqual(len(self.filenames) + 2, len(lines))
+        self.assertEqual(["Total", "3", "0/3", "3/6", "6"], lines[-1].split())
+
+    def test_5_saved_while_open(self):
+        dashboard = Dashboard(self.cache_file)
+        sqlite_file = os.path.join(self.tmp_dir, "board.sqlite")
+        _create_board(sqlite_file, "S")
+        for filename, backend in ((self.filenames[0], "journal"), (sqlite_file, "sqlite")):
+            board = Projectboard("", filename, backend=backend)
+            self.assertEqual(
+                {"Open": 1}, dashboard.refresh([filename], TODAY)[filename]["projects"]
+            )
+
+            project = create_default_item()
+            project["state"] = "Open"
+            board.insert(project)
+            board.save()
+            self.assertEqual([filename], dashboard.outdated([filename], TODAY))
+            self.assertEqual(
+                {"Open": 2}, dashboard.refresh([filename], TODAY)[filename]["projects"]
+            )
+            board.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
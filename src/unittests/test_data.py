@@ -25,16 +25,20 @@ import os
 import random
 import unittest
 from datetime import datetime
+from unittest import mock
 
 # pylint: disable=import-error
 from tinydb import Query
 from tinydb import TinyDB
 
-from data.data import Projectboard  # type: ignore
+from data import ranks  # type: ignore
+from data.data import NO_COUNTS
+from data.data import Projectboard
 from data.data import create_default_item
 from data.data import generate_id
 from data.data import move_item_in_list_by_n
 from data.data import read_metadata
+from data.item_index import ItemIndex
 
 # pylint: enable=import-error
 
@@ -42,9 +46,19 @@ from data.data import read_metadata
 FILENAME_TEST_DB = "test_db.json"
 
 
-class TestProjectboardBasicDatabaseActions(unittest.TestCase):
+class BoardTestCase(unittest.TestCase):
+    """Base class for tests on an in-memory board; subclasses can select another backend"""
+
+    backend = "json"
+    write_method = "write"
+
+    def create_board(self) -> Projectboard:
+        return Projectboard("Test", FILENAME_TEST_DB, db_in_memory=True, backend=self.backend)
+
+
+class TestProjectboardBasicDatabaseActions(BoardTestCase):
     def setUp(self):
-        self.pboard = Projectboard("Test", FILENAME_TEST_DB, db_in_memory=True)
+        self.pboard = self.create_board()
         self.item = create_default_item()
         self.item["id"] = "2023-12-08-16:19:16.781414"
         self.n_proj = None
@@ -72,12 +86,14 @@ class TestProjectboardBasicDatabaseActions(unittest.TestCase):
     def test_3_get_item(self):
         self.pboard.insert(self.item)
         self.pboard.__database__.insert(self.item)
+        self.pboard.reindex()
 
         with self.assertRaises(ValueError):
             _ = self.pboard.get(self.item["id"])
 
         query = Query()
         self.pboard.__database__.remove(query.id == self.item["id"])
+        self.pboard.reindex()
 
         self.pboard.insert(self.item)
         result = self.pboard.get(self.item["id"])
@@ -133,9 +149,88 @@ class TestProjectboardBasicDatabaseActions(unittest.TestCase):
             pass
 
 
-class TestProjectboardInsertSubItems(unittest.TestCase):
+class TestProjectboardIdIndex(BoardTestCase):
+    def setUp(self):
+        self.pboard = self.create_board()
+        self.item = create_default_item()
+        self.item["id"] = "P1"
+        self.pboard.insert(self.item)
+        for i in range(2):
+            milestone = create_default_item()
+            milestone["category"] = "milestone"
+            milestone["id"] = f"M{i}"
+            self.pboard.insert_sub_item(milestone, self.pboard.get("P1"))
+
+    def assert_index_consistent(self):
+        """The index matches an index built from scratch and points to the right documents"""
+        index = self.pboard.__index__
+        rebuilt = ItemIndex(self.pboard.__database__)
+        self.assertEqual(rebuilt.ids, index.ids)
+        self.assertEqual(rebuilt.duplicate_ids, index.duplicate_ids)
+        self.assertEqual(rebuilt.children, index.children)
+        self.assertEqual(rebuilt.member_of, index.member_of)
+        for item_id, doc_id in index.ids.items():
+            self.assertEqual(item_id, self.pboard.__database__.get(doc_id=doc_id)["id"])
+
+    def test_1_insert(self):
+        task = create_default_item(False)
+        task["category"] = "task"
+        task["id"] = "T0"
+        self.pboard.insert_sub_item(task, self.pboard.get("M0"))
+        tasks = [
+            {**create_default_item(False), "category": "task", "id": f"T{i}", "parent": "M1"}
+            for i in range(1, 4)
+        ]
+        self.pboard.insert_many(tasks)
+        self.assertEqual({"P1", "M0", "M1", "T0", "T1", "T2", "T3"}, set(self.pboard.__index__.ids))
+        self.assert_index_consistent()
+
+    def test_2_delete(self):
+        self.pboard.delete("M0")
+        self.assertIsNone(self.pboard.__index__.doc_id("M0"))
+        self.assert_index_consistent()
+
+        self.pboard.delete_subelements("P1", True)
+        self.assertEqual({}, self.pboard.__index__.ids)
+        self.assert_index_consistent()
+
+    def test_3_move(self):
+        task = create_default_item(False)
+        task["category"] = "task"
+        task["id"] = "T0"
+        self.pboard.insert_sub_item(task, self.pboard.get("M0"))
+        doc_id = self.pboard.__index__.doc_id("T0")
+
+        # Move the task to the other milestone
+        task["parent"] = "M1"
+        self.pboard.insert(task)
+        self.assertEqual(doc_id, self.pboard.__index__.doc_id("T0"))
+        self.assertEqual(["T0"], list(self.pboard.__index__.children["M1"]))
+        self.assertNotIn("T0", self.pboard.__index__.children.get("M0", []))
+        self.assert_index_consistent()
+
+        self.pboard.move_item_by("M1", -1, True)
+        self.assertEqual(["M1", "M0"], self.pboard.get("P1")["sub_items"])
+        self.assert_index_consistent()
+
+    def test_4_duplicate_ids(self):
+        self.pboard.__database__.insert(self.pboard.get("M0"))
+        self.pboard.reindex()
+        self.assertEqual({"M0"}, self.pboard.__index__.duplicate_ids)
+        with self.assertRaises(ValueError):
+            self.pboard.get("M0")
+        self.assertIsNotNone(self.pboard.get("M1"))
+        with self.assertRaises(ValueError):
+            self.pboard.insert_many([{**create_default_item(), "id": "P1"}])
+        self.assert_index_consistent()
+
+    def tearDown(self):
+        self.pboard.__database__.close()
+
+
+class TestProjectboardInsertSubItems(BoardTestCase):
     def setUp(self):
-        self.pboard = Projectboard("Test", FILENAME_TEST_DB, db_in_memory=True)
+        self.pboard = self.create_board()
         self.item = create_default_item()
         self.item["id"] = "2023-12-08-16:19:16.781414"
         self.pboard.insert(self.item)
@@ -309,13 +404,33 @@ class TestProjectboardInsertSubItems(unittest.TestCase):
         self.assertEqual(self.pboard.n_children(self.item["id"]), n_m)
         self.assertEqual(self.pboard.n_children(first_ms_id), n_t)
 
+    def test_11_reparent_task(self):
+        for i in range(2):
+            sub_item = create_default_item()
+            sub_item["category"] = "milestone"
+            sub_item["id"] = f"M{i}"
+            self.pboard.insert_sub_item(sub_item, self.item)
+
+        task_item = create_default_item()
+        task_item["category"] = "task"
+        task_item["id"] = "T1"
+        self.pboard.insert_sub_item(task_item, self.pboard.get("M0"))
+        self.assertTrue(self.pboard.is_child_of("T1", "M0"))
+
+        task_item["parent"] = "M1"
+        self.pboard.insert(task_item)
+        self.assertFalse(self.pboard.is_child_of("T1", "M0"))
+        self.assertTrue(self.pboard.is_child_of("T1", "M1"))
+        self.assertEqual(self.pboard.n_children("M0"), 0)
+        self.assertEqual(self.pboard.get_children("M1"), [task_item])
+
     def tearDown(self):
         self.pboard.__database__.close()
 
 
-class TestProjectboardDeleteSubItems(unittest.TestCase):
+class TestProjectboardDeleteSubItems(BoardTestCase):
     def setUp(self):
-        self.pboard = Projectboard("Test", FILENAME_TEST_DB, db_in_memory=True)
+        self.pboard = self.create_board()
         self.item = create_default_item()
         self.item["id"] = "2023-12-08-16:19:16.781414"
         self.pboard.insert(self.item)
@@ -371,13 +486,240 @@ class TestProjectboardDeleteSubItems(unittest.TestCase):
         self.assertEqual([], self.pboard.__database__.search(query.category == "milestone"))
         self.assertEqual([], self.pboard.get_project_order()["project_order"])
 
+    def test_4_delete_milestone_with_tasks(self):
+        self.pboard.delete_subelements("M0", True)
+        for item_id in ("M0", "T00", "T01"):
+            self.assertEqual(None, self.pboard.get(item_id))
+
+        updated_item = self.pboard.get(self.item["id"])
+        self.assertEqual(["M1"], updated_item["sub_items"])
+        self.assertEqual(self.pboard.n_children(self.item["id"]), 1)
+        self.assertEqual((1, 0, 2, 0), self.pboard.number_milestones_and_tasks(self.item["id"]))
+        self.assertEqual([self.item["id"]], self.pboard.get_project_order()["project_order"])
+
+    def test_5_delete_subtree_updates_indexes(self):
+        index = self.pboard.__index__
+        pid = self.item["id"]
+        self.pboard.delete_subelements("M0", True)
+        for item_id in ("M0", "T00", "T01"):
+            self.assertNotIn(item_id, index.member_of)
+            self.assertNotIn(item_id, index.children)
+        self.assertEqual({pid: None}, index.member_of["M1"])
+        self.assertEqual(["M1"], list(index.children[pid]))
+        self.assertTrue(index.in_order(pid))
+
+        self.pboard.delete_subelements(pid, True)
+        self.assertEqual({}, index.member_of)
+        self.assertEqual({}, index.children)
+        self.assertFalse(index.in_order(pid))
+        self.assertEqual([], self.pboard.get_project_order()["project_order"])
+
+    def test_6_delete_id_contained_in_other_ids(self):
+        task_item = create_default_item(False)
+        task_item["category"] = "task"
+        task_item["id"] = "T1"
+        self.pboard.insert_sub_item(task_item, self.pboard.get("M1"))
+        for pid in ("P1", "P11"):
+            project = create_default_item()
+            project["id"] = pid
+            self.pboard.insert(project)
+
+        self.pboard.delete("T1")
+        self.assertEqual(["T10", "T11"], self.pboard.get("M1")["sub_items"])
+        self.assertEqual(["T10", "T11"], [child["id"] for child in self.pboard.get_children("M1")])
+
+        self.pboard.delete_subelements("P1", True)
+        self.assertIsNotNone(self.pboard.get("P11"))
+        self.assertEqual([self.item["id"], "P11"], self.pboard.get_project_order()["project_order"])
+
     def tearDown(self):
         self.pboard.__database__.close()
 
 
-class TestProjectboardSortMethods(unittest.TestCase):
+class TestProjectboardRollups(BoardTestCase):
     def setUp(self):
-        self.pboard = Projectboard("Test", FILENAME_TEST_DB, db_in_memory=True)
+        self.pboard = self.create_board()
+        self.item = create_default_item()
+        self.item["id"] = "P1"
+        self.pboard.insert(self.item)
+
+        for i in range(2):
+            sub_item = create_default_item()
+            sub_item["category"] = "milestone"
+            sub_item["id"] = f"M{i}"
+            self.pboard.insert_sub_item(sub_item, self.item)
+
+            for j in range(3):
+                task_item = create_default_item()
+                task_item["category"] = "task"
+                task_item["id"] = f"T{i}{j}"
+                self.pboard.insert_sub_item(task_item, sub_item)
+
+    def test_1_state_change(self):
+        self.assertEqual((2, 0, 6, 0), self.pboard.number_milestones_and_tasks("P1"))
+
+        task = self.pboard.get("T01")
+        task["state"] = "Closed"
+        self.pboard.insert(task)
+        milestone = self.pboard.get("M1")
+        milestone["state"] = "Closed"
+        self.pboard.insert(milestone)
+        self.assertEqual((2, 1, 6, 1), self.pboard.number_milestones_and_tasks("P1"))
+        self.assertEqual((1, 0, 3, 1), self.pboard.number_milestones_and_tasks("M0"))
+        self.assertEqual((0, 0, 1, 1), self.pboard.number_milestones_and_tasks("T01"))
+
+        self.pboard.insert({"id": "custom_states", "category": None, "states": ["Open", "Done"]})
+        self.assertEqual((2, 0, 6, 0), self.pboard.number_milestones_and_tasks("P1"))
+
+    def test_2_move_and_delete(self):
+        project = create_default_item()
+        project["id"] = "P2"
+        self.pboard.insert(project)
+
+        milestone = self.pboard.get("M0")
+        milestone["parent"] = "P2"
+        self.pboard.insert(milestone)
+        self.assertEqual((1, 0, 3, 0), self.pboard.number_milestones_and_tasks("P1"))
+        self.assertEqual((1, 0, 3, 0), self.pboard.number_milestones_and_tasks("P2"))
+
+        self.pboard.delete("T10")
+        self.assertEqual((1, 0, 2, 0), self.pboard.number_milestones_and_tasks("P1"))
+
+        self.pboard.delete_subelements("M0", True)
+        self.assertEqual(NO_COUNTS, self.pboard.number_milestones_and_tasks("P2"))
+
+        with self.assertRaises(ValueError):
+            self.pboard.number_milestones_and_tasks("M0")
+
+    def tearDown(self):
+        self.pboard.__database__.close()
+
+
+class TestProjectboardBatch(BoardTestCase):
+    def setUp(self):
+        self.pboard = self.create_board()
+        self.item = create_default_item()
+        self.item["id"] = "P1"
+        self.pboard.insert(self.item)
+
+    def add_milestones(self, n_miles: int):
+        for i in range(n_miles):
+            sub_item = create_default_item()
+            sub_item["category"] = "milestone"
+            sub_item["id"] = f"M{i}"
+            self.pboard.insert_sub_item(sub_item, self.item)
+
+    def test_1_single_write(self):
+        storage = self.pboard.__database__.storage
+        write_method = getattr(storage, self.write_method)
+        with mock.patch.object(storage, self.write_method, wraps=write_method) as write:
+            with self.pboard.batch():
+                self.add_milestones(5)
+                self.pboard.delete("M2")
+                self.assertEqual(write.call_count, 0)
+            self.assertEqual(write.call_count, 1)
+
+        self.assertEqual(["M0", "M1", "M3", "M4"], self.pboard.get("P1")["sub_items"])
+        self.assertEqual(self.pboard.n_children("P1"), 4)
+
+    def test_2_rollback(self):
+        self.add_milestones(2)
+
+        with self.assertRaises(RuntimeError):
+            with self.pboard.batch():
+                self.add_milestones(5)
+                self.pboard.delete_subelements("P1", True)
+                self.assertEqual(None, self.pboard.get("P1"))
+                raise RuntimeError
+
+        self.assertEqual(["M0", "M1"], self.pboard.get("P1")["sub_items"])
+        self.assertEqual(None, self.pboard.get("M2"))
+        self.assertEqual(self.pboard.n_children("P1"), 2)
+        self.assertEqual((2, 0, 0, 0), self.pboard.number_milestones_and_tasks("P1"))
+        self.assertEqual(["P1"], self.pboard.get_project_order()["project_order"])
+        self.assertEqual(5, len(self.pboard.__database__.all()))
+
+    def test_3_dirty_tracking(self):
+        self.assertTrue(self.pboard.is_dirty())
+        self.pboard.save()
+        self.assertFalse(self.pboard.is_dirty())
+        generation = self.pboard.generation
+
+        with self.pboard.batch():
+            self.add_milestones(3)
+            self.pboard.delete("M1")
+        self.assertEqual(generation + 1, self.pboard.generation)
+        self.assertTrue(self.pboard.is_dirty())
+        self.pboard.save()
+        self.assertFalse(self.pboard.is_dirty())
+
+    def create_forest(self) -> list[dict]:
+        """Project P2 with two milestones of two tasks and a task for milestone M0 of P1"""
+        items = []
+        for item_id, category, parent in (
+            ("P2", "project", None),
+            ("P2-M0", "milestone", "P2"),
+            ("P2-M1", "milestone", "P2"),
+            ("P2-T0", "task", "P2-M0"),
+            ("P2-T1", "task", "P2-M0"),
+            ("P2-T2", "task", "P2-M1"),
+            ("P2-T3", "task", "P2"),
+            ("T0", "task", "M0"),
+        ):
+            item = create_default_item(category != "task")
+            item.update(id=item_id, category=category, parent=parent)
+            items.append(item)
+        items[3]["state"] = "Closed"
+        return items
+
+    def test_4_insert_many(self):
+        self.add_milestones(1)
+        storage = self.pboard.__database__.storage
+        write_method = getattr(storage, self.write_method)
+        with mock.patch.object(storage, self.write_method, wraps=write_method) as write:
+            # Children before their parents
+            self.pboard.insert_many(reversed(self.create_forest()))
+            self.assertEqual(write.call_count, 1)
+
+        self.assertEqual(["P1", "P2"], self.pboard.get_project_order()["project_order"])
+        self.assertEqual(["P2-T3", "P2-M1", "P2-M0"], self.pboard.get("P2")["sub_items"])
+        self.assertEqual(["P2-T1", "P2-T0"], self.pboard.get("P2-M0")["sub_items"])
+        self.assertEqual(["T0"], self.pboard.get("M0")["sub_items"])
+        self.assertTrue(self.pboard.is_child_of("P2-T2", "P2-M1"))
+        self.assertEqual((2, 0, 4, 1), self.pboard.number_milestones_and_tasks("P2"))
+        self.assertEqual((1, 0, 1, 0), self.pboard.number_milestones_and_tasks("P1"))
+
+        self.assertTrue(self.pboard.undo())
+        self.assertEqual(None, self.pboard.get("P2"))
+        self.assertEqual([], self.pboard.get("M0")["sub_items"])
+        self.assertEqual(["P1"], self.pboard.get_project_order()["project_order"])
+
+    def test_5_insert_many_invalid(self):
+        self.add_milestones(1)
+        for index, change in (
+            (3, {"parent": "P2-T1"}),  # task below task
+            (1, {"parent": "P2-T0"}),  # milestone below task
+            (0, {"parent": "M0"}),  # project below milestone
+            (7, {"parent": "M42"}),  # parent does not exist
+            (7, {"id": "P1"}),  # id exists
+            (4, {"id": "P2-T0"}),  # id used twice
+            (2, {"category": "epic"}),
+        ):
+            items = self.create_forest()
+            items[index].update(change)
+            with self.assertRaises(ValueError):
+                self.pboard.insert_many(items)
+            self.assertEqual(None, self.pboard.get("P2"))
+        self.assertEqual(["P1"], self.pboard.get_project_order()["project_order"])
+        self.assertEqual(["M0"], self.pboard.get("P1")["sub_items"])
+
+    def tearDown(self):
+        self.pboard.__database__.close()
+
+
+class TestProjectboardSortMethods(BoardTestCase):
+    def setUp(self):
+        self.pboard = self.create_board()
         self.n_proj = 10
         for i in range(self.n_proj):
             self.item = create_default_item()
@@ -464,6 +806,84 @@ class TestProjectboardSortMethods(unittest.TestCase):
         with self.assertRaises(KeyError):
             self.pboard.move_item_by("T42", 10, True)
 
+    def add_tasks(self, n_tasks: int) -> list[str]:
+        for i in range(n_tasks):
+            sub_item = create_default_item(False)
+            sub_item["id"] = f"T{i}"
+            sub_item["category"] = "task"
+            self.pboard.insert_sub_item(sub_item, self.item)
+        return [f"T{i}" for i in range(n_tasks)]
+
+    def test_7_mv_writes_one_item(self):
+        order = self.add_tasks(20)
+        changed: list = []
+        self.pboard.observe(lambda item_id, old, new: changed.append(item_id))
+        self.pboard.move_item_by("T5", 3, True)
+        # The first move ranks the siblings
+        self.assertEqual(20, len(changed))
+
+        order.insert(8, order.pop(5))
+        for i_move in range(200):
+            old_idx = random.randint(0, len(order) - 1)
+            n_pos = random.randint(-5, 5)
+            changed.clear()
+            self.pboard.move_item_by(order[old_idx], n_pos, True)
+            new_idx = min(max(old_idx + n_pos, 0), len(order) - 1)
+            order.insert(new_idx, order.pop(old_idx))
+            self.assertEqual([] if new_idx == old_idx else [order[new_idx]], changed, i_move)
+            self.assertEqual(order, self.pboard.get(self.item["id"])["sub_items"])
+            self.assertEqual(order, [c["id"] for c in self.pboard.get_children(self.item["id"])])
+
+        # The stored list is not rewritten
+        stored = self.pboard.__database__.get(Query().id == self.item["id"])
+        self.assertEqual(sorted(order), sorted(stored["sub_items"]))
+
+    def test_8_mv_project_and_undo(self):
+        self.pboard.move_item_by("P3", -3)
+        self.pboard.move_item_by("P9", -20)
+        order = ["P9", "P3", "P0", "P1", "P2", "P4", "P5", "P6", "P7", "P8"]
+        self.assertEqual(order, self.pboard.get_project_order()["project_order"])
+        stored = self.pboard.__database__.get(Query().project_order.exists())
+        self.assertEqual([f"P{i}" for i in range(10)], stored["project_order"])
+
+        self.assertTrue(self.pboard.undo())
+        self.assertEqual(order[1:] + ["P9"], self.pboard.get_project_order()["project_order"])
+        self.assertTrue(self.pboard.redo())
+        self.assertEqual(order, self.pboard.get_project_order()["project_order"])
+
+        # New projects come last, an explicit order replaces the ranks
+        project = create_default_item()
+        project["id"] = "P10"
+        self.pboard.insert(project)
+        self.assertEqual(order + ["P10"], self.pboard.get_project_order()["project_order"])
+        order = [f"P{i}" for i in range(11)]
+        self.pboard.set_project_order({"project_order": order})
+        self.assertEqual(order, self.pboard.get_project_order()["project_order"])
+        self.assertNotIn("rank", self.pboard.get("P9"))
+
+    def test_9_rebalance(self):
+        order = self.add_tasks(4)
+        # Always into the same gap, so the ranks get longer
+        for _ in range(100):
+            self.pboard.move_item_by(order[3], -2, True)
+            order.insert(1, order.pop(3))
+        self.assertEqual(order, self.pboard.get(self.item["id"])["sub_items"])
+        for task_id in order:
+            self.assertLessEqual(len(self.pboard.get(task_id)["rank"]), ranks.MAX_LENGTH)
+
+        # A task that gets another parent is added at its end
+        milestone = create_default_item()
+        milestone.update(id="M0", category="milestone")
+        self.pboard.insert_sub_item(milestone, self.item)
+        self.pboard.insert_sub_item(
+            create_default_item(False) | {"id": "T9", "category": "task"}, milestone
+        )
+        task = self.pboard.get(order[0])
+        task["parent"] = "M0"
+        self.pboard.insert(task)
+        self.assertNotIn("rank", self.pboard.get(order[0]))
+        self.assertEqual(["T9", order[0]], [c["id"] for c in self.pboard.get_children("M0")])
+
     def tearDown(self):
         self.pboard.__database__.close()
 
@@ -472,14 +892,19 @@ class TestHelperMethods(unittest.TestCase):
     def test_generate_id(self):
         time = datetime.now()
         result = generate_id(time)
-        self.assertEqual(str(time).replace(" ", "-"), result)
+        self.assertEqual(11, len(result))
 
         result_2 = generate_id()
         self.assertEqual(len(result), len(result_2))
+        # Unique and in creation order, also when created within one clock tick
+        results = [generate_id(time) for _ in range(10_000)]
+        self.assertEqual(len(results), len(set(results)))
+        self.assertEqual(sorted(results), results)
+        self.assertLess(result_2, results[0])
 
     def test_generate_default_item(self):
         item = create_default_item()
-        today = datetime.now().date().isoformat()
+        today = datetime.now().date().toordinal()
 
         self.assertEqual(item["name"], "default project")
         self.assertEqual(item["category"], "project")
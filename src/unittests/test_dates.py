@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import random
+import unittest
+from datetime import date
+
+# pylint: disable=import-error
+from data import dates  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+from data.storages import convert_board
+from data.storages import read_tables
+from unittests.common import copy_test_board
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+DAY = date(2024, 1, 9).toordinal()
+
+
+class TestDates(unittest.TestCase):
+    def test_1_to_ordinal(self):
+        for value in [DAY, date(2024, 1, 9), "2024-01-09", "Tue Jan 9 2024", "Tue Jan 09 2024"]:
+            self.assertEqual(DAY, dates.to_ordinal(value))
+        for value in [None, "", "9.1.2024", "Tue Foo 9 2024", "Tue Jan 32 2024", 0, True]:
+            self.assertIsNone(dates.to_ordinal(value))
+        self.assertEqual("2024-01-09", dates.to_iso("Tue Jan 9 2024"))
+        self.assertEqual("someday", dates.to_iso("someday"))
+        self.assertEqual("", dates.to_iso(None))
+
+    def test_2_normalize(self):
+        item = {"startdate": "Tue Jan 9 2024", "duedate": "someday"}
+        self.assertTrue(dates.normalize(item))
+        self.assertEqual({"startdate": DAY, "duedate": "someday"}, item)
+        self.assertFalse(dates.normalize(item))
+        self.assertEqual((DAY, DAY), dates.interval(item))
+        self.assertEqual((DAY, DAY + 3), dates.interval({"startdate": DAY + 3, "duedate": DAY}))
+        self.assertIsNone(dates.interval({}))
+
+    def test_3_index(self):
+        rng = random.Random(3)
+        index = dates.DateIndex()
+        expected: dict[str, tuple[int, int, bool]] = {}
+        for i_step in range(2000):
+            item_id = f"I{rng.randrange(300)}"
+            if rng.random() < 0.1:
+                index.discard(item_id)
+                expected.pop(item_id, None)
+            else:
+                start = rng.randrange(200)
+                due = start + rng.randrange(20)
+                finished = rng.random() < 0.3
+                index.set(item_id, (start, due), finished)
+                expected[item_id] = (start, due, finished)
+            if i_step % 50 == 0:
+                first = rng.randrange(200)
+                last = first + rng.randrange(30)
+                overlapping = sorted(
+                    (start, due, item_id)
+                    for item_id, (start, due, _) in expected.items()
+                    if start <= last and due >= first
+                )
+                self.assertEqual(
+                    [item_id for _, _, item_id in overlapping], index.overlapping(first, last)
+                )
+                due_between = sorted(
+                    (due, item_id)
+                    for item_id, (_, due, finished) in expected.items()
+                    if not finished and first <= due <= last
+                )
+                self.assertEqual(
+                    [item_id for _, item_id in due_between], index.due_between(first, last)
+                )
+        self.assertEqual(len(expected), len(index))
+
+    def test_4_index_update_in_place(self):
+        rng = random.Random(4)
+        expected = {f"I{i_item}": (i_item * 10, i_item * 10 + 5, False) for i_item in range(100)}
+        index = dates.DateIndex(
+            (item_id, (start, due), finished)
+            for item_id, (start, due, finished) in expected.items()
+        )
+        self.assertEqual(["I0"], index.overlapping(0, 0))
+        tree = index.__tree__
+        for _ in range(200):
+            item_id = f"I{rng.randrange(100)}"
+            start = expected[item_id][0] if rng.random() < 0.5 else rng.randrange(1000)
+            due = start + rng.randrange(400)
+            finished = rng.random() < 0.3
+            # Changed items are moved within the tree, it is not rebuilt
+            index.set(item_id, (start, due), finished)
+            expected[item_id] = (start, due, finished)
+            first = rng.randrange(1000)
+            last = first + rng.randrange(30)
+            overlapping = sorted(
+                (start, due, item_id)
+                for item_id, (start, due, _) in expected.items()
+                if start <= last and due >= first
+            )
+            self.assertEqual(
+                [item_id for _, _, item_id in overlapping], index.overlapping(first, last)
+            )
+            self.assertIs(tree, index.__tree__)
+        self.assertEqual(
+            sorted(
+                (due, item_id)
+                for item_id, (_, due, finished) in expected.items()
+                if not finished and due <= 500
+            ),
+            [(expected[item_id][1], item_id) for item_id in index.due_between(0, 500)],
+        )
+
+
+class TestProjectboardDates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.json_file = copy_test_board(self.tmp_dir)
+
+    def insert_task(self, board: Projectboard, task_id: str, start: int, due: int):
+        task = create_default_item(False)
+        task.update(id=task_id, category="task", startdate=start, duedate=due)
+        board.insert(task)
+
+    def test_1_migration(self):
+        old_tables = read_tables(self.json_file)
+        board = Projectboard("", self.json_file)
+        board.save()
+        board.close()
+
+        new_tables = read_tables(self.json_file)
+        for key, old_item in old_tables["_default"].items():
+            new_item = new_tables["_default"][key]
+            if "category" in old_item and "startdate" in old_item:
+                self.assertEqual(dates.to_ordinal(old_item["startdate"]), new_item["startdate"])
+                self.assertEqual(dates.to_ordinal(old_item["duedate"]), new_item["duedate"])
+            else:
+                self.assertEqual(old_item, new_item)
+
+        # Read-only boards are not migrated
+        copy_test_board(self.tmp_dir)
+        board = Projectboard("", self.json_file, read_only=True)
+        self.assertIsInstance(board.get("2024-01-09-19:17:24.239537")["startdate"], str)
+        self.assertIn("2024-01-09-19:17:24.239537", board.in_window("2024-01-11", "2024-01-11"))
+        board.close()
+
+    def test_2_queries(self):
+        board = Projectboard("", self.json_file, db_in_memory=True)
+        with board.batch():
+            self.insert_task(board, "T1", DAY, DAY + 10)
+            self.insert_task(board, "T2", DAY + 5, DAY + 6)
+            self.insert_task(board, "T3", DAY + 20, DAY + 30)
+            board.insert({"id": "T4", "category": "task", "duedate": "Tue Jan 9 2024"})
+        self.assertEqual(DAY, board.get("T4")["duedate"])
+
+        # test1.json: all projects end before 2024-03
+        self.assertEqual(["T4", "T2", "T1"], board.overdue(DAY + 11)[-3:])
+        self.assertEqual(["T2", "T1"], board.due_soon(5, DAY + 5))
+        self.assertEqual(["T1", "T2"], board.in_window(date(2024, 1, 12), DAY + 5))
+        self.assertEqual(["T3"], board.in_window(DAY + 30, DAY + 40))
+        self.assertEqual([], board.in_window(DAY + 31, DAY + 40))
+        with self.assertRaises(ValueError):
+            board.in_window("someday", DAY)
+
+        # The index follows changes
+        board.insert({"id": "T1", "category": "task", "state": "Closed"})
+        self.assertEqual(["T2"], board.due_soon(5, DAY + 5))
+        board.insert({"id": "T3", "category": "task", "startdate": DAY + 31, "duedate": DAY + 35})
+        self.assertEqual(["T3"], board.in_window(DAY + 31, DAY + 40))
+        board.delete("T2")
+        self.assertEqual(["T1"], board.in_window(DAY + 5, DAY + 5))
+        board.insert({"id": "custom_states", "category": None, "states": ["Open", "Done"]})
+        self.assertIn("T1", board.overdue(DAY + 11))
+
+    def test_3_lazy_board(self):
+        board = Projectboard("", self.json_file)
+        self.insert_task(board, "T1", DAY, DAY + 10)
+        board.close()
+        binary_file = os.path.join(self.tmp_dir, "board.pbb")
+        convert_board(self.json_file, binary_file)
+
+        board = Projectboard("", self.json_file)
+        lazy_board = Projectboard("", binary_file, lazy=True)
+        self.assertTrue(lazy_board.is_lazy)
+        for first, last in [(DAY, DAY), (DAY - 10, DAY + 10), (DAY + 100, DAY + 200)]:
+            self.assertEqual(board.in_window(first, last), lazy_board.in_window(first, last))
+        self.assertEqual(board.overdue(DAY + 60), lazy_board.overdue(DAY + 60))
+        board.close()
+        lazy_board.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import csv
+import json
+import os
+import threading
+import types
+import unittest
+
+# pylint: disable=import-error
+from data import export  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+from unittests.common import copy_test_board
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+DAY = 738894
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.board = Projectboard("Export <test>", "export.json", db_in_memory=True)
+        with self.board.batch():
+            for pid in ("P1", "P2"):
+                project = create_default_item()
+                project.update(id=pid, name=f"Project {pid}", startdate=DAY, duedate=DAY + 9)
+                self.board.insert(project)
+            milestone = create_default_item()
+            milestone.update(id="M1", name="Milestone & co", category="milestone")
+            self.board.insert_sub_item(milestone, self.board.get("P1"))
+            for task_id in ("T1", "T2"):
+                task = create_default_item(False)
+                task.update(id=task_id, name=task_id, category="task", description="a, b\nc")
+                self.board.insert_sub_item(task, self.board.get("M1"))
+
+    def test_1_order(self):
+        entries = list(export.iter_entries(self.board))
+        self.assertEqual(["P1", "M1", "T1", "T2", "P2"], [entry.item["id"] for entry in entries])
+        self.assertEqual([0, 1, 2, 2, 0], [entry.depth for entry in entries])
+        self.assertEqual(5, export.count_items(self.board))
+
+    def test_2_formats(self):
+        for export_format, exporter in export.FORMATS.items():
+            chunks = exporter(self.board)
+            # Generators: nothing is computed before the first chunk is requested
+            self.assertIsInstance(chunks, types.GeneratorType, export_format)
+
+        rows = list(csv.reader("".join(export.export_csv(self.board)).splitlines(True)))
+        self.assertEqual(["depth", *export.COLUMNS], rows[0])
+        self.assertEqual(["2", "task", "T1", "T1"], rows[3][:4])
+        self.assertEqual("a, b\nc", rows[3][-1])
+        self.assertEqual("2024-01-09", rows[1][5])
+
+        lines = "".join(export.export_jsonl(self.board)).splitlines()
+        self.assertEqual(5, len(lines))
+        item = json.loads(lines[2])
+        self.assertEqual(2, item.pop("depth"))
+        self.assertEqual(self.board.get("T1"), item)
+
+        markdown = "".join(export.export_markdown(self.board))
+        self.assertIn("## Project P1", markdown)
+        self.assertIn("\n  - **Task** T1 (Open, ", markdown)
+
+        text = "".join(export.export_html(self.board))
+        self.assertIn("<title>Export &lt;test&gt;</title>", text)
+        self.assertIn("Milestone &amp; co", text)
+        self.assertEqual(5 + 1, text.count("<tr>"))
+
+    def test_3_write_export(self):
+        filename = os.path.join(self.tmp_dir, "board.md")
+        progress = []
+        self.assertTrue(
+            export.write_export(self.board, filename, progress=lambda *p: progress.append(p))
+        )
+        self.assertEqual((5, 5), progress[-1])
+        with open(filename, encoding="utf-8") as export_file:
+            self.assertEqual("".join(export.export_markdown(self.board)), export_file.read())
+        with self.assertRaises(ValueError):
+            export.write_export(self.board, os.path.join(self.tmp_dir, "board.xyz"))
+
+    def test_4_cancel(self):
+        board = Projectboard("Large", "large.json", db_in_memory=True)
+        with board.batch():
+            for i_task in range(2500):
+                board.insert({"id": f"P{i_task}", "category": "project", "name": f"P{i_task}"})
+        cancel = threading.Event()
+        filename = os.path.join(self.tmp_dir, "board.csv")
+
+        def progress(n_done, _):
+            if n_done >= 1000:
+                cancel.set()
+
+        self.assertFalse(export.write_export(board, filename, progress=progress, cancel=cancel))
+        self.assertEqual([], os.listdir(self.tmp_dir))
+
+    def test_5_headless(self):
+        board_file = copy_test_board(self.tmp_dir)
+        with open(board_file, "rb") as original:
+            content = original.read()
+        filename = os.path.join(self.tmp_dir, "board.html")
+        export.main([board_file, filename])
+        with open(filename, encoding="utf-8") as export_file:
+            self.assertIn("<h1>test1</h1>", export_file.read())
+        # The board is not changed (e.g. by the date migration)
+        with open(board_file, "rb") as board_after:
+            self.assertEqual(content, board_after.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,8 @@ import unittest
 
 # pylint: disable=import-error
 from gui.qt.main_window import convert_str_to_filename  # type: ignore
+from gui.qt.main_window import from_qdate
+from gui.qt.main_window import to_qdate
 
 # pylint: enable=import-error
 
@@ -40,3 +42,9 @@ class TestGUIHelperFunctions(unittest.TestCase):
         for name, clean_name in zip(names, clean_names):
             result = convert_str_to_filename(name)
             self.assertEqual(result, os.path.join(directory, clean_name))
+
+    def test_2_qdate_conversion(self):
+        for value in ["2024-01-09", "Tue Jan 9 2024", 738894]:
+            qdate = to_qdate(value)
+            self.assertEqual((2024, 1, 9), (qdate.year(), qdate.month(), qdate.day()))
+            self.assertEqual(738894, from_qdate(qdate))
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import unittest
+
+# pylint: disable=import-error
+from data.data import Projectboard  # type: ignore
+from data.data import create_default_item
+from data.history import MISSING  # type: ignore
+from data.history import History
+from data.history import ItemDelta
+from data.history import Splice
+
+# pylint: enable=import-error
+
+
+def _item(item_id: str, category: str = "project", **fields) -> dict:
+    item = create_default_item(category != "task")
+    item.update(id=item_id, category=category, **fields)
+    return item
+
+
+class TestDeltas(unittest.TestCase):
+    def test_1_splice(self):
+        old = list("abcdefgh")
+        for new in (list("abdcefgh"), list("abcdefghi"), list("bcdefgh"), [], list("xyz")):
+            splice = Splice.between(old, new)
+            self.assertEqual(new, splice.apply(old))
+            self.assertEqual(old, splice.revert(new))
+        # Moving by one position only stores the two swapped ids
+        self.assertEqual(Splice(2, ("c", "d"), ("d", "c")), Splice.between(old, list("abdcefgh")))
+
+    def test_2_item_delta(self):
+        old = {"id": "A", "name": "Old", "sub_items": ["1", "2", "3"], "note": "x"}
+        new = {"id": "A", "name": "New", "sub_items": ["1", "3"], "state": "Open"}
+        delta = ItemDelta.between("A", old, new)
+        assert delta.changes is not None
+        self.assertEqual({"name", "sub_items", "note", "state"}, set(delta.changes))
+        self.assertEqual(("x", MISSING), delta.changes["note"])
+        self.assertEqual(new, delta.apply(old))
+        self.assertEqual(old, delta.apply(new, undo=True))
+
+        created = ItemDelta.between("A", None, new)
+        self.assertEqual(new, created.apply(None))
+        self.assertIsNone(created.apply(new, undo=True))
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.pboard = Projectboard("undo", "undo.json", db_in_memory=True)
+        self.pboard.insert(_item("P1", name="Project"))
+        milestone = _item("M1", "milestone")
+        self.pboard.insert_sub_item(milestone, self.pboard.get("P1"))
+        for i_task in range(3):
+            self.pboard.insert_sub_item(_item(f"T{i_task}", "task"), self.pboard.get("M1"))
+
+    def snapshot(self) -> tuple:
+        items = {item.id: item.to_dict() for item in self.pboard.iter_items()}
+        counts = {item_id: self.pboard.number_milestones_and_tasks(item_id) for item_id in items}
+        return items, counts, self.pboard.get_project_order()
+
+    def test_1_undo_redo(self):
+        states = [self.snapshot()]
+        self.pboard.insert({"id": "P1", "category": "project", "name": "Renamed"})
+        states.append(self.snapshot())
+        self.pboard.insert(_item("P2"))
+        states.append(self.snapshot())
+        self.pboard.move_item_by("P2", -1)
+        states.append(self.snapshot())
+        self.pboard.move_item_by("T2", -2, True)
+        states.append(self.snapshot())
+        self.pboard.insert({"id": "T1", "category": "task", "state": "Closed"})
+        states.append(self.snapshot())
+        self.pboard.delete_subelements("M1", True)
+        states.append(self.snapshot())
+        self.pboard.delete("P2")
+        states.append(self.snapshot())
+
+        for state in reversed(states[:-1]):
+            self.assertTrue(self.pboard.undo())
+            self.assertEqual(state, self.snapshot())
+        # Back to the empty board: the items of setUp were inserted one by one
+        while self.pboard.undo():
+            pass
+        self.assertFalse(self.pboard.can_undo())
+        self.assertEqual([], list(self.pboard.iter_items()))
+        self.assertEqual([], self.pboard.get_project_order()["project_order"])
+
+        while self.snapshot() != states[0]:
+            self.assertTrue(self.pboard.redo())
+        for state in states[1:]:
+            self.assertTrue(self.pboard.redo())
+            self.assertEqual(state, self.snapshot())
+        self.assertFalse(self.pboard.redo())
+
+    def test_2_new_change_drops_redo(self):
+        self.pboard.insert(_item("P2"))
+        self.pboard.undo()
+        self.assertTrue(self.pboard.can_redo())
+        self.pboard.insert(_item("P3"))
+        self.assertFalse(self.pboard.can_redo())
+        self.assertIsNone(self.pboard.get("P2"))
+
+    def test_3_batches_and_rollbacks(self):
+        before = self.snapshot()
+        with self.pboard.batch():
+            self.pboard.insert(_item("P2"))
+            self.pboard.delete("T0")
+        with self.assertRaises(RuntimeError):
+            with self.pboard.batch():
+                self.pboard.insert(_item("P3"))
+                raise RuntimeError
+        # The batch is one step, the rolled back batch none
+        self.pboard.undo()
+        self.assertEqual(before, self.snapshot())
+
+    def test_4_observers_follow(self):
+        changes = []
+        self.pboard.observe(lambda item_id, old, new: changes.append(item_id))
+        self.pboard.delete("T0")
+        self.pboard.undo()
+        # Undone in reverse order
+        self.assertEqual(["M1", "T0", "T0", "M1"], changes)
+
+    def test_5_memory_cap(self):
+        steps = History(max_bytes=2000)
+        for i_step in range(100):
+            steps.record(f"I{i_step}", None, {"id": f"I{i_step}", "name": "x" * 100})
+            steps.commit()
+            self.assertLessEqual(steps.size, 2000)
+        self.assertLess(len(steps), 100)
+        self.assertGreater(len(steps), 0)
+        # A step larger than the cap cannot be kept, nor the ones before it
+        steps.record("big", None, {"id": "big", "name": "x" * 5000})
+        steps.commit()
+        self.assertEqual(0, len(steps))
+
+        pboard = Projectboard("undo", "undo.json", db_in_memory=True, undo_bytes=0)
+        pboard.insert(_item("P1"))
+        self.assertFalse(pboard.undo())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+
+# pylint: disable=import-error
+from data import ids  # type: ignore
+from data import storages
+from data.data import Projectboard
+from data.data import create_default_item
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+START = datetime(2023, 12, 8, 16, 19, 16, 781414)
+
+
+def _legacy_id(offset_us: int) -> str:
+    return str(START + timedelta(microseconds=offset_us)).replace(" ", "-")
+
+
+def _get(board: Projectboard, item_id: str) -> dict[str, Any]:
+    item = board.get(item_id)
+    assert item is not None
+    return item
+
+
+class TestIds(unittest.TestCase):
+    def test_1_encode(self):
+        for value in (0, 1, 31, 32, 2**55 - 1):
+            self.assertEqual(value, ids.decode(ids.encode(value)))
+        with self.assertRaises(ValueError):
+            ids.encode(2**55)
+        with self.assertRaises(ValueError):
+            ids.decode("P1")
+        self.assertTrue(ids.is_compact(ids.generate()))
+        self.assertFalse(ids.is_compact(_legacy_id(0)))
+
+    def test_2_monotonic(self):
+        generate = ids.IdGenerator()
+        created = [generate(START) for _ in range(20_000)]
+        self.assertEqual(len(created), len(set(created)))
+        self.assertEqual(sorted(created), created)
+        self.assertEqual(START.replace(microsecond=781000), ids.creation_time(created[0]))
+        # An earlier time does not give a smaller id
+        self.assertGreater(generate(START - timedelta(days=1)), created[-1])
+
+    def test_3_legacy_time(self):
+        self.assertEqual(START, ids.legacy_time(_legacy_id(0)))
+        self.assertEqual(START.replace(microsecond=0), ids.legacy_time("2023-12-08-16:19:16"))
+        self.assertIsNone(ids.legacy_time("P1"))
+        self.assertIsNone(ids.legacy_time("custom_states"))
+
+    def test_4_new_id_of_board(self):
+        board = Projectboard("ids", "ids.json", db_in_memory=True)
+        item = create_default_item()
+        item["id"] = board.new_id()
+        board.insert(item)
+        self.assertNotEqual(item["id"], board.new_id())
+
+
+class TestMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+
+    def create_board(self, filename: str) -> list[str]:
+        """A project with a milestone and three tasks; two tasks share their id"""
+        pid, mid, tid, other = (_legacy_id(offset) for offset in (0, 10, 20, 1500))
+        board = Projectboard("legacy", filename)
+        project = create_default_item()
+        project["id"] = pid
+        milestone = create_default_item()
+        milestone.update(id=mid, category="milestone")
+        board.insert(project)
+        board.insert_sub_item(milestone, project)
+        for task_id in (tid, other):
+            task = create_default_item(False)
+            task.update(id=task_id, category="task", depends_on=[mid])
+            board.insert_sub_item(task, milestone)
+        board.close()
+
+        # A second task with the same id, as created by the old generate_id
+        tables = storages.read_tables(filename)
+        default = tables[storages.DEFAULT_TABLE]
+        duplicate = dict(next(doc for doc in default.values() if doc.get("id") == tid))
+        next(doc for doc in default.values() if doc.get("id") == mid)["sub_items"].append(tid)
+        default[str(max(map(int, default)) + 1)] = duplicate
+        storages.write_board(
+            filename,
+            (
+                (table, doc_id, doc)
+                for table, docs in tables.items()
+                for doc_id, doc in docs.items()
+            ),
+        )
+        return [pid, mid, tid, other]
+
+    def check_board(self, filename: str, old_ids: list[str]):
+        board = Projectboard("", filename, read_only=True)
+        items = list(board.iter_items())
+        self.assertEqual(5, len(items))
+        self.assertTrue(all(ids.is_compact(item.id) for item in items))
+        self.assertEqual(5, len({item.id for item in items}))
+
+        (pid,) = board.get_project_order()["project_order"]
+        self.assertEqual(_legacy_id(0)[:23], str(ids.creation_time(pid)).replace(" ", "-")[:23])
+        (mid,) = _get(board, pid)["sub_items"]
+        self.assertEqual(pid, _get(board, mid)["parent"])
+        tasks = _get(board, mid)["sub_items"]
+        self.assertEqual(3, len(tasks))
+        for task_id in tasks:
+            self.assertEqual(mid, _get(board, task_id)["parent"])
+            self.assertEqual([mid], _get(board, task_id)["depends_on"])
+        self.assertEqual((1, 0, 3, 0), board.number_milestones_and_tasks(pid)[:4])
+        self.assertFalse(set(old_ids) & {item.id for item in items})
+        board.close()
+
+    def test_1_migrate_in_place(self):
+        for extension in (".json", ".pbb", ".sqlite"):
+            filename = os.path.join(self.tmp_dir, f"board{extension}")
+            old_ids = self.create_board(filename)
+            self.assertEqual(5, ids.migrate_board(filename))
+            self.check_board(filename, old_ids)
+            # Nothing left to migrate
+            self.assertEqual(0, ids.migrate_board(filename))
+
+    def test_2_migrate_to_other_file(self):
+        filename = os.path.join(self.tmp_dir, "board.json")
+        target = os.path.join(self.tmp_dir, "board.pbb")
+        old_ids = self.create_board(filename)
+        self.assertEqual(5, ids.migrate_board(filename, target))
+        self.check_board(target, old_ids)
+        # The source is unchanged
+        source = storages.read_tables(filename)[storages.DEFAULT_TABLE].values()
+        self.assertEqual(set(old_ids), {doc.get("id") for doc in source} & set(old_ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
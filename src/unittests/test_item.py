@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+
+# pylint: disable=import-error
+from data.data import Projectboard  # type: ignore
+from data.data import cat_values
+from data.data import create_default_item
+from data.item import MILESTONE  # type: ignore
+from data.item import PROJECT
+from data.item import TASK
+from data.item import Item
+from data.item import category_code
+from data.item import state_code
+from data.item import state_name
+from data.storages import convert_board
+from unittests.common import copy_test_board
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+class TestItem(unittest.TestCase):
+    def test_1_round_trip(self):
+        project = create_default_item()
+        item = Item.from_dict(project)
+        self.assertEqual(project, item.to_dict())
+        self.assertEqual(PROJECT, item.category)
+        self.assertEqual("project", item.category_name)
+        self.assertEqual(state_code("Open"), item.state)
+
+        # Missing keys stay missing, unknown keys are kept
+        task = create_default_item(False)
+        del task["description"]
+        task["category"] = "task"
+        task["progress"] = [1, 2]
+        item = Item.from_dict(task)
+        self.assertEqual(task, item.to_dict())
+        self.assertIsNone(item.sub_items)
+        self.assertEqual({"progress": [1, 2]}, item.extra)
+        self.assertIsNot(task["progress"], item.to_dict()["progress"])
+
+        item.sub_items = ["T1"]
+        self.assertEqual(["T1"], item.to_dict()["sub_items"])
+
+    def test_2_codes(self):
+        for name, value in cat_values.items():
+            self.assertEqual(value, category_code(name))
+        self.assertEqual((1, 2, 3), (PROJECT, MILESTONE, TASK))
+        code = state_code("Some new state")
+        self.assertEqual(code, state_code("Some new state"))
+        self.assertEqual("Some new state", state_name(code))
+        self.assertEqual(0, Item.from_dict({"id": "custom"}).state)
+
+    def test_3_interned_ids(self):
+        parent_id = "".join(["P", "1"])
+        item = Item.from_dict({"id": "T1", "parent": parent_id})
+        parent = Item.from_dict({"id": "".join(["P", "1"]), "sub_items": ["T1"]})
+        self.assertIs(item.parent, parent.id)
+        self.assertIs(item.id, parent.sub_items[0])  # type: ignore
+
+
+class TestProjectboardItems(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.json_file = copy_test_board(self.tmp_dir)
+
+    def check_items(self, board: Projectboard):
+        items = list(board.iter_items())
+        self.assertTrue(items)
+        for item in items:
+            document = board.get(item.id)
+            assert document is not None
+            self.assertEqual(document, item.to_dict())
+            self.assertEqual(Item.from_dict(document), board.get_item(item.id))
+            self.assertEqual(
+                [Item.from_dict(child) for child in board.get_children(item.id)],
+                board.get_child_items(item.id),
+            )
+        self.assertIsNone(board.get_item("does not exist"))
+
+    def test_1_read_apis(self):
+        board = Projectboard("", self.json_file)
+        self.check_items(board)
+        board.close()
+
+    def test_2_lazy_read_apis(self):
+        binary_file = os.path.join(self.tmp_dir, "board.pbb")
+        convert_board(self.json_file, binary_file)
+        board = Projectboard("", binary_file, lazy=True)
+        self.assertTrue(board.is_lazy)
+        self.check_items(board)
+        board.close()
+
+    def test_3_insert(self):
+        board = Projectboard("", self.json_file, db_in_memory=True)
+        item = Item.from_dict(create_default_item())
+        item.name = "Item project"
+        board.insert(item)
+        self.assertEqual(item, board.get_item(item.id))
+        self.assertIn(item.id, board.get_project_order()["project_order"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import random
+import unittest
+
+# pylint: disable=import-error
+from data import ranks  # type: ignore
+
+# pylint: enable=import-error
+
+
+class TestRanks(unittest.TestCase):
+    def check(self, keys: list[str]):
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertTrue(all(map(ranks.is_rank, keys)))
+
+    def test_1_spread(self):
+        for count in (1, 2, 61, 62, 1000):
+            keys = ranks.spread(count)
+            self.assertEqual(count, len(keys))
+            self.check(keys)
+        keys = ranks.spread(100, "V", "W")
+        self.check(["V", *keys, "W"])
+        with self.assertRaises(ValueError):
+            ranks.spread(1, "W", "V")
+
+    def test_2_between(self):
+        self.assertEqual("W", ranks.between("V", None))
+        self.assertEqual("U", ranks.between(None, "V"))
+        self.check(["V", ranks.between("V", "V1"), "V1"])
+        self.check([ranks.between(None, "1"), "1"])
+        self.check(["z", ranks.between("z", None)])
+        with self.assertRaises(ValueError):
+            ranks.between("V", "V")
+
+    def test_3_random_inserts(self):
+        random.seed(42)
+        keys = [ranks.between(None, None)]
+        for _ in range(5_000):
+            index = random.randint(0, len(keys))
+            before = keys[index - 1] if index > 0 else None
+            after = keys[index] if index < len(keys) else None
+            keys.insert(index, ranks.between(before, after))
+        self.check(keys)
+        self.assertLessEqual(max(map(len, keys)), ranks.MAX_LENGTH)
+
+    def test_4_append_and_prepend(self):
+        keys = ranks.spread(100)
+        width = max(map(len, keys))
+        for _ in range(100):
+            keys.append(ranks.between(keys[-1], None))
+            keys.insert(0, ranks.between(None, keys[0]))
+        self.check(keys)
+        # There is room for as many ranks as were spread
+        self.assertEqual(width, max(map(len, keys)))
+
+    def test_5_is_rank(self):
+        self.assertTrue(ranks.is_rank("V1"))
+        for value in ("", "V0", "V-", None, 1):
+            self.assertFalse(ranks.is_rank(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import random
+import unittest
+
+# pylint: disable=import-error
+from data import schedule  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+from data.schedule import Schedule
+
+# pylint: enable=import-error
+
+
+DAY = 738894
+
+
+def create_board(durations: dict[str, int], depends_on: dict[str, list[str]]) -> Projectboard:
+    board = Projectboard("Schedule", "schedule.json", db_in_memory=True)
+    project = create_default_item()
+    project["id"] = "P"
+    with board.batch():
+        board.insert(project)
+        for item_id, duration in durations.items():
+            item = create_default_item(False)
+            category = "milestone" if item_id.startswith("M") else "task"
+            item.update(id=item_id, category=category, parent="P")
+            item.update(startdate=DAY, duedate=DAY + duration - 1)
+            if item_id in depends_on:
+                item[schedule.DEPENDS_ON] = depends_on[item_id]
+            board.insert(item)
+    return board
+
+
+class TestSchedule(unittest.TestCase):
+    def setUp(self):
+        # A (3) -> B (2) -> D (1), A -> C (4) -> D, E (1) independent
+        self.board = create_board(
+            {"A": 3, "B": 2, "C": 4, "D": 1, "E": 1}, {"B": ["A"], "C": ["A"], "D": ["B", "C"]}
+        )
+
+    def check_consistent(self, current: Schedule):
+        """Compares to a schedule computed from scratch"""
+        self.assertEqual(Schedule(self.board, use_numpy=False).timings(), current.timings())
+
+    def test_1_timings(self):
+        plan = Schedule(self.board, use_numpy=False)
+        self.assertEqual(5, len(plan))
+        self.assertEqual(DAY + 8, plan.end)
+        self.assertEqual((DAY, DAY + 3, DAY, DAY + 3, 0), plan.timing("A"))
+        self.assertEqual((DAY + 3, DAY + 5, DAY + 5, DAY + 7, 2), plan.timing("B"))
+        self.assertEqual((DAY + 3, DAY + 7, DAY + 3, DAY + 7, 0), plan.timing("C"))
+        self.assertEqual((DAY + 7, DAY + 8, DAY + 7, DAY + 8, 0), plan.timing("D"))
+        self.assertEqual(7, plan.timing("E").slack)
+        self.assertEqual(["A", "C", "D"], plan.critical_path())
+        self.assertEqual(["B", "C"], plan.predecessors("D"))
+        with self.assertRaises(ValueError):
+            plan.timing("P")
+
+    def test_2_edits(self):
+        plan = Schedule(self.board, use_numpy=False)
+        plan.add_dependency("E", "D")
+        self.assertEqual(["A"], self.board.get("B")[schedule.DEPENDS_ON])
+        self.assertEqual(["D"], self.board.get("E")[schedule.DEPENDS_ON])
+        self.assertEqual(["A", "C", "D", "E"], plan.critical_path())
+        self.check_consistent(plan)
+
+        self.board.insert({"id": "B", "category": "task", "duedate": DAY + 5})
+        plan.update(["B"])
+        self.assertEqual(["A", "B", "D", "E"], plan.critical_path())
+        self.check_consistent(plan)
+
+        plan.remove_dependency("D", "B")
+        self.assertEqual(["C"], self.board.get("D")[schedule.DEPENDS_ON])
+        self.check_consistent(plan)
+
+    def test_3_cycles(self):
+        plan = Schedule(self.board, use_numpy=False)
+        with self.assertRaises(ValueError):
+            plan.add_dependency("A", "D")
+        with self.assertRaises(ValueError):
+            plan.add_dependency("A", "A")
+        self.assertNotIn(schedule.DEPENDS_ON, self.board.get("A"))
+        self.check_consistent(plan)
+
+        self.board.insert({"id": "A", "category": "task", schedule.DEPENDS_ON: ["D"]})
+        with self.assertRaises(ValueError):
+            Schedule(self.board)
+
+    def test_4_random_edits(self):
+        """Incremental updates (with reordering) match a full computation"""
+        rng = random.Random(4)
+        ids = [f"T{i_item}" for i_item in range(60)]
+        self.board = create_board({item_id: rng.randrange(1, 10) for item_id in ids}, {})
+        plan = Schedule(self.board, use_numpy=False)
+        for _ in range(150):
+            item_id, other_id = rng.sample(ids, 2)
+            action = rng.random()
+            if action < 0.6:
+                try:
+                    plan.add_dependency(item_id, other_id)
+                except ValueError:
+                    continue
+            elif action < 0.8:
+                plan.remove_dependency(item_id, other_id)
+            else:
+                start = DAY + rng.randrange(20)
+                self.board.insert(
+                    {
+                        "id": item_id,
+                        "category": "task",
+                        "startdate": start,
+                        "duedate": start + rng.randrange(10),
+                    }
+                )
+                plan.update([item_id])
+        self.check_consistent(plan)
+
+    @unittest.skipIf(not schedule.HAVE_NUMPY, "NumPy is not installed")
+    def test_5_numpy(self):
+        rng = random.Random(5)
+        ids = [f"T{i_item}" for i_item in range(200)]
+        depends_on = {
+            item_id: rng.sample(ids[:i_item], min(i_item, 3)) for i_item, item_id in enumerate(ids)
+        }
+        self.board = create_board({item_id: rng.randrange(1, 10) for item_id in ids}, depends_on)
+        self.assertEqual(
+            Schedule(self.board, use_numpy=False).timings(),
+            Schedule(self.board, use_numpy=True).timings(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+
+# pylint: disable=import-error
+from data import codec  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+from data.search import BoardSearch  # type: ignore
+from data.search import SearchIndex
+from data.search import index_filename
+from data.search import parse_query
+from data.search import tokenize
+from unittests.common import copy_test_board
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+def _item(item_id: str, name: str, description: str = "", category: str = "project") -> dict:
+    item = create_default_item()
+    item.update(id=item_id, name=name, description=description, category=category)
+    return item
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.items = {
+            "P1": _item("P1", "Quarterly report", "Review the draft"),
+            "P2": _item("P2", "Report draft", "", "milestone"),
+            "P3": _item("P3", "Team meeting", "Agenda: report and reviews"),
+        }
+        self.index = SearchIndex()
+        for item in self.items.values():
+            self.index.add(item)
+
+    def ids(self, query: str, **kwargs) -> list[str]:
+        return [hit.item_id for hit in self.index.search(query, **kwargs)]
+
+    def test_1_tokenize(self):
+        self.assertEqual(["über", "e2e", "test"], tokenize("Über: e2e-Test!"))
+        self.assertEqual([], tokenize(None))
+        groups, excluded = parse_query("a OR b NOT c -d e*")
+        self.assertEqual([["a", "b"], ["e"]], [[term.token for term in group] for group in groups])
+        self.assertTrue(groups[1][0].prefix)
+        self.assertEqual(["c", "d"], [term.token for term in excluded])
+
+    def test_2_boolean_queries(self):
+        self.assertEqual({"P1", "P2", "P3"}, set(self.ids("report")))
+        self.assertEqual(["P1"], self.ids("report review"))
+        self.assertEqual({"P1", "P3"}, set(self.ids("quarterly OR meeting")))
+        self.assertEqual(["P3"], self.ids("report -draft"))
+        self.assertEqual(["P3"], self.ids("report NOT draft"))
+        self.assertEqual({"P1", "P3"}, set(self.ids("review*")))
+        self.assertEqual(["P3"], self.ids("report agen", prefix_last=True))
+        self.assertEqual([], self.ids("report agen"))
+        self.assertEqual([], self.ids("-report"))
+        # Too short for a prefix
+        self.assertEqual([], self.ids("r*"))
+        self.assertEqual([], self.ids("missing"))
+
+    def test_3_ranking(self):
+        # Names weigh more than descriptions
+        self.assertEqual("P2", self.ids("draft")[0])
+        self.assertEqual(1, len(self.index.search("report", limit=1)))
+        hit = self.index.search("meeting")[0]
+        self.assertEqual(("P3", "Team meeting", "project"), (hit.item_id, hit.name, hit.category))
+
+    def test_4_update_and_remove(self):
+        self.index.update("P3", self.items["P3"], _item("P3", "Offsite"))
+        self.assertEqual([], self.ids("meeting"))
+        self.assertEqual([], self.ids("agenda"))
+        self.assertEqual(["P3"], self.ids("offsite"))
+        self.index.update("P1", self.items["P1"], None)
+        self.assertNotIn("P1", self.index)
+        self.assertEqual([], self.index.tokens("quarter"))
+        self.assertEqual(["P2"], self.ids("report"))
+        self.assertEqual(2, len(self.index))
+
+    def test_5_to_dict(self):
+        copy = SearchIndex.from_dict(codec.loads(codec.dumps(self.index.to_dict())))
+        for query in ("report", "review*", "report -draft", "quarterly OR meeting"):
+            self.assertEqual(self.index.search(query), copy.search(query))
+        self.assertEqual(self.index.tokens("re"), copy.tokens("re"))
+        # Without the old version of the item, all tokens are checked
+        copy.remove("P3")
+        self.assertEqual([], copy.search("meeting"))
+        self.assertEqual([], copy.tokens("meet"))
+
+
+class TestBoardSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.board_file = copy_test_board(self.tmp_dir)
+        self.search_dir = os.path.join(self.tmp_dir, "search")
+
+    def test_1_follows_open_board(self):
+        board = Projectboard("", self.board_file)
+        search = BoardSearch(self.search_dir)
+        search.attach(board)
+        n_items = len(search.index(self.board_file))
+
+        board.insert(_item("S1", "Unique needle"))
+        self.assertEqual(
+            ["S1"], [hit.item_id for hit in search.search("needle", [self.board_file])]
+        )
+        self.assertEqual(n_items + 1, len(search.index(self.board_file)))
+
+        board.insert({"id": "S1", "category": "project", "name": "Haystack"})
+        self.assertEqual([], search.search("needle", [self.board_file]))
+        board.delete_subelements("S1", True)
+        self.assertEqual([], search.search("haystack", [self.board_file]))
+        self.assertEqual(n_items, len(search.index(self.board_file)))
+
+        # Rolled back changes are not found
+        with self.assertRaises(RuntimeError):
+            with board.batch():
+                board.insert(_item("S2", "Rolled back"))
+                raise RuntimeError
+        self.assertEqual([], search.search("rolled", [self.board_file]))
+
+        search.detach(board)
+        board.insert(_item("S3", "Detached"))
+        board.close()
+
+    def test_2_persisted_per_board(self):
+        search = BoardSearch(self.search_dir)
+        self.assertEqual(len(search.index(self.board_file)), len(search.index(self.board_file)))
+        self.assertTrue(os.path.exists(index_filename(self.board_file, self.search_dir)))
+
+        board = Projectboard("", self.board_file)
+        search.attach(board)
+        board.insert(_item("S1", "Persisted needle"))
+        board.save()
+        search.save_index(board)
+        search.detach(board)
+        board.close()
+
+        search = BoardSearch(self.search_dir)
+        hits = search.search("needle", [self.board_file])
+        self.assertEqual([("S1", self.board_file)], [(hit.item_id, hit.filename) for hit in hits])
+
+        # Changed behind the back of the search: the index is built again
+        board = Projectboard("", self.board_file)
+        board.insert(_item("S2", "Another needle"))
+        board.close()
+        self.assertEqual(2, len(search.search("needle", [self.board_file])))
+
+    def test_3_all_boards(self):
+        other_file = os.path.join(self.tmp_dir, "other.json")
+        board = Projectboard("other", other_file)
+        board.insert(_item("O1", "Needle in other board"))
+        board.close()
+        search = BoardSearch(self.search_dir)
+        search.refresh_in_background([self.board_file, other_file]).join()
+        missing = os.path.join(self.tmp_dir, "missing.json")
+        hits = search.search("needle", [self.board_file, other_file, missing])
+        self.assertEqual([other_file], [hit.filename for hit in hits])
+
+        search.forget(other_file)
+        self.assertFalse(os.path.exists(index_filename(other_file, self.search_dir)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -111,3 +111,11 @@ class TestStateInt(unittest.TestCase):
 
         setattr(state_1, "state", 3)
         self.assertEqual(state_1.state, 3)
+
+    def test_6_bounded_history(self):
+        state_1 = state.StateInt(1, [1, 2, 3], history_length=4)
+        for i_step in range(1000):
+            state_1.state = i_step % 3 + 1
+        self.assertLessEqual(len(state_1.__state__), 8)
+        self.assertEqual(state_1.state, 1)
+        self.assertEqual(state_1.prev_state, 3)
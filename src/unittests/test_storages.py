@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import os
+import unittest
+from unittest import mock
+
+# pylint: disable=import-error
+from data import storages  # type: ignore
+from data.data import Projectboard
+from data.data import create_default_item
+from data.data import read_metadata
+from data.data import read_metadata_many
+from data.storages import JOURNAL_SUFFIX
+from data.storages import convert_board
+from data.storages import read_tables
+from unittests import test_data  # type: ignore
+from unittests.common import TEST_BOARD
+from unittests.common import temporary_directory
+
+# pylint: enable=import-error
+
+
+# These classes only run the tests of the test_data classes on an SQLite board
+# pylint: disable=too-few-public-methods
+
+
+class SQLiteBoardTestCase(test_data.BoardTestCase):
+    backend = "sqlite"
+    write_method = "write_documents"
+
+
+class TestSQLiteBasicDatabaseActions(
+    SQLiteBoardTestCase, test_data.TestProjectboardBasicDatabaseActions
+):
+    pass
+
+
+class TestSQLiteInsertSubItems(SQLiteBoardTestCase, test_data.TestProjectboardInsertSubItems):
+    pass
+
+
+class TestSQLiteDeleteSubItems(SQLiteBoardTestCase, test_data.TestProjectboardDeleteSubItems):
+    pass
+
+
+class TestSQLiteRollups(SQLiteBoardTestCase, test_data.TestProjectboardRollups):
+    pass
+
+
+class TestSQLiteBatch(SQLiteBoardTestCase, test_data.TestProjectboardBatch):
+    pass
+
+
+class TestSQLiteSortMethods(SQLiteBoardTestCase, test_data.TestProjectboardSortMethods):
+    pass
+
+
+# pylint: enable=too-few-public-methods
+
+
+class TestSQLiteFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+
+    def test_1_save_and_reopen(self):
+        filename = os.path.join(self.tmp_dir, "board.sqlite")
+        pboard = Projectboard("Test", filename)
+        item = create_default_item()
+        item["id"] = "P1"
+        pboard.insert(item)
+        task = create_default_item(False)
+        task["category"] = "task"
+        task["id"] = "T1"
+        pboard.insert_sub_item(task, item)
+        pboard.save()
+        pboard.close()
+
+        pboard = Projectboard("", filename)
+        self.assertEqual("Test", pboard.get_metadata()["name"])
+        self.assertEqual(["P1"], pboard.get_project_order()["project_order"])
+        self.assertEqual(task, pboard.get("T1"))
+        self.assertEqual(["T1"], pboard.get("P1")["sub_items"])
+        pboard.delete("T1")
+        pboard.close()
+
+        pboard = Projectboard("", filename)
+        self.assertEqual(None, pboard.get("T1"))
+        self.assertEqual([], pboard.get("P1")["sub_items"])
+        pboard.close()
+
+    def test_2_convert_lossless(self):
+        sqlite_file = os.path.join(self.tmp_dir, "test1.sqlite")
+        json_file = os.path.join(self.tmp_dir, "test1.json")
+        convert_board(TEST_BOARD, sqlite_file)
+        convert_board(sqlite_file, json_file)
+
+        self.assertEqual(read_tables(TEST_BOARD), read_tables(sqlite_file))
+        self.assertEqual(read_tables(TEST_BOARD), read_tables(json_file))
+
+        with self.assertRaises(FileExistsError):
+            convert_board(TEST_BOARD, sqlite_file)
+
+
+class TestAtomicJSONStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.filename = os.path.join(self.tmp_dir, "board.json")
+        self.pboard = Projectboard("Test", self.filename)
+        self.item = create_default_item()
+        self.item["id"] = "P1"
+        self.pboard.insert(self.item)
+        self.pboard.save()
+
+    def test_1_skip_unchanged_save(self):
+        self.assertEqual(storages.file_hash(self.filename), self.pboard.content_hash)
+        with mock.patch.object(storages, "write_atomic") as write_atomic:
+            self.pboard.save()
+            self.pboard.set_metadata({"name": "Test"})
+            self.pboard.save()
+            self.pboard.set_metadata({"name": "Changed"})
+            self.pboard.save()
+        self.assertEqual(1, write_atomic.call_count)
+
+    def test_2_interrupted_save(self):
+        content_hash = self.pboard.content_hash
+        self.pboard.delete("P1")
+        with mock.patch.object(os, "replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.pboard.save()
+        self.assertTrue(self.pboard.is_dirty())
+        self.assertEqual(content_hash, storages.file_hash(self.filename))
+        self.assertEqual(self.item, Projectboard("", self.filename).get("P1"))
+
+        self.pboard.save()
+        self.assertEqual(None, Projectboard("", self.filename).get("P1"))
+        self.assertEqual(storages.file_hash(self.filename), self.pboard.content_hash)
+
+
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+        self.filename = os.path.join(self.tmp_dir, "board.json")
+        self.pboard = Projectboard("Test", self.filename, backend="journal")
+
+    def add_projects(self, n_proj: int):
+        for i in range(n_proj):
+            item = create_default_item()
+            item["id"] = f"P{i}"
+            self.pboard.insert(item)
+
+    def test_1_replay_without_close(self):
+        self.add_projects(3)
+        self.pboard.delete("P1")
+        self.pboard.save()
+
+        # Opening the file while the first board is still open sees the same state
+        pboard = Projectboard("", self.filename)
+        self.assertEqual(["P0", "P2"], pboard.get_project_order()["project_order"])
+        self.assertEqual(None, pboard.get("P1"))
+        self.assertEqual("Test", pboard.get_metadata()["name"])
+        pboard.close()
+
+    def test_2_incomplete_journal_line(self):
+        self.add_projects(2)
+        self.pboard.save()
+        with open(self.filename + JOURNAL_SUFFIX, "ab") as journal:
+            journal.write(b'{"table": "_default", "documents": {"9": {"id"')
+
+        pboard = Projectboard("", self.filename)
+        self.assertEqual(["P0", "P1"], pboard.get_project_order()["project_order"])
+        item = create_default_item()
+        item["id"] = "P2"
+        pboard.insert(item)
+        pboard.save()
+
+        pboard_2 = Projectboard("", self.filename)
+        self.assertEqual(["P0", "P1", "P2"], pboard_2.get_project_order()["project_order"])
+        pboard_2.close()
+        pboard.close()
+
+    def test_3_compaction(self):
+        with mock.patch.object(storages, "COMPACTION_MIN_SIZE", 1000):
+            self.add_projects(50)
+            self.pboard.save()
+            self.assertLess(os.path.getsize(self.filename + JOURNAL_SUFFIX), 5000)
+
+            self.pboard.close()
+            self.assertEqual(0, os.path.getsize(self.filename + JOURNAL_SUFFIX))
+
+        tables = read_tables(self.filename)
+        self.assertEqual(52, len(tables["_default"]))
+        self.assertEqual("journal", storages.detect_backend(self.filename))
+
+    def tearDown(self):
+        self.pboard.close()
+
+
+class TestReadMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = temporary_directory(self)
+
+    def create_board(self, filename: str, backend: str) -> str:
+        filename = os.path.join(self.tmp_dir, filename)
+        pboard = Projectboard("Old name", filename, backend=backend)
+        item = create_default_item()
+        item["id"] = "P1"
+        pboard.insert(item)
+        pboard.set_metadata({"name": f"Board {backend}"})
+        pboard.save()
+        if backend != "journal":
+            pboard.close()
+        return filename
+
+    def board_files(self) -> list[str]:
+        # SQLite may leave (empty) -wal and -shm files of the read-only connection
+        files = os.listdir(self.tmp_dir)
+        return sorted(f for f in files if not f.endswith(("-wal", "-shm")))
+
+    def test_1_all_backends(self):
+        for filename, backend in (
+            ("board.json", "json"),
+            ("journal.json", "journal"),
+            ("board.sqlite", "sqlite"),
+            ("board.pbb", "binary"),
+        ):
+            filename = self.create_board(filename, backend)
+            files = self.board_files()
+            hashes = [storages.file_hash(os.path.join(self.tmp_dir, f)) for f in files]
+            metadata = storages.read_metadata(filename)
+            self.assertEqual(f"Board {backend}", metadata["name"], backend)
+            self.assertEqual(filename, metadata["filename"])
+            self.assertEqual(files, self.board_files())
+            self.assertEqual(
+                hashes, [storages.file_hash(os.path.join(self.tmp_dir, f)) for f in files]
+            )
+
+    def test_2_stops_at_metadata(self):
+        filename = os.path.join(self.tmp_dir, "board.json")
+        with open(filename, "wt", encoding="utf-8") as board_file:
+            board_file.write('{"_default": {"1": {"metadata": {"name": "Header"}}, "2": {"pro')
+        self.assertEqual({"name": "Header"}, storages.read_metadata(filename))
+
+    def test_3_no_side_effects(self):
+        filename = os.path.join(self.tmp_dir, "missing", "board.json")
+        self.assertEqual(None, storages.read_metadata(filename))
+        self.assertEqual("", read_metadata(filename)["name"])
+        self.assertFalse(os.path.exists(os.path.dirname(filename)))
+
+    def test_4_many(self):
+        filenames = [self.create_board(f"board{i}.pbb", "binary") for i in range(20)]
+        filenames.append(TEST_BOARD)
+        names = [metadata["name"] for metadata in read_metadata_many(filenames)]
+        self.assertEqual(["Board binary"] * 20 + ["test1"], names)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2024 BerniK86.
+#
+# This file is part of pyprojectboard
+# (see https://github.com/bernik86/pyprojectboard).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=missing-docstring
+
+import random
+import unittest
+from typing import Optional
+
+# pylint: disable=import-error
+from data.data import Projectboard  # type: ignore
+from data.data import create_default_item
+from data.item import MILESTONE  # type: ignore
+from data.item import PROJECT
+from data.item import TASK
+from data.timeline import Bar  # type: ignore
+from data.timeline import TimelineLayout
+
+# pylint: enable=import-error
+
+
+DAY = 738894
+
+
+def create_item(item_id: str, category: str, span: tuple, state: str = "Open") -> dict:
+    item = create_default_item(category != "task")
+    item.update(id=item_id, name=item_id, category=category, state=state)
+    item.update(startdate=span[0], duedate=span[1])
+    return item
+
+
+def insert(board: Projectboard, item: dict, parent_id: Optional[str] = None):
+    if parent_id is None:
+        board.insert(item)
+    else:
+        parent = board.get(parent_id)
+        assert parent is not None
+        board.insert_sub_item(item, parent)
+
+
+class TestTimelineLayout(unittest.TestCase):
+    def setUp(self):
+        self.board = Projectboard("Timeline", "timeline.json", db_in_memory=True)
+        with self.board.batch():
+            insert(self.board, create_item("P2", "project", (DAY + 10, DAY + 40)))
+            insert(self.board, create_item("P1", "project", (DAY, DAY + 20)))
+            insert(self.board, create_item("M1", "milestone", (DAY + 5, DAY + 20)), "P1")
+            insert(self.board, create_item("M0", "milestone", (DAY, DAY + 4)), "P1")
+            insert(self.board, create_item("T1", "task", (DAY + 6, DAY + 6), "Closed"), "M1")
+            insert(self.board, create_item("T0", "task", (None, None)), "M1")
+            insert(self.board, create_item("T2", "task", (DAY + 3, DAY + 1)), "M0")
+
+    def test_1_from_board(self):
+        layout = TimelineLayout.from_board(self.board)
+        # Projects in project order, sub-items by start date, items without dates skipped
+        self.assertEqual(
+            ["P2", "P1", "M0", "T2", "M1", "T1"], [bar_item.item_id for bar_item in layout.bars]
+        )
+        self.assertEqual([0, 0, 1, 2, 1, 2], [bar_item.depth for bar_item in layout.bars])
+        self.assertEqual(
+            [PROJECT, PROJECT, MILESTONE, TASK, MILESTONE, TASK],
+            [bar_item.category for bar_item in layout.bars],
+        )
+        self.assertEqual((DAY + 1, DAY + 4), (layout.bars[3].start, layout.bars[3].end))
+        self.assertEqual([False] * 5 + [True], [bar_item.finished for bar_item in layout.bars])
+        self.assertEqual((DAY, DAY + 41), (layout.first_day, layout.last_day))
+
+    def test_2_rows(self):
+        layout = TimelineLayout.from_board(self.board)
+        self.assertEqual([0, 1, 4], list(layout.rows(DAY + 15, DAY + 16, 0, 100)))
+        self.assertEqual([1, 4], list(layout.rows(DAY + 15, DAY + 16, 1, 4)))
+        self.assertEqual([], list(layout.rows(DAY + 41, DAY + 50, 0, 100)))
+        self.assertEqual([], list(layout.rows(DAY, DAY + 50, 6, 100)))
+
+    def test_3_aggregate(self):
+        rng = random.Random(3)
+        bars = []
+        for row in range(101):
+            start = DAY + rng.randrange(100)
+            bars.append(Bar(f"T{row}", "", TASK, 0, start, start + rng.randrange(1, 20), False))
+        layout = TimelineLayout(bars)
+        for level in range(8):
+            size = 2**level
+            expected = []
+            for bucket in range((len(bars) + size - 1) // size):
+                group = bars[bucket * size : (bucket + 1) * size]
+                start = min(bar_item.start for bar_item in group)
+                end = max(bar_item.end for bar_item in group)
+                if start < DAY + 50 and end > DAY + 30:
+                    expected.append((bucket, start, end))
+            self.assertEqual(expected, list(layout.aggregate(level, DAY + 30, DAY + 50, 0, 200)))
+
+
+if __name__ == "__main__":
+    unittest.main()